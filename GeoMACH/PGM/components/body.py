@@ -67,22 +67,35 @@ class Body(Primitive):
 
         self.setSections()
 
-    def computeQs(self):
+    def computeShapes(self, v):
         nx = self.Qs[0].shape[1]
         ny = self.Qs[0].shape[0]
         nz = self.Qs[1].shape[0]
-        v = self.variables
         b = self.bottom==2
 
-        #v['pos'][0] = 2*v['pos'][1] - v['pos'][2]
-        #v['pos'][-1] = 2*v['pos'][-2] - v['pos'][-3]
-
         shapes = range(4)
         shapes[0] = PGMlib.computeshape(ny, nx,-b/4.0, 1/4.0, v['flt'], v['shR'])
         shapes[1] = PGMlib.computeshape(nz, nx, 1/4.0, 3/4.0, v['flt'], v['shT'])
         shapes[2] = PGMlib.computeshape(ny, nx, 3/4.0, (4+b)/4.0, v['flt'], v['shL'])
         shapes[3] = PGMlib.computeshape(nz, nx, 5/4.0, 7/4.0, v['flt'], v['shB'])
+        return shapes
+
+    def computeAdjoint(self, Qsbar):
+        Vbar, shapesbar = self.computeSectionsAdjoint(Qsbar)
+        names = ['shR','shT','shL','shB']
+        Vbar.update(self.computeShapesAdjoint(names, shapesbar))
+        return Vbar
+
+    def computeQs(self):
+        nx = self.Qs[0].shape[1]
+        ny = self.Qs[0].shape[0]
+        nz = self.Qs[1].shape[0]
+        v = self.variables
+
+        #v['pos'][0] = 2*v['pos'][1] - v['pos'][2]
+        #v['pos'][-1] = 2*v['pos'][-2] - v['pos'][-3]
 
+        shapes = self.computeShapes(v)
         nQ = nx*(9+6*ny+6*nz) if self.bottom==2 else nx*(9+6*ny+3*nz)
         self.computeSections(nQ, shapes)
 
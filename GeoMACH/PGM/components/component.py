@@ -19,6 +19,7 @@ class Component(object):
         self.params = {}
         self.Cv0 = 2
         self.Cv1 = 2
+        self.dirty = True
 
     def computeLeft(self):
         for f in range(len(self.Ks)):
@@ -66,6 +67,26 @@ class Component(object):
         for p in ps:
             vs[ps[p].var][:,:] += ps[p].compute()
 
+    def getDependencies(self):
+        """ Components whose Qs are read by computeQs """
+        return []
+
+    def computeAdjoint(self, Qsbar):
+        """ Return, keyed by variable, the products of the transposed
+        derivatives of Qs with Qsbar for the variables that have them """
+        return {}
+
+    def isLinear(self):
+        return True
+
+    def isDirty(self):
+        return self.dirty or any([par.dirty for par in self.params.values()])
+
+    def setClean(self):
+        self.dirty = False
+        for par in self.params.values():
+            par.dirty = False
+
     def addParam(self, name, var, shp, P=None, T=None, Tdim=0, D=None, Ddim=0, B=None, Bdim=0):
         self.params[name] = Parameter(var, shp, self.variables[var].shape, P, T, Tdim, D, Ddim, B, Bdim)
         
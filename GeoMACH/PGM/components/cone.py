@@ -50,13 +50,16 @@ class Cone(Interpolant):
                 self.Ps.append(PGMlib.bilinearinterp(self.nP, ni, nj, i+1, j+1, verts))
                 self.Ks[0][i,j] = j*ni + i
 
+    def getDependencies(self):
+        return [self.comp]
+
     def setDOFs(self):
         self.setC1('surf', 0, val=True)
         if self.comp.bottom==0:
             self.setC1('surf', 0, i=-1, u=-1, val=False)
             self.setC1('edge', 0, i=-1, u=-1, val=True)
 
-    def computeQs(self):
+    def getInputs(self):
         getEdge = self.getEdge
         Qs = self.comp.Qs
         zeros = numpy.zeros((1,3),order='F')
@@ -86,4 +89,5 @@ class Cone(Interpolant):
             nv[k] = sum(mv[self.sj[k]:self.sj[k+1]])
 
         v = self.variables
-        self.Qs[0] = PGMlib.computecone(sum(nu)+1, sum(nv)+1, nu[0], nu[1], nu[2], nv[0], nv[1], nv[2], v['scl']*self.comp.Qs[0].shape[1], v['fC1'], v['mC1'], W, E, N, S, v['shp'])
+        kernel = lambda W, E, N, S: PGMlib.computecone(sum(nu)+1, sum(nv)+1, nu[0], nu[1], nu[2], nv[0], nv[1], nv[2], v['scl']*self.comp.Qs[0].shape[1], v['fC1'], v['mC1'], W, E, N, S, v['shp'])
+        return [W, E, N, S], kernel
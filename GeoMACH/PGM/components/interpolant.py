@@ -1,5 +1,6 @@
 from __future__ import division
 import numpy
+import scipy.sparse
 
 from GeoMACH.PGM.components import Component
 
@@ -48,6 +49,57 @@ class Interpolant(Component):
         a('mC1','mC1',(1,1),P=[1.0])
         a('shp','shp',(1,1),P=[0.0])
 
+    def computeQs(self):
+        inputs, kernel = self.getInputs()
+        self.Qs[0] = kernel(*inputs)
+
+    def isLinear(self):
+        """ computeQs is linear in the parent Qs unless shp is nonzero """
+        return not numpy.any(self.variables['shp'] != 0)
+
+    def computeLinearization(self):
+        """ Return the derivatives of Qs[0] (flattened in Fortran order)
+        with respect to the entries of the parent Qs read by computeQs;
+        columns follow the faces of getDependencies() flattened in C order """
+
+        deps = []
+        for dep in self.getDependencies():
+            if dep not in deps:
+                deps.append(dep)
+
+        saved = [list(dep.Qs) for dep in deps]
+        nsrc = 0
+        for dep in deps:
+            for f in range(len(dep.Qs)):
+                size = dep.Qs[f].size
+                dep.Qs[f] = numpy.arange(nsrc+1, nsrc+1+size, dtype=float).reshape(dep.Qs[f].shape)
+                nsrc += size
+        try:
+            ids = [numpy.array(x).astype(int) for x in self.getInputs()[0]]
+        finally:
+            for k in range(len(deps)):
+                deps[k].Qs[:] = saved[k]
+
+        inputs, kernel = self.getInputs()
+        inputs = [numpy.array(x, order='F') for x in inputs]
+        Q0 = kernel(*inputs)
+        Ja = []
+        Ji = []
+        Jj = []
+        for x, xid in zip(inputs, ids):
+            for index in zip(*numpy.nonzero(xid)):
+                x[index] += 1.0
+                dQ = (kernel(*inputs) - Q0).flatten(order='F')
+                x[index] -= 1.0
+                nz = numpy.nonzero(dQ)[0]
+                Ja.append(dQ[nz])
+                Ji.append(nz)
+                Jj.append((xid[index]-1)*numpy.ones(nz.shape[0],int))
+        Ja = numpy.concatenate(Ja) if len(Ja) > 0 else numpy.zeros(0)
+        Ji = numpy.concatenate(Ji) if len(Ji) > 0 else numpy.zeros(0,int)
+        Jj = numpy.concatenate(Jj) if len(Jj) > 0 else numpy.zeros(0,int)
+        return deps, scipy.sparse.csc_matrix((Ja,(Ji,Jj)),shape=(Q0.size,nsrc))
+
     def getEdge(self, Q, i=None, j=None, d=1):
         if j==None:
             if i==0:
@@ -23,6 +23,10 @@ class Junction(Interpolant):
         self.initializeFaces()
         self.initializeSurfaces()
 
+    def getDependencies(self):
+        comps = [self.fComp, self.mComp, self.mComp0, self.mComp1]
+        return [comp for comp in comps if comp is not None]
+
     def setDOFs(self):
         self.setC1('surf', 0, val=True)
 
@@ -58,20 +62,27 @@ class Junction(Interpolant):
             if nj==None:
                 self.nj = [1,self.mComp.ms[0].shape[0],1]
 
+        self.fK = self.rotate(self.fComp.Ks[self.fFace])[self.fNW[0]:self.fNW[0]+sum(self.ni),self.fNW[1]:self.fNW[1]+sum(self.nj)]
+
+    def rotate(self, P):
         if self.fRot==0:
-            self.rotate = lambda P: P
-            self.flip = lambda nu, nv: [nu,nv]
+            return P
         elif self.fRot==1:
-            self.rotate = lambda P: numpy.swapaxes(P,0,1)[::-1,:]
-            self.flip = lambda nu, nv: [nv[::-1],nu]
+            return numpy.swapaxes(P,0,1)[::-1,:]
         elif self.fRot==2:
-            self.rotate = lambda P: P[::-1,::-1]
-            self.flip = lambda nu, nv: [nu[::-1],nv[::-1]]
+            return P[::-1,::-1]
         elif self.fRot==3:
-            self.rotate = lambda P: numpy.swapaxes(P,0,1)[:,::-1]
-            self.flip = lambda nu, nv: [nv,nu[::-1]]
+            return numpy.swapaxes(P,0,1)[:,::-1]
 
-        self.fK = self.rotate(self.fComp.Ks[self.fFace])[self.fNW[0]:self.fNW[0]+sum(self.ni),self.fNW[1]:self.fNW[1]+sum(self.nj)]
+    def flip(self, nu, nv):
+        if self.fRot==0:
+            return [nu,nv]
+        elif self.fRot==1:
+            return [nv[::-1],nu]
+        elif self.fRot==2:
+            return [nu[::-1],nv[::-1]]
+        elif self.fRot==3:
+            return [nv,nu[::-1]]
 
     def initializeVerts(self):
         vtx = lambda i, j, u, v: self.rotate(self.fComp.Ps[self.fK[i,j]])[u,v,:]
@@ -209,7 +220,7 @@ class Junction(Interpolant):
         N[nu[1]:nu[2]+1,nv[1],0] = -1
         N[nu[1]:nu[2]+1,nv[2],0] = -1
         
-    def computeQs(self):
+    def getInputs(self):
         fu = self.fComp.getms(self.fFace,0)
         fv = self.fComp.getms(self.fFace,1)
         fu,fv = self.flip(fu,fv)
@@ -245,4 +256,5 @@ class Junction(Interpolant):
             nv[k] = sum(mv[self.sj[k]:self.sj[k+1]]) + 1
 
         v = self.variables
-        self.Qs[0] = PGMlib.computejunction(sum(nu)-2, sum(nv)-2, nu[0], nu[1], nu[2], nv[0], nv[1], nv[2], v['fC1'], v['mC1'], W, E, N, S, fQ, v['shp'])
+        kernel = lambda W, E, N, S, fQ: PGMlib.computejunction(sum(nu)-2, sum(nv)-2, nu[0], nu[1], nu[2], nv[0], nv[1], nv[2], v['fC1'], v['mC1'], W, E, N, S, fQ, v['shp'])
+        return [W, E, N, S, fQ], kernel
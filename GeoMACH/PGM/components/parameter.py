@@ -14,6 +14,7 @@ class Parameter(object):
         self.shp0 = shp0
         self.P = zeros((shp[0],shp[1],5), order='F')
         self.T = [numpy.linspace(0,1,mu), numpy.linspace(0,1,mv)]
+        self.dirty = True
 
         if P is not None:
             self.setP(P)
@@ -38,15 +39,19 @@ class Parameter(object):
 
     def setP(self, P):
         self.P[:,:,0] = numpy.array(P,order='F').reshape(self.P.shape[:2])
+        self.dirty = True
 
     def setT(self, T, dim=0):
         self.T[dim][:] = numpy.array(T,order='F').reshape(self.T[dim].shape)
+        self.dirty = True
 
     def setD(self, D, dim=0):
         self.set(self.P[:,:,1+dim], D, dim)
+        self.dirty = True
 
     def setB(self, B, dim=0):
         self.set(self.P[:,:,3+dim], B, dim)
+        self.dirty = True
 
     def compute(self):
         mu,mv = self.P.shape[:2]
@@ -54,3 +59,21 @@ class Parameter(object):
         P = self.P
         Tu,Tv = self.T
         return PGMlib.computeparameter(mu, mv, nu, nv, P, Tu, Tv)
+
+    def computeJacobian(self):
+        """ Return the derivatives of compute() with respect to P[:,:,0];
+        compute() is linear in P[:,:,0] for fixed T, D, and B """
+
+        mu,mv = self.P.shape[:2]
+        nu,nv = self.shp0
+        P = numpy.array(self.P, order='F')
+        Tu,Tv = self.T
+        P[:,:,0] = 0.0
+        V0 = PGMlib.computeparameter(mu, mv, nu, nv, P, Tu, Tv)
+        dV = numpy.zeros((nu,nv,mu,mv), order='F')
+        for i in range(mu):
+            for j in range(mv):
+                P[i,j,0] = 1.0
+                dV[:,:,i,j] = PGMlib.computeparameter(mu, mv, nu, nv, P, Tu, Tv) - V0
+                P[i,j,0] = 0.0
+        return dV
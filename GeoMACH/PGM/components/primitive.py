@@ -58,6 +58,7 @@ class Primitive(Component):
                     v['flt'][j,1] = t2U
                     v['flt'][j,2] = t1L
                     v['flt'][j,3] = t2L
+        self.dirty = True
 
     def computeSections(self, nQ, shapes, radii=None):
         nf = len(self.Qs)
@@ -81,6 +82,53 @@ class Primitive(Component):
             self.dQs_dv[f] = self.dQs_dv[f] + self.dQs_dv[f].dot(dv_dpos0)
             counter += 3*ni*nj
 
+    def computeAdjoint(self, Qsbar):
+        Vbar, shapesbar = self.computeSectionsAdjoint(Qsbar)
+        return Vbar
+
+    def computeSectionsAdjoint(self, Qsbar):
+        """ Apply the transpose of dQs_dv; returns the adjoints of the
+        variables and of the section shapes of each face """
+
+        nf = len(self.Qs)
+        n = self.Qs[0].shape[1]
+        g = numpy.zeros(self.dQs_dv[0].shape[1])
+        posbar = numpy.zeros((n,3))
+        for f in range(nf):
+            g += self.dQs_dv[f].T.dot(Qsbar[f].flatten(order='F'))
+            posbar += numpy.sum(Qsbar[f], axis=0)
+
+        Vbar = {}
+        Vbar['scl'] = g[:3*n].reshape((3,n)).T
+        Vbar['pos'] = g[3*n:6*n].reshape((3,n)).T + posbar
+        Vbar['rot'] = g[6*n:9*n].reshape((3,n)).T*numpy.pi/180.0
+        Vbar['ogn'] = numpy.zeros((n,3))
+        shapesbar = []
+        counter = 9*n
+        for f in range(nf):
+            ni, nj = self.Qs[f].shape[:2]
+            shapesbar.append(g[counter:counter+3*ni*nj].reshape((ni,nj,3),order='F'))
+            Vbar['ogn'] -= numpy.sum(shapesbar[f], axis=0)
+            counter += 3*ni*nj
+        return Vbar, shapesbar
+
+    def computeShapesAdjoint(self, names, shapesbar):
+        """ Adjoints of shape variables that offset the sections of each
+        face along fixed normals; names[f] is the variable of face f """
+
+        v0 = dict(self.variables)
+        v1 = dict(self.variables)
+        for name in names:
+            v0[name] = numpy.zeros(self.variables[name].shape, order='F')
+            v1[name] = numpy.ones(self.variables[name].shape, order='F')
+        shapes0 = self.computeShapes(v0)
+        shapes1 = self.computeShapes(v1)
+
+        Vbar = {}
+        for f in range(len(names)):
+            Vbar[names[f]] = numpy.sum(shapesbar[f]*(shapes1[f] - shapes0[f]), axis=2)
+        return Vbar
+
     def setDerivatives(self, var, dV0):
         nf = len(self.Qs)
         nv = self.dQs_dv[0].shape[1]
@@ -91,16 +91,12 @@ class Shell(Primitive):
 
         self.setSections()
 
-    def computeQs(self):
+    def computeShapes(self, v):
         nx = self.Qs[0].shape[1]
         ny = self.Qs[0].shape[0]
         nz = self.Qs[1].shape[0]
-        v = self.variables
         b = self.bottom==2
 
-        r0 = v['scl'] + v['thk']/2.0
-        r1 = v['scl'] - v['thk']/2.0
-
         shapes = range(8)
         shapes[0] = PGMlib.computeshape(ny, nx,-b/4.0, 1/4.0, v['flt'], v['sR0'])
         shapes[1] = PGMlib.computeshape(nz, nx, 1/4.0, 3/4.0, v['flt'], v['sT0'])
@@ -110,7 +106,24 @@ class Shell(Primitive):
         shapes[4] = PGMlib.computeshape(nz, nx, 3/4.0, 1/4.0, v['flt'], v['sT1'])
         shapes[3] = PGMlib.computeshape(ny, nx, (4+b)/4.0, 3/4.0, v['flt'], v['sL1'])
         shapes[7] = PGMlib.computeshape(nz, nx, 7/4.0, 5/4.0, v['flt'], v['sB1'])
-        
+        return shapes
+
+    def computeAdjoint(self, Qsbar):
+        Vbar, shapesbar = self.computeSectionsAdjoint(Qsbar)
+        names = ['sR0','sT0','sL0','sL1','sT1','sR1','sB0','sB1']
+        Vbar.update(self.computeShapesAdjoint(names, shapesbar))
+        return Vbar
+
+    def computeQs(self):
+        nx = self.Qs[0].shape[1]
+        ny = self.Qs[0].shape[0]
+        nz = self.Qs[1].shape[0]
+        v = self.variables
+
+        r0 = v['scl'] + v['thk']/2.0
+        r1 = v['scl'] - v['thk']/2.0
+
+        shapes = self.computeShapes(v)
         nQ = nx*(9+12*ny+12*nz) if self.bottom==2 else nx*(9+12*ny+6*nz)
         radii = [r0,r0,r0,r1,r1,r1,r0,r1]
         self.computeSections(nQ, shapes, radii=radii)
@@ -74,11 +74,21 @@ class Wing(Primitive):
 
     def setAirfoil(self,filename="naca0012"):
         Ps = airfoils.fitAirfoil(self,filename)
+        #The shapes may be shared with clones, so write to fresh arrays
+        self.shapeU = numpy.array(self.shapeU, order='F')
+        self.shapeL = numpy.array(self.shapeL, order='F')
         for f in range(len(self.Ks)):
             for j in range(self.Ns[f].shape[1]):
                 shape = self.shapeU if f==0 else self.shapeL
                 shape[:,j,:2] = Ps[f][:,:]
+        self.dirty = True
         
+    def computeAdjoint(self, Qsbar):
+        Vbar, shapesbar = self.computeSectionsAdjoint(Qsbar)
+        Vbar['shU'] = shapesbar[0][:,:,1]
+        Vbar['shL'] = -shapesbar[1][:,:,1]
+        return Vbar
+
     def computeQs(self):
         ni = self.Qs[0].shape[0]
         nj = self.Qs[0].shape[1]
@@ -89,13 +99,11 @@ class Wing(Primitive):
         #if self.right==2:
         #    v['pos'][0] = 2*v['pos'][1] - v['pos'][2]
 
-        shapes = [self.shapeU, self.shapeL]
+        shapes = [numpy.array(self.shapeU, order='F'), numpy.array(self.shapeL, order='F')]
         shapes[0][:,:,1] += v['shU']
         shapes[1][:,:,1] -= v['shL']
         nQ = nj*(9+6*ni)
         self.computeSections(nQ, shapes)
-        shapes[0][:,:,1] -= v['shU']
-        shapes[1][:,:,1] += v['shL']
 
 
 if __name__ == '__main__':
@@ -1,9 +1,13 @@
 from __future__ import division
 import numpy
+import scipy.sparse
 import time
+import cPickle
+import copy
 
 from GeoMACH.PUBS import PUBS, PUBSlib
 from GeoMACH.PSM import PSMlib
+from GeoMACH.PGM import PGMlib
 
 try: 
     from pyV3D.sender import WV_Sender
@@ -22,6 +26,8 @@ class Configuration(object):
         self.comps = {}
         self.keys = []
         self.inds = {}
+        self.jacobian = None
+        self.linearizations = {}
 
         self._callbacks = []
 
@@ -122,37 +128,205 @@ class Configuration(object):
             comp.computeEdgeInfo()
             comp.initializeDOFmappings()
             comp.initializeVariables()
+            comp.dirty = True
+        self.computeQowners()
+        self.jacobian = None
+        self.linearizations = {}
         self.computePoints()
 
     def update(self):
         self.oml0.update()
         self.updateParametrization()
 
-    def computePoints(self):
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_callbacks'] = []
+        state['jacobian'] = None
+        return state
+
+    def clone(self):
+        """ Return a copy for evaluating another design; the PUBS
+            operators, the DOF and surface index maps (Ns, Ks, Qowners), the
+            airfoil shapes, and the current dQs_dv are shared, while the
+            parameters, variables, Qs, and the Q, C, and P0 arrays are private;
+            a design evaluation replaces dQs_dv rather than modifying it """
+
+        memo = {id(self.oml0): self.oml0.clone()}
+        shared = []
+        for k in range(len(self.comps)):
+            comp = self.comps[self.keys[k]]
+            shared.extend(comp.Ns + comp.Ks + self.Qowners[k])
+            dQs_dv = comp.__dict__.get('dQs_dv')
+            if isinstance(dQs_dv, list):
+                shared.extend([dQs_dv] + dQs_dv)
+            for name in ['shapeU', 'shapeL']:
+                if name in comp.__dict__:
+                    shared.append(comp.__dict__[name])
+        for obj in shared:
+            memo[id(obj)] = obj
+        return copy.deepcopy(self, memo)
+
+    def saveSnapshot(self, filename):
+        """ Write the complete state, i.e., the components, their
+            parameters, variables, and DOF mappings, and the PUBS model with
+            its arrays stored contiguously and its sparse operators in their
+            native CSC form; restore it with loadSnapshot """
+
+        f = open(filename, 'wb')
+        cPickle.dump(self, f, cPickle.HIGHEST_PROTOCOL)
+        f.close()
+
+    def computePoints(self, full=False):
+        """ Regenerate the model; unless full, only components whose
+            parameters changed and the components that depend on them """
+
         t0 = time.time()
-        self.computeVs()
-        self.computeQs()
-        self.propagateQs()
+        self.updateQs(full)
         self.oml0.computePoints()
         print time.time()-t0
 
+    def updateQs(self, full=False):
+        """ Recompute the component Qs and write them into oml0.Q; unless
+            full, only dirty components and their dependents are updated """
+
+        dirty = []
+        if full:
+            self.computeVs()
+            self.computeQs()
+            self.propagateQs()
+        else:
+            dirty = self.getDirtyComps()
+            for k in dirty:
+                self.comps[self.keys[k]].computeVs()
+                self.comps[self.keys[k]].computeQs()
+            self.propagateQs(dirty)
+        if full or len(dirty) > 0:
+            self.jacobian = None
+        for k in range(len(self.comps)):
+            comp = self.comps[self.keys[k]]
+            if full or (k in dirty and (comp.isDirty() or not comp.isLinear())):
+                self.linearizations.pop(k, None)
+            comp.setClean()
+
+    def evaluateDesigns(self, X, normals=False):
+        """ Evaluate a batch of designs given as rows of flattened
+            parameter vectors (see getParameterLayout); the Qs of each
+            design are computed incrementally, and then each composite
+            operator J0 M, Ju M, and Jv M is applied once to the block of
+            all DOF vectors; the current parameters are restored afterwards
+
+        Output
+
+        Q: double(ndesign,nQ,3)
+        P0: double(ndesign,nP0,3)
+        N: double(ndesign,nP0,3), if normals
+            Unit normals
+
+        """
+
+        oml0 = self.oml0
+        X = numpy.atleast_2d(X)
+        ndesign = X.shape[0]
+        nP0 = int(oml0.Np0[-1])
+        x0 = self.getParameters()
+        self.updateQs()
+
+        Q = numpy.zeros((oml0.nQ,ndesign,3))
+        for d in range(ndesign):
+            self.setParameters(X[d])
+            self.updateQs()
+            Q[:,d,:] = oml0.Q[:,:3]
+        self.setParameters(x0)
+        self.updateQs()
+
+        Ps = []
+        for A in oml0.getComposites()[:3 if normals else 1]:
+            P = numpy.zeros((nP0,ndesign,3))
+            PUBSlib.cscmatmat(A.shape[0], A.shape[1], A.nnz, 3*ndesign, A.indptr, A.indices, A.data, Q.reshape((oml0.nQ,3*ndesign)).T, P.reshape((nP0,3*ndesign)).T)
+            Ps.append(P)
+
+        outputs = [Q, Ps[0]]
+        if normals:
+            N = numpy.cross(Ps[1], Ps[2])
+            N /= numpy.sum(N**2,axis=2)[:,:,None]**0.5
+            outputs.append(N)
+        return [A.transpose(1,0,2) for A in outputs]
+
+    def getDirtyComps(self):
+        """ Return indices of dirty components, including junctions
+            and cones whose parent components are dirty """
+
+        comps = [self.comps[name] for name in self.keys]
+        return self.getDependents([comp for comp in comps if comp.isDirty()])
+
+    def getDependents(self, seeds):
+        """ Return indices of the seed components and of all components
+            whose computeQs reads from them """
+
+        inds = []
+        changed = []
+        for k in range(len(self.comps)):
+            comp = self.comps[self.keys[k]]
+            deps = [dep for dep in comp.getDependencies() if dep in changed]
+            if comp in seeds or len(deps) > 0:
+                inds.append(k)
+                changed.append(comp)
+        return inds
+
+    def computeQowners(self):
+        """ For each component face, mask its DOF mapping down to the
+            rows of Q that it writes last in propagateQs """
+
+        owner = -numpy.ones(self.oml0.nQ, int)
+        index = 0
+        for k in range(len(self.comps)):
+            for N in self.comps[self.keys[k]].Ns:
+                inds = N[:,:,0][N[:,:,0] != -1]
+                owner[inds] = index
+                index += 1
+        self.Qowners = []
+        index = 0
+        for k in range(len(self.comps)):
+            Ns = []
+            for N in self.comps[self.keys[k]].Ns:
+                N = numpy.array(N, order='F')
+                inds = N[:,:,0]
+                inds[(inds != -1) & (owner[inds] != index)] = -1
+                Ns.append(N)
+                index += 1
+            self.Qowners.append(Ns)
+
     def computeVs(self):
         for k in range(len(self.comps)):
             self.comps[self.keys[k]].computeVs()
+            self.comps[self.keys[k]].dirty = True
 
     def computeQs(self, full=True, comp=None):
         if full:
             for k in range(len(self.comps)):
                 self.comps[self.keys[k]].computeQs()
+                self.comps[self.keys[k]].dirty = True
         else:
             for k in range(self.nprim,len(self.comps)):
                 if self.keys[k] != comp:
                     self.comps[self.keys[k]].computeQs()
+                    self.comps[self.keys[k]].dirty = True
 
-    def propagateQs(self):
-        self.oml0.Q[:,:3] = 0.0
-        for k in range(len(self.comps)):
-            self.comps[self.keys[k]].propagateQs()
+    def propagateQs(self, comps=None):
+        """ Write component Qs into oml0.Q; if comps is given, only
+            the rows owned by those components are rewritten """
+
+        oml0 = self.oml0
+        if comps is None:
+            oml0.Q[:,:3] = 0.0
+            for k in range(len(self.comps)):
+                self.comps[self.keys[k]].propagateQs()
+        else:
+            for k in comps:
+                Qs = self.comps[self.keys[k]].Qs
+                Ns = self.Qowners[k]
+                for f in range(len(Ns)):
+                    PGMlib.updateqs(oml0.nQ, Ns[f].shape[0], Ns[f].shape[1], oml0.nvar, Ns[f], Qs[f], oml0.Q)
 
     def getDerivatives(self, c, p, ind, clean=True, FD=False, h=1e-5):
         comp = self.comps[c]
@@ -212,6 +386,175 @@ class Configuration(object):
                         print good, ' ', c, ' ', p, ' ', ind, ' ', error #t1-t0, t2-t1
         self.computePoints()
 
+    def getParameterLayout(self):
+        """ Return (name, start, shape) for each parameter in the flattened
+            parameter vector; each P[:,:,0] is stored in C order """
+
+        layout = []
+        start = 0
+        for c in self.keys:
+            params = self.comps[c].params
+            for p in sorted(params.keys()):
+                shape = params[p].P.shape[:2]
+                layout.append((c+'.'+p, start, shape))
+                start += shape[0]*shape[1]
+        return layout
+
+    def getParameters(self):
+        """ Return the flattened parameter vector """
+
+        x = []
+        for c in self.keys:
+            params = self.comps[c].params
+            for p in sorted(params.keys()):
+                x.append(params[p].P[:,:,0].flatten())
+        return numpy.concatenate(x) if len(x) > 0 else numpy.zeros(0)
+
+    def setParameters(self, x):
+        """ Set all parameters from a flattened vector; only the
+            parameters whose values change are marked dirty """
+
+        for name, start, shape in self.getParameterLayout():
+            c, p = name.split('.', 1)
+            par = self.comps[c].params[p]
+            P = numpy.array(x[start:start+shape[0]*shape[1]]).reshape(shape)
+            if numpy.any(par.P[:,:,0] != P):
+                par.setP(P)
+
+    def getJacobian(self):
+        """ Return the sparse Jacobians of oml0.Q[:,:3] and oml0.P0[:,:3]
+            with respect to the flattened parameter vector; row 3*i+k is
+            coordinate k of entry i. Kept until the model changes. """
+
+        if self.getDirtyComps() != []:
+            self.computePoints()
+        if self.jacobian is None:
+            dQ = self.computeJacobian()
+            oml0 = self.oml0
+            J0M = oml0.J0.dot(oml0.M).tocsr()
+            dQ3 = dQ.tocsr()
+            dP0 = [J0M.dot(dQ3[k::3]) for k in range(3)]
+            order = numpy.argsort(numpy.arange(3*J0M.shape[0]) % 3, kind='mergesort')
+            dP0 = scipy.sparse.vstack(dP0, format='csr')[numpy.argsort(order)].tocsc()
+            self.jacobian = [dQ, dP0]
+        return self.jacobian
+
+    def computeJacobian(self):
+        """ Assemble dQ/dparams one column at a time by linearizing the
+            owning component and re-evaluating only its dependents """
+
+        oml0 = self.oml0
+        layout = self.getParameterLayout()
+        nparam = layout[-1][1] + layout[-1][2][0]*layout[-1][2][1] if len(layout) > 0 else 0
+
+        Ja = []
+        Ji = []
+        Jj = []
+        col = 0
+        for k in range(len(self.comps)):
+            comp = self.comps[self.keys[k]]
+            deps = self.getDependents([comp])
+            Q0s = [[numpy.array(Q) for Q in self.comps[self.keys[d]].Qs] for d in deps]
+            for p in sorted(comp.params.keys()):
+                par = comp.params[p]
+                dV = par.computeJacobian()
+                for i in range(dV.shape[2]):
+                    for j in range(dV.shape[3]):
+                        dQs_dv = getattr(comp, 'dQs_dv', None)
+                        comp.setDerivatives(par.var, numpy.array(dV[:,:,i,j], order='F'))
+                        if dQs_dv is not None:
+                            comp.dQs_dv = dQs_dv
+                        for d in deps[1:]:
+                            self.comps[self.keys[d]].computeQs()
+                        for d in range(len(deps)):
+                            Qs = self.comps[self.keys[deps[d]]].Qs
+                            Ns = self.Qowners[deps[d]]
+                            for f in range(len(Ns)):
+                                dQ = Qs[f] - Q0s[d][f]
+                                Qs[f][:,:,:] = Q0s[d][f]
+                                mask = (Ns[f][:,:,0] != -1)
+                                rows = Ns[f][:,:,0][mask]
+                                for c in range(3):
+                                    vals = dQ[:,:,c][mask]
+                                    nz = vals != 0
+                                    Ja.append(vals[nz])
+                                    Ji.append(3*rows[nz] + c)
+                                    Jj.append(col*numpy.ones(numpy.sum(nz), int))
+                        col += 1
+
+        Ja = numpy.concatenate(Ja) if len(Ja) > 0 else numpy.zeros(0)
+        Ji = numpy.concatenate(Ji) if len(Ji) > 0 else numpy.zeros(0, int)
+        Jj = numpy.concatenate(Jj) if len(Jj) > 0 else numpy.zeros(0, int)
+        return scipy.sparse.csc_matrix((Ja,(Ji,Jj)),shape=(3*oml0.nQ,nparam))
+
+    def getGradient(self, P0bar=None, Qbar=None):
+        """ Return dF/dparams for a scalar F given dF/dP0 and/or dF/dQ
+            (first 3 columns used) by pushing the seeds back through
+            J0, M, propagateQs, the components, and Parameter.compute """
+
+        if self.getDirtyComps() != []:
+            self.computePoints()
+        oml0 = self.oml0
+        inds = dict([(id(self.comps[self.keys[k]]), k) for k in range(len(self.comps))])
+
+        if Qbar is None:
+            Qbar = numpy.zeros((oml0.nQ,3))
+        else:
+            Qbar = numpy.array(Qbar[:,:3])
+        if P0bar is not None:
+            Qbar += oml0.M.T.dot(oml0.J0.T.dot(P0bar[:,:3]))
+
+        Qsbar = []
+        for k in range(len(self.comps)):
+            Qsbar.append([])
+            for N in self.Qowners[k]:
+                mask = N[:,:,0] != -1
+                Q = numpy.zeros((N.shape[0],N.shape[1],3))
+                Q[mask] = Qbar[N[:,:,0][mask]]
+                Qsbar[k].append(Q)
+
+        for k in range(len(self.comps))[::-1]:
+            comp = self.comps[self.keys[k]]
+            if not hasattr(comp, 'computeLinearization'):
+                continue
+            if k not in self.linearizations:
+                self.linearizations[k] = comp.computeLinearization()
+            deps, A = self.linearizations[k]
+            g = A.T.dot(Qsbar[k][0].flatten(order='F'))
+            start = 0
+            for dep in deps:
+                kd = inds[id(dep)]
+                for f in range(len(dep.Qs)):
+                    size = dep.Qs[f].size
+                    Qsbar[kd][f] += g[start:start+size].reshape(dep.Qs[f].shape)
+                    start += size
+
+        layout = self.getParameterLayout()
+        grad = numpy.zeros(layout[-1][1] + layout[-1][2][0]*layout[-1][2][1] if len(layout) > 0 else 0)
+        col = 0
+        for k in range(len(self.comps)):
+            comp = self.comps[self.keys[k]]
+            Vbar = comp.computeAdjoint(Qsbar[k])
+            Q0s = [numpy.array(Q) for Q in comp.Qs]
+            for p in sorted(comp.params.keys()):
+                par = comp.params[p]
+                dV = par.computeJacobian()
+                size = dV.shape[2]*dV.shape[3]
+                if par.var in Vbar:
+                    grad[col:col+size] = numpy.tensordot(Vbar[par.var], dV, axes=([0,1],[0,1])).flatten()
+                else:
+                    for i in range(dV.shape[2]):
+                        for j in range(dV.shape[3]):
+                            dQs_dv = getattr(comp, 'dQs_dv', None)
+                            comp.setDerivatives(par.var, numpy.array(dV[:,:,i,j], order='F'))
+                            if dQs_dv is not None:
+                                comp.dQs_dv = dQs_dv
+                            for f in range(len(Q0s)):
+                                grad[col+i*dV.shape[3]+j] += numpy.sum(Qsbar[k][f]*(comp.Qs[f] - Q0s[f]))
+                                comp.Qs[f][:,:,:] = Q0s[f]
+                col += size
+        return grad
+
     def getDerivatives0(self, comp, var, ind, clean=True, FD=False, h=1e-5):
         self.computeQs()
         self.propagateQs()
@@ -374,11 +717,10 @@ class Configuration(object):
 
 
 
-        Ps = numpy.zeros((oml0.nsurf,3,3,3),order='F')
-        for s in range(oml0.nsurf):
-            for i in range(3):
-                for j in range(3):
-                    Ps[s,i,j] = oml0.evaluatePoint(s,i/2.0,j/2.0)[:3]
+        surf = numpy.repeat(numpy.arange(oml0.nsurf), 9)
+        u = numpy.tile(numpy.repeat([0,0.5,1],3), oml0.nsurf)
+        v = numpy.tile([0,0.5,1], 3*oml0.nsurf)
+        Ps = numpy.array(oml0.evaluatePoints(surf,u,v)[:,:3].reshape((oml0.nsurf,3,3,3)),order='F')
         nvertS,ngroupS,surf_vert,surf_group = PUBSlib.initializeconnectivities(oml0.nsurf,1e-13,1e-5,Ps)
 
         nvertM,ngroupM,mem_vert,mem_group = PSMlib.computemembertopology(nmem, faces, coords)
@@ -509,6 +851,15 @@ class Configuration(object):
 
                 
 
+def loadSnapshot(filename):
+    """ Return the configuration written by Configuration.saveSnapshot """
+
+    f = open(filename, 'rb')
+    config = cPickle.load(f)
+    f.close()
+    return config
+
+
 class GeoMACHGeometry(object):
     '''A wrapper for a GeoMACH object that respresents a specific instance of a
     geometry at a designated set of parameters. Parameters are not modifiable.
@@ -182,8 +182,14 @@ class Conventional(Configuration):
 
         self.computePoints()
 
-    def meshStructure(self):
-        afm = Airframe(self, 0.2)
+    def meshStructure(self, nproc=1):
+        afm = self.getAirframe(nproc)
+        afm.preview('conventional_pvw.dat')
+        afm.mesh()
+        afm.computeMesh('conventional_str.dat')
+
+    def getAirframe(self, nproc=1):
+        afm = Airframe(self, 0.2, nproc)
 
         idims = numpy.linspace(0.45,0.85,7)
         jdims = numpy.linspace(0,0.9,16)
@@ -258,9 +264,7 @@ class Conventional(Configuration):
         for j in range(jdims.shape[0]-1):
             afm.addVertFlip('Mfu_0:'+str(j),'fu',[0.4,jdims[j]],[0.4,jdims[j+1]],w=[1.0,0.0],i=[0,2])
 
-        afm.preview('conventional_pvw.dat')
-        afm.mesh()
-        afm.computeMesh('conventional_str.dat')
+        return afm
 
 if __name__ == '__main__':
 
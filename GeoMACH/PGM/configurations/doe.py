@@ -0,0 +1,68 @@
+from __future__ import division
+import numpy
+import multiprocessing
+
+
+# The configuration being swept; forked workers inherit it, so the PUBS
+# operators, index tables, and DOF mappings stay in pages shared with the
+# parent instead of being pickled or rebuilt in each worker
+_sweep = None
+
+
+def _evaluateChunk(chunk):
+    """ Evaluate the designs of one chunk in a worker """
+
+    config, reduce, normals, X = _sweep
+    i0, i1 = chunk
+    outputs = config.evaluateDesigns(X[i0:i1], normals)
+    results = []
+    for d in range(i1 - i0):
+        args = [A[d] for A in outputs]
+        results.append(args[1] if reduce is None else reduce(*args))
+    return i0, results
+
+
+def runDOE(config, X, reduce=None, nproc=None, chunk=4, normals=False):
+    """ Evaluate the designs given as rows of flattened parameter vectors
+        (see Configuration.getParameterLayout) on a pool of nproc forked
+        workers, yielding (index, result) in order as the chunks finish
+
+    Input
+
+    config: Configuration
+        Fully assembled configuration; it is not modified
+    X: double(ndesign,nparam)
+        Parameter vectors
+    reduce: function
+        If given, result = reduce(Q, P0) or reduce(Q, P0, N) is computed
+        in the worker; otherwise, result = P0 with shape (nP0,3)
+    nproc: integer
+        Number of workers; None for all cores, 1 to run in this process
+    chunk: integer
+        Number of designs per task, evaluated as one batch
+    normals: boolean
+        Whether to compute the unit normals N passed to reduce
+
+    """
+
+    global _sweep
+    X = numpy.atleast_2d(X)
+    chunks = [(i0, min(i0+chunk, X.shape[0])) for i0 in range(0, X.shape[0], chunk)]
+    config.oml0.getComposites()
+    _sweep = [config, reduce, normals, X]
+    try:
+        if nproc == 1:
+            for i0, results in (_evaluateChunk(c) for c in chunks):
+                for d in range(len(results)):
+                    yield i0 + d, results[d]
+        else:
+            pool = multiprocessing.Pool(nproc)
+            try:
+                for i0, results in pool.imap(_evaluateChunk, chunks):
+                    for d in range(len(results)):
+                        yield i0 + d, results[d]
+            finally:
+                pool.terminate()
+                pool.join()
+    finally:
+        _sweep = None
@@ -2,6 +2,7 @@ from __future__ import division
 import numpy
 import time
 import scipy.sparse
+import multiprocessing
 import pylab
 
 from GeoMACH.PUBS import PUBSlib
@@ -9,12 +10,53 @@ from GeoMACH.PSM import PSMlib, QUADlib, CDTlib
 from QUAD import QUAD
 
 
+def premeshFace(task):
+    """ Intersect the edges of a face """
+
+    edges, = task
+    quad = QUAD()
+    quad.importEdges(edges)
+    quad.addIntersectionPts()
+    quad.removeDuplicateVerts()
+    return quad.verts, quad.edges
+
+
+def splitFace(task):
+    """ Split the edges of a face at the group intersections """
+
+    verts, edges = task
+    quad = QUAD()
+    quad.importVertsNEdges(verts, edges)
+    quad.removeDuplicateVerts()
+    quad.splitEdges()
+    quad.removeDuplicateEdges()
+    return quad.verts, quad.edges
+
+
+def meshPatch(task):
+    """ Mesh a skin surface or a member given its edges, and optionally,
+        its vertices """
+
+    verts, edges, maxL, lengths = task
+    quad = QUAD()
+    if verts is None:
+        quad.importEdges(edges)
+    else:
+        quad.importVertsNEdges(verts, edges)
+    return quad.mesh(maxL, lengths)
+
+
 class Airframe(object):
 
-    def __init__(self, geometry, maxL):
+    def __init__(self, geometry, maxL, nproc=1):
+        """ nproc is the number of processes that mesh the faces, skin
+            surfaces, and members; each task uses its own QUAD instance
+            and the results are merged in task order, so the mesh does not
+            depend on nproc """
+
         self.geometry = geometry
         self.maxL = maxL
-        self.quad = QUAD()
+        self.nproc = nproc
         self.members = []
         self.memberNames = []
 
@@ -60,7 +102,7 @@ class Airframe(object):
         self.importMembers()
         self.computePreviewMembers()
 
-        self.geometry.oml0.export.write2TecFEquads(filename,self.preview,self.geometry.oml0.var)
+        self.writeTecFEquads(filename,self.preview)
 
     def mesh(self):
         self.meshS = []
@@ -88,7 +130,27 @@ class Airframe(object):
         for i in range(self.nmem):
             mesh.append([self.memberNames[i], nodes2[nnode2[i]:nnode2[i+1]], quads2[i]])
 
-        self.geometry.oml0.export.write2TecFEquads(filename,mesh,self.geometry.oml0.var)
+        self.writeTecFEquads(filename,mesh)
+
+    def writeTecFEquads(self, filename, zones):
+        export = self.geometry.oml0.export
+        if filename[-4:]=='.plt':
+            export.write2TecFEquadsBinary(filename,zones,self.geometry.oml0.var)
+        else:
+            export.write2TecFEquads(filename,zones,self.geometry.oml0.var)
+
+    def mapTasks(self, function, tasks):
+        """ Return [function(task) for task in tasks], evaluated on a pool
+            of nproc processes if nproc is not 1 """
+
+        if self.nproc == 1 or len(tasks) < 2:
+            return [function(task) for task in tasks]
+        pool = multiprocessing.Pool(self.nproc)
+        try:
+            return pool.map(function, tasks)
+        finally:
+            pool.terminate()
+            pool.join()
 
     def computePreviewSurfaces(self):
         oml0 = self.geometry.oml0
@@ -170,36 +232,37 @@ class Airframe(object):
         self.membersInt = membersInt
         self.membersFlt = membersFlt
 
+    def assembleNodeBases(self, nnode, points):
+        """ Return the nnode x nC matrix mapping control points to nodes;
+            points holds [node, weight, s, u, v] arrays from each source
+            and surface, and their bases are evaluated together and
+            scattered into the node rows by a single weighted product """
+
+        oml0 = self.geometry.oml0
+
+        if points == []:
+            return scipy.sparse.csr_matrix((nnode,oml0.C.shape[0]))
+        node, weight, s, u, v = [numpy.hstack(A) for A in zip(*points)]
+        B = oml0.evaluateBases(s, u, v)
+        W = scipy.sparse.csr_matrix((weight,(node,numpy.arange(node.shape[0]))),shape=(nnode,node.shape[0]))
+        return W.dot(B)
+
     def computePreviewMembers(self):
         nmem = self.nmem
         oml0 = self.geometry.oml0
 
         quads, Wa = PSMlib.computepreviewmemberweights(nmem, 4*nmem, self.membersFlt)
-        linW = numpy.linspace(0,4*nmem-1,4*nmem)
 
-        B0 = scipy.sparse.csr_matrix((4*nmem,oml0.C.shape[0]))
+        points = []
         for src in range(4):
-            W = scipy.sparse.csr_matrix((Wa[:,src],(linW,linW)))
             for surf in range(oml0.nsurf):
                 npts = PSMlib.countpreviewmembers(surf+1, src+1, nmem, self.membersFlt)
                 if npts is not 0:
                     inds, P, Q = PSMlib.computepreviewmemberproj(surf+1, src+1, nmem, npts, self.membersFlt)
-                    Ta = numpy.ones(npts)
-                    Ti = inds - 1
-                    Tj = numpy.linspace(0,npts-1,npts)
-                    T = scipy.sparse.csr_matrix((Ta,(Ti,Tj)),shape=(4*nmem,npts))
-
-                    mu, mv = oml0.edgeProperty(surf,1)
-                    for u in range(mu):
-                        for v in range(mv):
-                            oml0.C[oml0.getIndex(surf,u,v,1),:3] = [u/(mu-1), v/(mv-1), 0]
-                    oml0.computePointsC()
+                    s,u,v = oml0.evaluateFlatProjection(surf, P)
+                    points.append([inds - 1, Wa[inds-1,src], s, u, v])
 
-                    s,u,v = oml0.evaluateProjection(P, [surf], Q)
-                    B = oml0.evaluateBases(s, u, v)
-                    B0 = B0 + W.dot(T.dot(B))
-
-        oml0.computePoints()
+        B0 = self.assembleNodeBases(4*nmem, points)
         nodes = B0.dot(oml0.C)
         self.memEdgeLengths = PSMlib.computeedgelengths(nodes.shape[1],nmem,nodes,quads)
 
@@ -209,11 +272,10 @@ class Airframe(object):
         nmem = self.nmem
         oml0 = self.geometry.oml0
 
-        Ps = numpy.zeros((oml0.nsurf,3,3,3),order='F')
-        for s in range(oml0.nsurf):
-            for i in range(3):
-                for j in range(3):
-                    Ps[s,i,j] = oml0.evaluatePoint(s,i/2.0,j/2.0)[:3]
+        surf = numpy.repeat(numpy.arange(oml0.nsurf), 9)
+        u = numpy.tile(numpy.repeat([0,0.5,1],3), oml0.nsurf)
+        v = numpy.tile([0,0.5,1], 3*oml0.nsurf)
+        Ps = numpy.array(oml0.evaluatePoints(surf,u,v)[:,:3].reshape((oml0.nsurf,3,3,3)),order='F')
         nvertS,ngroupS,surf_vert,surf_group = PUBSlib.initializeconnectivities(oml0.nsurf,1e-13,1e-5,Ps)
         nvertM,ngroupM,mem_vert,mem_group = PSMlib.computemembertopology(nmem, self.membersInt, self.membersFlt)
         mem_group[:,:,:] += ngroupS
@@ -234,14 +296,13 @@ class Airframe(object):
 
     def computeGroupIntersections(self):
         geometry = self.geometry
-        quad = self.quad
         nsurf = geometry.oml0.nsurf
         nmem = self.nmem
         ngroup = self.ngroupS + self.ngroupM
         nadj = self.adjoiningInt.shape[0]
 
+        tasks = []
         premeshFaces = []
-        groupIntCount = numpy.zeros(ngroup,int)
         for k in range(len(geometry.comps)):
             comp = geometry.comps[geometry.keys[k]]
             for f in range(len(comp.Ks)):
@@ -249,14 +310,15 @@ class Airframe(object):
                 idims, jdims = self.faceDims[k][f]
                 nedge = PSMlib.countfaceedges(k+1, f+1, ni, nj, nadj, self.adjoiningInt)
                 edge_group, edgeLengths, edges = PSMlib.computefaceedges(k+1, f+1, ni, nj, nsurf, nmem, nadj, nedge, idims, jdims, comp.Ks[f]+1, self.surf_group, self.mem_group, self.adjoiningInt, self.adjoiningFlt, self.surfEdgeLengths, self.memEdgeLengths)
-                quad.importEdges(edges)
-                quad.addIntersectionPts()
-                quad.removeDuplicateVerts()
-                verts, edges = quad.verts, quad.edges
+                tasks.append([edges])
+                premeshFaces.append([None,None,edge_group,edgeLengths])
 
-                groupIntCount = PSMlib.countgroupintersections(verts.shape[0], edges.shape[0], ngroup, verts, edges, edge_group, groupIntCount)
-
-                premeshFaces.append([verts,edges,edge_group,edgeLengths])
+        groupIntCount = numpy.zeros(ngroup,int)
+        for iList, (verts, edges) in enumerate(self.mapTasks(premeshFace, tasks)):
+            edge_group = premeshFaces[iList][2]
+            groupIntCount = PSMlib.countgroupintersections(verts.shape[0], edges.shape[0], ngroup, verts, edges, edge_group, groupIntCount)
+            premeshFaces[iList][0] = verts
+            premeshFaces[iList][1] = edges
 
         groupIntPtr = PSMlib.computegroupintptr(ngroup, groupIntCount)
         nint = groupIntPtr[-1,-1]
@@ -285,7 +347,6 @@ class Airframe(object):
 
     def computeFaces(self):
         geometry = self.geometry
-        quad = self.quad
         ngroup = self.ngroupS + self.ngroupM
         premeshFaces = self.premeshFaces
         groupIntPtr = self.groupIntPtr
@@ -295,31 +356,24 @@ class Airframe(object):
         nint = groupIntPtr[-1,-1]
         nsplit = groupSplitPtr[-1,-1]
 
-        iList = 0
-        for k in range(len(geometry.comps)):
-            comp = geometry.comps[geometry.keys[k]]
-            for f in range(len(comp.Ks)):
-                verts,edges,edge_group,edgeLengths = premeshFaces[iList]
-                nvert = PSMlib.countintersectionverts(edges.shape[0], ngroup, edge_group, groupIntPtr, groupSplitPtr)
-                verts = PSMlib.computeintersectionverts(verts.shape[0], edges.shape[0], ngroup, nint, nsplit, nvert + verts.shape[0], verts, edges, edge_group, groupIntPtr, groupInts, groupSplitPtr, groupSplits)
-                quad.importVertsNEdges(verts, edges)
-                quad.removeDuplicateVerts()
-                quad.splitEdges()
-                quad.removeDuplicateEdges()
-                premeshFaces[iList][0] = quad.verts
-                premeshFaces[iList][1] = quad.edges
-                iList += 1
+        tasks = []
+        for verts,edges,edge_group,edgeLengths in premeshFaces:
+            nvert = PSMlib.countintersectionverts(edges.shape[0], ngroup, edge_group, groupIntPtr, groupSplitPtr)
+            verts = PSMlib.computeintersectionverts(verts.shape[0], edges.shape[0], ngroup, nint, nsplit, nvert + verts.shape[0], verts, edges, edge_group, groupIntPtr, groupInts, groupSplitPtr, groupSplits)
+            tasks.append([verts, edges])
+
+        for iList, (verts, edges) in enumerate(self.mapTasks(splitFace, tasks)):
+            premeshFaces[iList][0] = verts
+            premeshFaces[iList][1] = edges
 
     def computeSurfaces(self):
         geometry = self.geometry
         oml0 = geometry.oml0
-        quad = self.quad
         premeshFaces = self.premeshFaces
 
         self.surfaceNames = []
-        B0 = []
-        quads0 = []
-        nnode0 = [0]
+        surfs = []
+        tasks = []
         iList = 0
         for k in range(len(geometry.comps)):
             comp = geometry.comps[geometry.keys[k]]
@@ -337,31 +391,24 @@ class Airframe(object):
                         if oml0.visible[surf]:
                             nedge1 = PSMlib.countsurfaceedges(nvert, nedge, idims[i], idims[i+1], jdims[j], jdims[j+1], verts, edges)
                             edges1 = PSMlib.computesurfaceedges(nvert, nedge, nedge1, idims[i], idims[i+1], jdims[j], jdims[j+1], verts, edges)
-
                             print geometry.keys[k], f, i, j
-                            quad.importEdges(edges1)
-                            if geometry.keys[k]=='fu' and f==1 and i==0 and j==0:
-                                nodes, quads = quad.mesh(self.maxL, self.surfEdgeLengths[surf,:,:])#,True,True)
-                            else:
-                                nodes, quads = quad.mesh(self.maxL, self.surfEdgeLengths[surf,:,:])
-                            
-                            mu, mv = oml0.edgeProperty(surf,1)
-                            for u in range(mu):
-                                for v in range(mv):
-                                    oml0.C[oml0.getIndex(surf,u,v,1),:3] = [u/(mu-1), v/(mv-1), 0]
-                            oml0.computePointsC()
-
-                            P0, Q = PSMlib.computesurfaceprojections(nodes.shape[0], nodes)
-                            s,u,v = oml0.evaluateProjection(P0, [surf], Q)
-
-                            B = oml0.evaluateBases(s,u,v)
-
                             name = geometry.keys[k] + ':' + str(f) + '-' + str(i) + '-' + str(j)
-
                             self.surfaceNames.append(name)
-                            B0.append(B)
-                            nnode0.append(nnode0[-1] + P0.shape[0])
-                            quads0.append(quads)
+                            surfs.append(surf)
+                            tasks.append([None, edges1, self.maxL, self.surfEdgeLengths[surf,:,:]])
+
+        B0 = []
+        quads0 = []
+        nnode0 = [0]
+        for surf, (nodes, quads) in zip(surfs, self.mapTasks(meshPatch, tasks)):
+            P0, Q = PSMlib.computesurfaceprojections(nodes.shape[0], nodes)
+            s,u,v = oml0.evaluateFlatProjection(surf, P0)
+
+            B = oml0.evaluateBases(s,u,v)
+
+            B0.append(B)
+            nnode0.append(nnode0[-1] + P0.shape[0])
+            quads0.append(quads)
 
         B0 = scipy.sparse.vstack(B0)
 
@@ -375,24 +422,26 @@ class Airframe(object):
         groupInts = self.groupInts
         groupSplitPtr = self.groupSplitPtr
         groupSplits = self.groupSplits
-        quad = self.quad
         ngroup = self.ngroupS + self.ngroupM
         nint = groupIntPtr[-1,-1]
         nsplit = groupSplitPtr[-1,-1]
 
-        nodesInt0 = []
-        nodesFlt0 = []
-        quads0 = []
-        nnode0 = [0]
+        tasks = []
         for imem in range(nmem):
             print 'Computing internal members:', self.memberNames[imem]
             edges, edge_group = PSMlib.computememberedges(imem+1, nmem, self.mem_group)
+            quad = QUAD()
             quad.importEdges(edges)
             verts, edges = quad.verts, quad.edges
             nvert = PSMlib.countintersectionverts(edges.shape[0], ngroup, edge_group, groupIntPtr, groupSplitPtr)
             verts = PSMlib.computeintersectionverts(verts.shape[0], edges.shape[0], ngroup, nint, nsplit, nvert + verts.shape[0], verts, edges, edge_group, groupIntPtr, groupInts, groupSplitPtr, groupSplits)
-            quad.importVertsNEdges(verts, edges)
-            nodes, quads = quad.mesh(self.maxL, self.memEdgeLengths[imem,:,:])
+            tasks.append([verts, edges, self.maxL, self.memEdgeLengths[imem,:,:]])
+
+        nodesInt0 = []
+        nodesFlt0 = []
+        quads0 = []
+        nnode0 = [0]
+        for imem, (nodes, quads) in enumerate(self.mapTasks(meshPatch, tasks)):
             nodesInt, nodesFlt = PSMlib.computemembernodes(imem+1, nmem, nodes.shape[0], self.membersInt, self.membersFlt, nodes)
             nodesInt0.append(nodesInt)
             nodesFlt0.append(nodesFlt)
@@ -410,27 +459,14 @@ class Airframe(object):
                 idims, jdims = self.faceDims[k][f]
                 PSMlib.computememberlocalcoords(k+1, f+1, ni, nj, nnode, idims, jdims, comp.Ks[f]+1, nodesInt, nodesFlt)
 
-        linW = numpy.linspace(0,nnode-1,nnode)
-        B0 = scipy.sparse.csr_matrix((nnode,oml0.C.shape[0]))
+        points = []
         for src in range(4):
-            W = scipy.sparse.csr_matrix((nodesFlt[:,src,0],(linW,linW)))
             for surf in range(oml0.nsurf):
                 npts = PSMlib.countmembers(surf+1, src+1, nnode, nodesInt)
                 if npts is not 0:
                     inds, P, Q = PSMlib.computememberproj(surf+1, src+1, nnode, npts, nodesInt, nodesFlt)
-                    Ta = numpy.ones(npts)
-                    Ti = inds - 1
-                    Tj = numpy.linspace(0,npts-1,npts)
-                    T = scipy.sparse.csr_matrix((Ta,(Ti,Tj)),shape=(nnode,npts))
-
-                    mu, mv = oml0.edgeProperty(surf,1)
-                    for u in range(mu):
-                        for v in range(mv):
-                            oml0.C[oml0.getIndex(surf,u,v,1),:3] = [u/(mu-1), v/(mv-1), 0]
-                    oml0.computePointsC()
-
-                    s,u,v = oml0.evaluateProjection(P, [surf], Q)
-                    B = oml0.evaluateBases(s, u, v)
-                    B0 = B0 + W.dot(T.dot(B))
+                    s,u,v = oml0.evaluateFlatProjection(surf, P)
+                    points.append([inds - 1, nodesFlt[inds-1,src,0], s, u, v])
 
+        B0 = self.assembleNodeBases(nnode, points)
         self.meshM = [B0, quads0, nnode0]
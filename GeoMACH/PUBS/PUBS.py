@@ -1,6 +1,6 @@
 from __future__ import division
-import numpy, time
-import scipy.sparse, scipy.sparse.linalg
+import numpy, time, os, hashlib
+import scipy.sparse, scipy.sparse.linalg, scipy.spatial
 
 from GeoMACH.PUBS import PUBSlib, PUBSexport
 
@@ -26,6 +26,13 @@ class PUBS(object):
         Jacobian of control points with respect to DOFs
     JM: sparse double(nP,nQ)
         Jacobian of points with respect to DOFs
+    tensor: boolean
+        If True, P0 grids are evaluated as Bu C Bv^T from per-group 1-D
+        bases, and J0, Ju, and Jv are only assembled when accessed
+    cacheDir: string
+        Class attribute; if not None, assembled models and Jacobians are
+        stored in and loaded from content-addressed .npz files in this
+        directory, keyed by a hash of the surfaces or discretization
 
     surf_index_Q: integer(nsurf,2)
         First-1 and last index of the interior Qs for each surface in the global list of Qs
@@ -57,6 +64,10 @@ class PUBS(object):
 
     """
 
+    cacheDir = None
+    shared = ['T', 'P0surf', 'P0u', 'P0v']
+    transient = ['export', 'patterns', 'pjtnTrees', 'triCache', 'visBases', 'composites', 'ATAsolve', 'tensorBases', 'J0', 'Ju', 'Jv']
+
     def __init__(self, P_arrays, ratio=3.0, printInfo=False):
         """ Create an instance by specifying a list of surfaces
 
@@ -78,12 +89,24 @@ class PUBS(object):
         self.nvar = 6
         self.var = ['x','y','z','nx','ny','nz']
         self.symmPlane = 2
+        self.incremental = True
+        self.tensor = False
+        self.patterns = {}
+        key = None
+        if self.cacheDir is not None:
+            key = self.computeHash(ratio, *P_arrays)
+            state = self.loadCache('model', key)
+            if state is not None:
+                self.setState(state)
+                return
         self.__initializeTopology(P_arrays, ratio)
         self.update()
         self.__initializePoints(P_arrays)
         self.computeControlPts()
         self.computePoints()
         self.visible = numpy.ones(len(P_arrays),bool)
+        if key is not None:
+            self.saveCache('model', key, self.getState())
 
     def addVars(self, var):
         self.var.extend(var)
@@ -248,70 +271,594 @@ class PUBS(object):
         self.T = PUBSlib.computeparameters(self.nT, self.nD, self.nsurf, self.nedge, self.ngroup, self.surf_edge, self.edge_group, self.group_k, self.group_m, self.group_n, self.group_d, self.knot_index)
         
     def computeJacobian(self):
-        """ Compute the global Jacobian """
-
-        self.nJ = PUBSlib.computejnnz(self.nsurf,self.nedge,self.ngroup,self.nvert,self.surf_edge,self.edge_group,self.group_k,self.group_n,self.edge_count)
-        Ja, Ji, Jj = PUBSlib.computejacobian(self.nJ, self.nT, self.nD, self.nsurf, self.nedge, self.ngroup, self.nvert, self.surf_vert, self.surf_edge, self.edge_group, self.group_k, self.group_m, self.group_n, self.group_d, self.surf_index_P, self.edge_index_P, self.surf_index_C, self.edge_index_C, self.knot_index, self.edge_count, self.T)
-        self.J = scipy.sparse.csc_matrix((Ja,(Ji,Jj)))
+        """ Compute the global Jacobian; if only the k, m, or n of some groups
+            changed since the last call, only the rows of the edges and
+            surfaces touching those groups are re-assembled and the rest
+            are renumbered; if none changed, the sparsity patterns of the
+            last call are reused and only the data arrays are refreshed """
 
         self.Nuv = PUBSlib.getsurfacesizes(self.nsurf, self.nedge, self.ngroup, self.surf_edge, self.edge_group, self.group_n)
         self.Np0 = numpy.zeros(self.nsurf+1)
         for s in range(self.nsurf+1):
             self.Np0[s] = int(sum(self.Nuv[:s,0]*self.Nuv[:s,1]))
-        surf = numpy.zeros(self.Np0[-1],int)
-        u = numpy.zeros(self.Np0[-1])
-        v = numpy.zeros(self.Np0[-1])
-        for s in range(self.nsurf):
-            T = PUBSlib.getsurfacet(s+1, self.Nuv[s,0], self.Nuv[s,1], self.nT, self.nsurf, self.nedge, self.surf_edge, self.surf_index_P, self.edge_index_P, self.T)
-            surf[self.Np0[s]:self.Np0[s+1]] = s
-            u[self.Np0[s]:self.Np0[s+1]] = T[:,:,0].flatten(order='F')
-            v[self.Np0[s]:self.Np0[s+1]] = T[:,:,1].flatten(order='F')
-        self.J0 = self.evaluateBases(surf, u, v, 0, 0)
-        self.Ju = self.evaluateBases(surf, u, v, 1, 0)
-        self.Jv = self.evaluateBases(surf, u, v, 0, 1)
+        layout = self.__getLayout()
+        groups = self.__getDirtyGroups(layout)
+        if groups is not None and groups.shape[0] == 0:
+            groups = None
+        key = layout['kmn'].tostring()
+        old = self.__dict__.get('layout')
+        self.layout = layout
+        self.pjtnTrees = {}
+        self.visBases = None
+        self.triCache = {}
+        if self.__loadJacobian(key):
+            return
+
+        self.nJ = PUBSlib.computejnnz(self.nsurf,self.nedge,self.ngroup,self.nvert,self.surf_edge,self.edge_group,self.group_k,self.group_n,self.edge_count)
+        if groups is None:
+            full = not self.tensor
+            self.P0surf, self.P0u, self.P0v, Js = self.evaluateGridBases(range(self.nsurf), full)
+            Ja, Ji, Jj = PUBSlib.computejacobian(self.nJ, self.nT, self.nD, self.nsurf, self.nedge, self.ngroup, self.nvert, self.surf_vert, self.surf_edge, self.edge_group, self.group_k, self.group_m, self.group_n, self.group_d, self.surf_index_P, self.edge_index_P, self.surf_index_C, self.edge_index_C, self.knot_index, self.edge_count, self.T)
+            self.J = self.assembleCSC('J', key, Ja, Ji, Jj, (self.nP,self.nC))
+            if full:
+                self.setGridBases(key, Js)
+        else:
+            self.__updateJacobian(old, layout, groups)
+            key = None
+        self.__resetTensorBases()
 
         self.nM = PUBSlib.computemnnz(self.nsurf,self.nedge,self.ngroup,self.nvert,self.surf_edge,self.edge_group,self.group_m,self.surf_index_C, self.edge_index_Q, self.vert_index_Q, self.edge_count, self.surf_c1, self.edge_c1)
         Ma, Mi, Mj = PUBSlib.computedofmapping(self.nM,self.nsurf,self.nedge,self.ngroup,self.nvert,self.surf_vert,self.surf_edge,self.edge_group,self.group_m,self.surf_index_C,self.edge_index_C,self.edge_index_Q,self.vert_index_Q, self.edge_count,self.surf_c1,self.edge_c1)
-        self.M = scipy.sparse.csc_matrix((Ma,(Mi,Mj)))
-        self.JM = self.J.dot(self.M)
+        c1 = layout['kmn'].tostring() + self.surf_c1.tostring() + self.edge_c1.tostring()
+        self.M = self.assembleCSC('M', c1, Ma, Mi, Mj, (self.nC,self.nQ))
+        self.JM = self.computeJM(None if key is None else c1)
+        self.composites = None
+        self.ATAsolve = None
+        if self.cacheDir is not None:
+            self.saveCache('jacobian', self.__getJacobianHash(), self.getState(['nJ','nM','J','M','JM']))
 
         if self.printInfo:
             print '# Jacobian non-zeros =',self.JM.nnz
 
-    def computeControlPts(self):
-        """ Perform fit to compute DOFs """
-        
-        nvar = self.nvar
-        AT = self.JM.transpose()
-        ATA = AT.dot(self.JM)
-        ATB = AT.dot(self.P)
-      
-        solver = 1
-        Q = numpy.zeros((self.nQ,nvar),order='F')  
-        if solver==1:
-            for i in range(nvar):
-                Q[:,i] = scipy.sparse.linalg.cg(ATA,ATB[:,i])[0]
-        elif solver==2:
-            for i in range(nvar):
-                Q[:,i] = scipy.sparse.linalg.gmres(ATA,ATB[:,i])[0]
+    def __loadJacobian(self, key):
+        """ Load J, M, and JM from the cache if this discretization was
+            assembled before; J0, Ju, and Jv are always re-evaluated """
+
+        if self.cacheDir is None:
+            return False
+        state = self.loadCache('jacobian', self.__getJacobianHash())
+        if state is None:
+            return False
+        self.setState(state)
+        for name in ['J','M','JM']:
+            self.patterns.pop(name, None)
+        self.P0surf, self.P0u, self.P0v, Js = self.evaluateGridBases(range(self.nsurf), not self.tensor)
+        if not self.tensor:
+            self.setGridBases(key, Js)
+        self.__resetTensorBases()
+        self.composites = None
+        self.ATAsolve = None
+        return True
+
+    def __resetTensorBases(self):
+        self.tensorBases = None
+        if self.tensor:
+            for name in ['J0','Ju','Jv']:
+                self.__dict__.pop(name, None)
+            self.patterns.pop('grid', None)
+            self.computeTensorBases()
+
+    def __getJacobianHash(self):
+        return self.computeHash(self.surf_vert, self.surf_edge, self.edge_group, self.edge_count, self.group_k, self.group_m, self.group_n, self.surf_c1, self.edge_c1)
+
+    def computeHash(self, *items):
+        """ Return the hex digest of the dtypes, shapes, and contents of
+            the given arrays or scalars """
+
+        h = hashlib.sha1()
+        for item in items:
+            A = numpy.ascontiguousarray(item)
+            h.update(str(A.dtype) + str(A.shape))
+            h.update(A.tostring())
+        return h.hexdigest()
+
+    def getState(self, names=None):
+        """ Return a flat dict of arrays holding the named attributes
+            (by default, all arrays, numbers, sparse matrices, string
+            lists, and dicts of arrays); caches, solvers, and J0, Ju, and
+            Jv, which are re-assembled on first use, are skipped """
+
+        if names is None:
+            names = [name for name in self.__dict__ if name not in self.transient]
+        state = {}
+        for name in names:
+            value = self.__dict__[name]
+            if scipy.sparse.isspmatrix_csc(value) or scipy.sparse.isspmatrix_csr(value):
+                fmt = value.format
+                for part in ['data','indices','indptr']:
+                    state[fmt+':'+name+':'+part] = getattr(value, part)
+                state[fmt+':'+name+':shape'] = numpy.array(value.shape)
+            elif isinstance(value, numpy.ndarray):
+                state['array:'+name] = value
+            elif isinstance(value, (bool, int, float, numpy.number)):
+                state['scalar:'+name] = numpy.array(value)
+            elif isinstance(value, list) and all(isinstance(v, str) for v in value):
+                state['strings:'+name] = numpy.array(value, str)
+            elif isinstance(value, dict):
+                for k in value:
+                    state['dict:'+name+':'+k] = numpy.array(value[k])
+        return state
+
+    def setState(self, state):
+        """ Restore the attributes of a dict returned by getState; caches
+            and solvers are reset """
+
+        sparse = {}
+        for label in state:
+            parts = label.split(':')
+            A = state[label]
+            if parts[0] == 'array':
+                self.__dict__[parts[1]] = numpy.array(A, order='F')
+            elif parts[0] == 'scalar':
+                self.__dict__[parts[1]] = A.item()
+            elif parts[0] == 'strings':
+                self.__dict__[parts[1]] = [str(v) for v in A]
+            elif parts[0] == 'dict':
+                value = self.__dict__.setdefault(parts[1], {})
+                value[parts[2]] = A.item() if A.ndim == 0 else numpy.array(A)
+            else:
+                sparse.setdefault((parts[0],parts[1]), {})[parts[2]] = numpy.array(A)
+        for fmt, name in sparse:
+            parts = sparse[fmt,name]
+            matrix = {'csc':scipy.sparse.csc_matrix, 'csr':scipy.sparse.csr_matrix}[fmt]
+            self.__dict__[name] = matrix((parts['data'], parts['indices'], parts['indptr']), shape=tuple(parts['shape']))
+        if 'scalar:nsurf' in state:
+            self.export = PUBSexport.PUBSexport()
+            self.patterns = {}
+            self.pjtnTrees = {}
+            self.triCache = {}
+            self.visBases = None
+            self.composites = None
+            self.ATAsolve = None
+            self.tensorBases = None
+            if self.tensor:
+                self.computeTensorBases()
+
+    def clone(self):
+        """ Return a copy that shares the sparse operators and the P0 grid
+            parameters with this instance; the remaining arrays (Q, C, P,
+            P0, the normals, and the small topology and index arrays) are
+            private, and rebuilds replace rather than modify the shared
+            operators since the sparsity patterns are not shared """
+
+        oml = PUBS.__new__(PUBS)
+        for name, value in self.__dict__.items():
+            if isinstance(value, numpy.ndarray) and name not in self.shared:
+                value = numpy.array(value, order='F')
+            oml.__dict__[name] = value
+        oml.var = list(self.var)
+        oml.export = PUBSexport.PUBSexport()
+        oml.patterns = {}
+        oml.pjtnTrees = {}
+        oml.triCache = {}
+        oml.visBases = None
+        return oml
+
+    def __getstate__(self):
+        return self.getState()
+
+    def __setstate__(self, state):
+        self.setState(state)
+
+    def loadCache(self, kind, key):
+        """ Return the cached state of the given kind and key, or None """
+
+        filename = os.path.join(self.cacheDir, kind + '_' + key + '.npz')
+        if not os.path.exists(filename):
+            return None
+        data = numpy.load(filename)
+        index, blob = data['index'], data['blob']
+        data.close()
+        state = {}
+        for entry in index:
+            label, dtype, shape, i0, i1 = entry.split(' ')
+            shape = tuple(int(n) for n in shape.split(',') if n)
+            state[label] = numpy.frombuffer(blob[int(i0):int(i1)].tostring(), dtype).reshape(shape)
+        return state
+
+    def saveCache(self, kind, key, state):
+        """ Write a state to the cache as one byte blob and an index of
+            (label, dtype, shape, range) entries, since reading many small
+            npz members is slower than rebuilding small models; the file
+            is renamed into place so concurrent readers never see a
+            partial file """
+
+        if not os.path.isdir(self.cacheDir):
+            os.makedirs(self.cacheDir)
+        index = []
+        blobs = []
+        i0 = 0
+        for label in sorted(state):
+            A = numpy.ascontiguousarray(state[label])
+            blobs.append(A.tostring())
+            shape = ','.join(str(n) for n in A.shape)
+            index.append('%s %s %s %i %i' % (label, A.dtype.str, shape, i0, i0 + len(blobs[-1])))
+            i0 += len(blobs[-1])
+        filename = os.path.join(self.cacheDir, kind + '_' + key + '.npz')
+        tmp = filename[:-4] + '.%i.tmp.npz' % os.getpid()
+        numpy.savez(tmp, index=numpy.array(index), blob=numpy.frombuffer(''.join(blobs), numpy.uint8))
+        os.rename(tmp, filename)
+
+    def __getLayout(self):
+        """ Record the group properties and the 0-based ranges of each
+            vertex, edge, and surface in the global C, P, and P0 vectors """
+
+        layout = {}
+        layout['kmn'] = numpy.array([self.group_k, self.group_m, self.group_n])
+        layout['nsurf'] = self.nsurf
+        layout['nC'] = self.nC
+        layout['nP'] = self.nP
+        for name, surf_index, edge_index in [['C', self.surf_index_C, self.edge_index_C],
+                                             ['P', self.surf_index_P, self.edge_index_P]]:
+            nedge = self.nvert + max(edge_index[:,1])
+            layout['edge'+name] = self.nvert + edge_index
+            layout['surf'+name] = nedge + surf_index
+        layout['surfP0'] = numpy.array([self.Np0[:-1], self.Np0[1:]],int).T
+        return layout
+
+    def __getDirtyGroups(self, layout):
+        """ Return the 1-based groups whose k, m, or n changed since the
+            last Jacobian, or None if a full assembly is needed """
+
+        if not self.incremental or not hasattr(self, 'layout'):
+            return None
+        old = self.layout
+        if old['nsurf'] != layout['nsurf'] or old['kmn'].shape != layout['kmn'].shape:
+            return None
+        return numpy.nonzero(numpy.any(old['kmn'] != layout['kmn'], axis=0))[0] + 1
+
+    def __updateJacobian(self, old, layout, groups):
+        """ Assemble only the rows of J, J0, Ju, and Jv belonging to the
+            surfaces and edges of the given groups, and splice them between
+            the renumbered rows of the other surfaces and edges """
+
+        ugroup = self.edge_group[abs(self.surf_edge[:,0,0])-1]
+        vgroup = self.edge_group[abs(self.surf_edge[:,1,0])-1]
+        dirtyS = numpy.in1d(ugroup, groups) + numpy.in1d(vgroup, groups)
+        dirtyE = numpy.in1d(self.edge_group, groups)
+
+        colmap = numpy.arange(old['nC'])
+        for name, dirty in [['edgeC', dirtyE], ['surfC', dirtyS]]:
+            for i in numpy.nonzero(~dirty)[0]:
+                i0, i1 = old[name][i]
+                colmap[i0:i1] = numpy.arange(*layout[name][i])
+
+        nJ = PUBSlib.computejnnzrows(self.nsurf, self.nedge, self.ngroup, self.surf_edge, self.edge_group, self.group_k, self.group_n, dirtyS, dirtyE)
+        if nJ == 0:
+            J1 = scipy.sparse.csr_matrix((self.nP,self.nC))
+        else:
+            Ja, Ji, Jj = PUBSlib.computejacobianrows(nJ, self.nT, self.nD, self.nsurf, self.nedge, self.ngroup, self.nvert, self.surf_vert, self.surf_edge, self.edge_group, self.group_k, self.group_m, self.group_n, self.group_d, self.surf_index_P, self.edge_index_P, self.surf_index_C, self.edge_index_C, self.knot_index, self.edge_count, dirtyS, dirtyE, self.T)
+            J1 = scipy.sparse.csr_matrix((Ja,(Ji,Jj)),shape=(self.nP,self.nC))
+        Jold = self.J.tocsr()
+        blocks = [[Jold, 0, self.nvert, colmap]]
+        for name, dirty in [['edgeP', dirtyE], ['surfP', dirtyS]]:
+            for i in range(dirty.shape[0]):
+                if dirty[i]:
+                    blocks.append([J1, layout[name][i,0], layout[name][i,1], None])
+                else:
+                    blocks.append([Jold, old[name][i,0], old[name][i,1], colmap])
+        self.J = self.__spliceRows(blocks, (self.nP,self.nC))
+        self.patterns.pop('J', None)
+
+        bases = not self.tensor and 'J0' in self.__dict__
+        s1, u1, v1, A1s = self.evaluateGridBases(numpy.nonzero(dirtyS)[0], bases)
+        ptr = numpy.zeros(self.nsurf+1,int)
+        ptr[1:] = numpy.cumsum(dirtyS*(layout['surfP0'][:,1] - layout['surfP0'][:,0]))
+        grids = []
+        for s in range(self.nsurf):
+            if dirtyS[s]:
+                grids.append([s1, u1, v1, ptr[s], ptr[s+1]])
+            else:
+                grids.append([self.P0surf, self.P0u, self.P0v, old['surfP0'][s,0], old['surfP0'][s,1]])
+        self.P0surf, self.P0u, self.P0v = [numpy.hstack([g[k][g[3]:g[4]] for g in grids]) for k in range(3)]
+
+        if not bases:
+            for name in ['J0','Ju','Jv']:
+                self.__dict__.pop(name, None)
+            return
+        self.patterns.pop('grid', None)
+        for name, A1 in zip(['J0','Ju','Jv'], A1s):
+            A0 = getattr(self, name).tocsr()
+            blocks = []
+            for s in range(self.nsurf):
+                if dirtyS[s]:
+                    blocks.append([A1, ptr[s], ptr[s+1], None])
+                else:
+                    blocks.append([A0, old['surfP0'][s,0], old['surfP0'][s,1], colmap])
+            setattr(self, name, self.__spliceRows(blocks, (self.P0surf.shape[0],self.nC)))
+
+    def __getattr__(self, name):
+        """ In tensor mode or after setState, assemble J0, Ju, or Jv only
+            on first use """
+
+        ders = {'J0':(0,0), 'Ju':(1,0), 'Jv':(0,1)}
+        if name not in ders or 'P0surf' not in self.__dict__:
+            raise AttributeError(name)
+        self.J0, self.Ju, self.Jv = self.evaluateGridBases(range(self.nsurf))[3]
+        return self.__dict__[name]
+
+    def evaluateGridBases(self, surfs, bases=True):
+        """ Return the surface indices and parameters of the P0 grids of
+            the given 0-based surfaces and, if bases, the corresponding rows
+            of J0, Ju, and Jv from a single traversal; the three CSR
+            matrices share one set of index arrays """
+
+        surfs = numpy.array(surfs, int).reshape(-1)
+        ugroup = self.edge_group[abs(self.surf_edge[surfs,0,0])-1] - 1
+        vgroup = self.edge_group[abs(self.surf_edge[surfs,1,0])-1] - 1
+        nrow = self.group_n[ugroup]*self.group_n[vgroup]
+        nnz = self.group_k[ugroup]*self.group_k[vgroup]
+        nP0 = int(numpy.sum(nrow))
+        nB = int(numpy.sum(nrow*nnz)) if bases else 1
+        if nP0 == 0:
+            empty = scipy.sparse.csr_matrix((0,self.nC))
+            return numpy.zeros(0,int), numpy.zeros(0), numpy.zeros(0), [empty]*3
+        s, u, v, B0, Bu, Bv, Bj = PUBSlib.evaluategridbases(bases, surfs.shape[0], nP0, nB, self.nT, self.nD, self.nsurf, self.nedge, self.ngroup, self.nvert, surfs+1, self.surf_vert, self.surf_edge, self.edge_group, self.group_k, self.group_m, self.group_n, self.group_d, self.surf_index_P, self.edge_index_P, self.surf_index_C, self.edge_index_C, self.knot_index, self.T)
+        if not bases:
+            return s, u, v, None
+        indptr = numpy.zeros(nP0+1,int)
+        indptr[1:] = numpy.cumsum(numpy.repeat(nnz, nrow))
+        Js = [scipy.sparse.csr_matrix((B, Bj, indptr), shape=(nP0,self.nC)) for B in [B0, Bu, Bv]]
+        return s, u, v, Js
+
+    def setGridBases(self, key, Js):
+        """ Store J0, Ju, and Jv; if the discretization is unchanged since
+            they were last stored, only their data arrays are refreshed """
+
+        if self.patterns.get('grid') == key:
+            for name, A in zip(['J0','Ju','Jv'], Js):
+                self.__dict__[name].data[:] = A.data
         else:
-            solve = scipy.sparse.linalg.dsolve.factorized(ATA)
-            for i in range(nvar):
-                Q[:,i] = solve(ATB[:,i])
-        self.Q = Q
+            self.J0, self.Ju, self.Jv = Js
+            self.patterns['grid'] = key
+
+    def assembleCSC(self, name, key, a, i, j, shape):
+        """ Return the CSC matrix of the COO triplets (a,i,j); the sorted
+            pattern and the map from triplets to CSC entries are kept under
+            name, so if key matches the last call the existing matrix is
+            returned with only its data array refreshed """
+
+        pattern = self.patterns.get(name)
+        if key is None or pattern is None or pattern[0] != key:
+            ij, perm = numpy.unique(j.astype(int)*shape[0] + i, return_inverse=True)
+            indptr = numpy.zeros(shape[1]+1,int)
+            indptr[1:] = numpy.cumsum(numpy.bincount(ij//shape[0], minlength=shape[1]))
+            A = scipy.sparse.csc_matrix((numpy.zeros(ij.shape[0]), ij % shape[0], indptr), shape=shape)
+            pattern = [key, perm, A]
+            self.patterns[name] = pattern
+        key, perm, A = pattern
+        A.data[:] = numpy.bincount(perm, weights=a, minlength=A.data.shape[0])
+        return A
+
+    def computeJM(self, key):
+        """ Return J M; the symbolic product, i.e., the (J, M, JM) data
+            positions of every term, is kept until key changes so repeated
+            rebuilds only redo the numeric phase; with no key, the product
+            is formed directly """
+
+        J, M = self.J.tocsc(), self.M
+        if key is None:
+            self.patterns.pop('JM', None)
+            return J.dot(M)
+        pattern = self.patterns.get('JM')
+        if pattern is None or pattern[0] != key:
+            counts = numpy.diff(J.indptr)[M.indices]
+            pM = numpy.repeat(numpy.arange(M.nnz), counts)
+            offset = numpy.arange(pM.shape[0]) - numpy.repeat(numpy.cumsum(counts) - counts, counts)
+            pJ = J.indptr[M.indices][pM] + offset
+            cols = numpy.repeat(numpy.arange(M.shape[1]), numpy.diff(M.indptr))[pM]
+            ij, target = numpy.unique(cols*J.shape[0] + J.indices[pJ], return_inverse=True)
+            indptr = numpy.zeros(M.shape[1]+1,int)
+            indptr[1:] = numpy.cumsum(numpy.bincount(ij//J.shape[0], minlength=M.shape[1]))
+            JM = scipy.sparse.csc_matrix((numpy.zeros(ij.shape[0]), ij % J.shape[0], indptr), shape=(J.shape[0],M.shape[1]))
+            pattern = [key, pJ, pM, target, JM]
+            self.patterns['JM'] = pattern
+        key, pJ, pM, target, JM = pattern
+        JM.data[:] = numpy.bincount(target, weights=J.data[pJ]*M.data[pM], minlength=JM.data.shape[0])
+        return JM
+
+    def computeTensorBases(self):
+        """ Store the dense 1-D basis matrices (values and first
+            derivatives) of each group at the P0 parameters, and the
+            control point mapping of each surface; surfaces sharing both
+            matrices are batched so P0 grids are evaluated as Bu C Bv^T """
+
+        bases = {}
+        batches = {}
+        for s in range(self.nsurf):
+            nu, nv = self.Nuv[s,:]
+            i0 = int(self.Np0[s])
+            keys = []
+            for d, t in [[0, self.P0u[i0:i0+nu]], [1, self.P0v[i0:i0+nu*nv:nu]]]:
+                group = self.edge_group[abs(self.surf_edge[s,d,0])-1]
+                key = (group, t.tostring())
+                if key not in bases:
+                    bases[key] = self.computeTensorBasis(group, t)
+                keys.append(key)
+            mu, mv = [bases[key][0].shape[1] for key in keys]
+            mapping = PUBSlib.getmapping(s+1, mu, mv, self.nvert, self.surf_vert, self.surf_edge, self.surf_index_C, self.edge_index_C) - 1
+            batches.setdefault(tuple(keys), []).append([s, mapping])
+        self.tensorBases = []
+        for (ukey, vkey), surfs in batches.items():
+            rows = numpy.hstack([numpy.arange(self.Np0[s], self.Np0[s+1], dtype=int) for s, mapping in surfs])
+            maps = numpy.array([mapping for s, mapping in surfs]).transpose(1,0,2)
+            self.tensorBases.append([bases[ukey], bases[vkey], maps, rows])
+
+    def computeTensorBasis(self, group, t):
+        """ Return the dense n x m basis and first derivative matrices
+            of a group at the parameters t """
+
+        k = self.group_k[group-1]
+        m = self.group_m[group-1]
+        d = self.group_d[self.knot_index[group-1,0]:self.knot_index[group-1,1]]
+        return PUBSlib.curvebases(k, m, t.shape[0], t, d)
+
+    def invertUniformMap(self, group, x, tol=1e-14, maxiter=50):
+        """ Return the parameters t at which the curve of a group with
+            control points linspace(0,1,m) passes through x; it is
+            monotonic, so Newton's method is used, clipped to [0,1] """
+
+        k = self.group_k[group-1]
+        m = self.group_m[group-1]
+        d = self.group_d[self.knot_index[group-1,0]:self.knot_index[group-1,1]]
+        x = numpy.array(x, float)
+        if x.shape[0] == 0:
+            return x
+        return PUBSlib.invertcurve(k, m, x.shape[0], maxiter, tol, d, numpy.linspace(0,1,m), x)
+
+    def evaluateFlatProjection(self, surf, P):
+        """ Return s, u, v for points P[:,:2] in [0,1]^2 on the 0-based
+            surface flattened to the grid C[i,j] = (i/(mu-1), j/(mv-1), 0);
+            the flat surface is (X(u), Y(v)), so two curve inversions
+            replace a projection onto a modified copy of C """
+
+        ugroup = self.edge_group[abs(self.surf_edge[surf,0,0])-1]
+        vgroup = self.edge_group[abs(self.surf_edge[surf,1,0])-1]
+        s = surf*numpy.ones(P.shape[0],int)
+        u = self.invertUniformMap(ugroup, P[:,0])
+        v = self.invertUniformMap(vgroup, P[:,1])
+        return s, u, v
+
+    def evaluateGrid(self, C, uder=0, vder=0):
+        """ Return J0 C, Ju C, or Jv C; in tensor mode each batch of
+            surfaces is evaluated with two small dense products """
+
+        if not self.tensor:
+            J = {(0,0):self.J0, (1,0):self.Ju, (0,1):self.Jv}[uder,vder]
+            return J.dot(C)
+        nvar = C.shape[1]
+        P = numpy.zeros((int(self.Np0[-1]),nvar),order='F')
+        for Bu, Bv, maps, rows in self.tensorBases:
+            Bu, Bv = Bu[uder], Bv[vder]
+            mu, nS, mv = maps.shape
+            X = Bu.dot(C[maps].reshape((mu,-1))).reshape((-1,nS,mv,nvar))
+            X = numpy.tensordot(X, Bv, ([2],[1]))
+            P[rows] = X.transpose(1,3,0,2).reshape((-1,nvar))
+        return P
+
+    def __spliceRows(self, blocks, shape):
+        """ Stack row blocks, each given as [A, i0, i1, colmap] for rows i0
+            to i1 of the CSR matrix A with columns renumbered by colmap """
+
+        data, indices, counts = [], [], []
+        for A, i0, i1, colmap in blocks:
+            k0, k1 = A.indptr[i0], A.indptr[i1]
+            data.append(A.data[k0:k1])
+            if colmap is None:
+                indices.append(A.indices[k0:k1])
+            else:
+                indices.append(colmap[A.indices[k0:k1]])
+            counts.append(numpy.diff(A.indptr[i0:i1+1]))
+        indptr = numpy.zeros(shape[0]+1,int)
+        indptr[1:] = numpy.cumsum(numpy.hstack(counts))
+        A = scipy.sparse.csr_matrix((numpy.hstack(data), numpy.hstack(indices), indptr), shape=shape)
+        return A.tocsc()
+
+    def computeControlPts(self):
+        """ Perform fit to compute DOFs; the factorization of ATA is kept
+            until the Jacobian is recomputed """
+
+        if self.ATAsolve is None:
+            self.computeFitSolver()
+        ATB = self.JM.transpose().dot(self.P)
+        Q0 = None
+        if hasattr(self, 'Q') and self.Q.shape == ATB.shape:
+            Q0 = self.Q
+        self.Q = numpy.array(self.ATAsolve(ATB, Q0), order='F')
         self.computePoints()
 
-    def computePoints(self):
-        """ Compute matrix-vector product to find P from Q """
+    def computeFitSolver(self):
+        """ Factor ATA = JM^T JM to block-solve all columns of the fit;
+            if ATA is singular, fall back on Jacobi-preconditioned CG
+            warm-started from the current Q """
+
+        ATA = self.JM.transpose().dot(self.JM).tocsc()
+        try:
+            lu = scipy.sparse.linalg.splu(ATA)
+            solve = lambda B, Q0: lu.solve(B)
+        except RuntimeError:
+            d = ATA.diagonal()
+            d[d==0] = 1.0
+            Minv = scipy.sparse.diags(1/d)
+            def solve(B, Q0):
+                Q = numpy.zeros(B.shape,order='F')
+                for i in range(B.shape[1]):
+                    x0 = None if Q0 is None else Q0[:,i]
+                    Q[:,i] = scipy.sparse.linalg.cg(ATA, B[:,i], x0=x0, M=Minv)[0]
+                return Q
+        self.ATAsolve = solve
 
-        self.C = self.M.dot(self.Q)
-        self.P = self.J.dot(self.C)
-        self.P0 = self.J0.dot(self.C)
-        self.computeNormals()
+    def computePoints(self):
+        """ Compute matrix-vector product to find P from Q; C, P, and P0
+            are written into the existing arrays, P0 and its normals come
+            from the composite operators J0 M, Ju M, and Jv M, and only the
+            xyz columns and nonzero extra columns of Q are propagated """
+
+        if self.tensor:
+            self.C = self.M.dot(self.Q)
+            self.P = self.J.dot(self.C)
+            self.P0 = self.evaluateGrid(self.C)
+            self.pjtnTrees = {}
+            self.computeNormals()
+            return
+
+        J0M, JuM, JvM = self.getComposites()
+        nP0 = int(self.Np0[-1])
+        C = self.getBuffer('C', self.nC, self.nvar)
+        P = self.getBuffer('P', self.nP, self.nvar)
+        P0 = self.getBuffer('P0', nP0, self.nvar)
+        Pu = self.getBuffer('Pu', nP0, 3)
+        Pv = self.getBuffer('Pv', nP0, 3)
+        Q = self.Q if self.Q.flags.f_contiguous else numpy.array(self.Q, order='F')
+
+        blocks = [[0,3]]
+        for k in range(3, self.nvar):
+            if numpy.any(Q[:,k]):
+                blocks.append([k,k+1])
+            else:
+                C[:,k] = 0.0
+                P[:,k] = 0.0
+                if k >= 6:
+                    P0[:,k] = 0.0
+        for k0, k1 in blocks:
+            for A, y in [[self.M, C], [self.JM, P], [J0M, P0]]:
+                PUBSlib.cscmatvec(A.shape[0], A.shape[1], A.nnz, k1-k0, A.indptr, A.indices, A.data, Q[:,k0:k1], y[:,k0:k1])
+        for A, y in [[JuM, Pu], [JvM, Pv]]:
+            PUBSlib.cscmatvec(A.shape[0], A.shape[1], A.nnz, 3, A.indptr, A.indices, A.data, Q[:,:3], y)
+        PUBSlib.computeunitnormals(nP0, Pu, Pv, P0[:,3:6])
+        self.pjtnTrees = {}
+
+    def getComposites(self):
+        """ Return the CSC composite operators J0 M, Ju M, and Jv M, which
+            map Q to P0 and its derivatives; kept until the next rebuild """
+
+        if self.composites is None:
+            self.composites = [self.J0.dot(self.M).tocsc(), self.Ju.dot(self.M).tocsc(), self.Jv.dot(self.M).tocsc()]
+        return self.composites
+
+    def getBuffer(self, name, nrow, ncol):
+        """ Return the attribute name if it is already a Fortran-ordered
+            nrow x ncol array of doubles; otherwise, replace it by one """
+
+        A = self.__dict__.get(name)
+        if A is None or A.shape != (nrow,ncol) or A.dtype != numpy.float64 or not A.flags.f_contiguous:
+            A = numpy.zeros((nrow,ncol),order='F')
+            setattr(self, name, A)
+        return A
 
     def computeNormals(self):
-        self.Pu = self.Ju.dot(self.C[:,:3])
-        self.Pv = self.Jv.dot(self.C[:,:3])
+        self.Pu = self.evaluateGrid(self.C[:,:3], 1, 0)
+        self.Pv = self.evaluateGrid(self.C[:,:3], 0, 1)
         nor = numpy.cross(self.Pu,self.Pv)
         norms = numpy.sum(nor**2,axis=1)**0.5
         for k in range(3):
@@ -321,7 +868,8 @@ class PUBS(object):
         """ Compute matrix-vector product to find P from C """
 
         self.P = self.J.dot(self.C)
-        self.P0 = self.J0.dot(self.C)
+        self.P0 = self.evaluateGrid(self.C)
+        self.pjtnTrees = {}
 
     def getIndex(self, surf, u, v, quantity):
         """ Return the index of a Q, C, or P entry in the global list 
@@ -412,6 +960,111 @@ class PUBS(object):
         P = PUBSlib.evaluatepoint(surf+1,uder,vder,ku,kv,mu,mv,self.nvar,self.nD,self.nC,self.nsurf,self.nedge,self.ngroup,self.nvert,u,v,self.surf_vert,self.surf_edge,self.edge_group,self.group_d,self.surf_index_C,self.edge_index_C,self.knot_index,self.C)
         return P
 
+    def evaluatePoints(self, surf, u, v, uder=0, vder=0):
+        """ Return points or parametric derivatives for many (s,u,v)
+        in a single call; queries are grouped by surface internally
+
+        Input
+
+        surf: integer(n)
+            0-based surface index
+
+        u: double(n)
+            Parametric coordinate [0,1]
+
+        v: double(n)
+            Parametric coordinate [0,1]
+
+        uder: integer
+            Order of the desired derivative in the u direction
+
+        vder: integer
+            Order of the desired derivative in the v direction
+
+        Output
+
+        P: double(n,nvar)
+            Values of the points or derivatives requested
+
+        """
+
+        surf = numpy.array(surf, int).reshape(-1)
+        n = surf.shape[0]
+        u = numpy.array(u, float).reshape(-1) * numpy.ones(n)
+        v = numpy.array(v, float).reshape(-1) * numpy.ones(n)
+        order = numpy.argsort(surf, kind='mergesort')
+        P = numpy.zeros((n,self.nvar),order='F')
+        if n > 0:
+            P[order] = PUBSlib.evaluatepoints(uder, vder, n, self.nvar, self.nD, self.nC, self.nsurf, self.nedge, self.ngroup, self.nvert, self.surf_vert, self.surf_edge, self.edge_group, self.group_k, self.group_m, self.group_d, self.surf_index_C, self.edge_index_C, self.knot_index, surf[order]+1, u[order], v[order], self.C)
+        return P
+
+    def evaluateDerivatives(self, surf, u, v):
+        """ Return points with their first and second parametric
+        derivatives from a single basis evaluation per query
+
+        Input
+
+        surf: integer(n)
+            0-based surface index
+
+        u: double(n)
+            Parametric coordinate [0,1]
+
+        v: double(n)
+            Parametric coordinate [0,1]
+
+        Output
+
+        P: double(n,nvar,6)
+            P, Pu, Pv, Puu, Puv, Pvv along the last axis
+
+        """
+
+        surf = numpy.array(surf, int).reshape(-1)
+        n = surf.shape[0]
+        u = numpy.array(u, float).reshape(-1) * numpy.ones(n)
+        v = numpy.array(v, float).reshape(-1) * numpy.ones(n)
+        order = numpy.argsort(surf, kind='mergesort')
+        P = numpy.zeros((n,self.nvar,6),order='F')
+        if n > 0:
+            P[order] = PUBSlib.evaluatepointsderivs(n, self.nvar, self.nD, self.nC, self.nsurf, self.nedge, self.ngroup, self.nvert, self.surf_vert, self.surf_edge, self.edge_group, self.group_k, self.group_m, self.group_d, self.surf_index_C, self.edge_index_C, self.knot_index, surf[order]+1, u[order], v[order], self.C)
+        return P
+
+    def evaluateCurvature(self, surf, u, v):
+        """ Return the Gaussian and mean curvatures at (s,u,v)
+
+        Input
+
+        surf: integer(n)
+            0-based surface index
+
+        u: double(n)
+            Parametric coordinate [0,1]
+
+        v: double(n)
+            Parametric coordinate [0,1]
+
+        Output
+
+        K: double(n)
+            Gaussian curvature
+
+        H: double(n)
+            Mean curvature, positive when the surface bends toward Pu x Pv
+
+        """
+
+        D = self.evaluateDerivatives(surf, u, v)[:,:3,:]
+        Pu, Pv = D[:,:,1], D[:,:,2]
+        nor = numpy.cross(Pu, Pv)
+        nor /= numpy.sum(nor**2,axis=1)[:,None]**0.5
+        E, F, G = numpy.sum(Pu*Pu,axis=1), numpy.sum(Pu*Pv,axis=1), numpy.sum(Pv*Pv,axis=1)
+        L, M, N = numpy.sum(D[:,:,3]*nor,axis=1), numpy.sum(D[:,:,4]*nor,axis=1), numpy.sum(D[:,:,5]*nor,axis=1)
+        det = E*G - F**2
+        K = (L*N - M**2)/det
+        H = (E*N - 2*F*M + G*L)/det/2.0
+        return K, H
+
     def evaluateBases(self, surf, u, v, uder=0, vder=0):
         """ Return matrix that multiples with C to give n points 
         corresponding to (s,u,v).
@@ -439,7 +1092,7 @@ class PUBS(object):
         B = scipy.sparse.csc_matrix((Ba,(Bi,Bj)),shape=(surf.shape[0],self.nC))
         return B
 
-    def evaluateProjection(self, P0, surfs=None, Q=None):
+    def evaluateProjection(self, P0, surfs=None, Q=None, nseed=16, surf0=None, u0=None, v0=None, rtol=1e-8, tol=1e-13, maxiter=41, stats=False):
         """ Computes projections from P0 to the supplied list of surfaces
             and returns the parametric coordinates of the closest point
 
@@ -452,7 +1105,32 @@ class PUBS(object):
             List of surfaces (0-based) to check
 
         Q: double(n,3)
-            Optional list of directions along which to evaluate projection
+            Optional list of directions along which to evaluate projection;
+            unless they are all nonzero and parallel, nseed is ignored
+
+        nseed: integer
+            Number of nearest P0 grid points used to seed the Newton search,
+            after which every other surface whose control points are closer
+            than the result is also searched; 0 to search a subsampled grid
+            of every surface instead
+
+        surf0, u0, v0: integer(n), double(n), double(n)
+            Optional initial guesses, e.g., the result of a previous call;
+            points whose Newton iterations from the guess converge to within
+            rtol of P0 (or, without Q, to the interior of the surface)
+            skip the search
+
+        rtol: double
+            Residual distance below which a warm-started point is accepted
+
+        tol: double
+            Newton convergence tolerance on the gradient and step norms
+
+        maxiter: integer
+            Maximum number of Newton iterations per projection
+
+        stats: logical
+            If True, also return a dictionary of iteration statistics
 
         Output
 
@@ -465,19 +1143,172 @@ class PUBS(object):
         v: double(n)
             List of parametric coordinates in v of the projected points
 
+        info: dict
+            Only if stats; nwarm and nsearch points, and the total number
+            of Newton iterations, warm-started and in the search
+
         """
 
+        nP0 = P0.shape[0]
+        if surf0 is not None:
+            surf0 = numpy.array(surf0, int).reshape(-1)
+            Q0 = numpy.zeros((nP0,3),order='F') if Q is None else Q
+            u,v,d,niter = PUBSlib.evaluatewarmprojection(nP0,self.nD,self.nC,self.nsurf,self.nedge,self.ngroup,self.nvert,self.surf_vert,self.surf_edge,self.edge_group,self.group_k,self.group_m,self.group_d,self.surf_index_C,self.edge_index_C,self.knot_index,tol,maxiter,surf0+1,u0,v0,self.C[:,:3],P0,Q0)
+            done = d**0.5 <= rtol
+            if Q is None:
+                inside = (u > 0) & (u < 1) & (v > 0) & (v < 1)
+                done = numpy.logical_or(done, inside)
+            done = numpy.logical_and(done, niter < maxiter)
+            if surfs is not None:
+                done = numpy.logical_and(done, numpy.in1d(surf0, surfs))
+            search = numpy.nonzero(~done)[0]
+            surf = numpy.array(surf0)
+            info = {'nwarm':nP0-search.shape[0], 'nsearch':search.shape[0], 'niter':int(numpy.sum(niter))}
+            if search.shape[0] > 0:
+                Qs = None if Q is None else Q[search]
+                surf[search], u[search], v[search], fallback = self.evaluateProjection(P0[search], surfs, Qs, nseed, tol=tol, maxiter=maxiter, stats=True)
+                info['niter'] += fallback['niter']
+            if stats:
+                return surf,u,v,info
+            return surf,u,v
+
         if surfs is None:
             surfs = numpy.linspace(1,self.nsurf,self.nsurf)
         else:
             surfs = numpy.array(surfs) + 1
-        if Q is None:
-            surf,u,v = PUBSlib.evaluateprojection(P0.shape[0],surfs.shape[0],self.nD,self.nT,self.nC,self.nP,self.nsurf,self.nedge,self.ngroup,self.nvert,surfs,self.surf_vert,self.surf_edge,self.edge_group,self.group_k,self.group_m,self.group_n,self.group_d,self.surf_index_P,self.edge_index_P,self.surf_index_C,self.edge_index_C,self.knot_index,self.T,self.C[:,:3],self.P[:,:3],P0)
+        R = None
+        if Q is not None:
+            norms = numpy.sum(Q**2,axis=1)**0.5
+            if not numpy.all(norms > 0):
+                nseed = 0
+            else:
+                R = Q[0]/norms[0]
+                if numpy.max(numpy.abs(numpy.cross(Q, R)) / norms[:,None]) > 1e-12:
+                    nseed = 0
+        if nseed > 0:
+            tree, rows, E = self.computeProjectionTree(surfs, R)
+            nseed = min(nseed, rows.shape[0])
+            near = tree.query(P0[:,:3].dot(E), nseed)[1].reshape((P0.shape[0],nseed))
+            rows = rows[numpy.minimum(near, rows.shape[0]-1)]
+            seeds = numpy.array(self.P0surf[rows] + 1, order='F')
+            seedu = numpy.array(self.P0u[rows], order='F')
+            seedv = numpy.array(self.P0v[rows], order='F')
+            if Q is None:
+                Q = numpy.zeros((P0.shape[0],3),order='F')
+            surf,u,v,d,niter = PUBSlib.evaluateseededprojection(P0.shape[0],nseed,self.nD,self.nC,self.nsurf,self.nedge,self.ngroup,self.nvert,seeds,seedu,seedv,self.surf_vert,self.surf_edge,self.edge_group,self.group_k,self.group_m,self.group_d,self.surf_index_C,self.edge_index_C,self.knot_index,tol,maxiter,self.C[:,:3],P0,Q)
+            self.__checkSeededProjection(P0, Q, surfs, R, seeds, surf, u, v, d, niter, tol, maxiter)
+        elif Q is None:
+            surf,u,v,niter = PUBSlib.evaluateprojection(P0.shape[0],surfs.shape[0],self.nD,self.nT,self.nC,self.nP,self.nsurf,self.nedge,self.ngroup,self.nvert,surfs,self.surf_vert,self.surf_edge,self.edge_group,self.group_k,self.group_m,self.group_n,self.group_d,self.surf_index_P,self.edge_index_P,self.surf_index_C,self.edge_index_C,self.knot_index,tol,maxiter,self.T,self.C[:,:3],self.P[:,:3],P0)
         else:
-            surf,u,v = PUBSlib.evaluatepjtnalongq(P0.shape[0],surfs.shape[0],self.nD,self.nT,self.nC,self.nP,self.nsurf,self.nedge,self.ngroup,self.nvert,surfs,self.surf_vert,self.surf_edge,self.edge_group,self.group_k,self.group_m,self.group_n,self.group_d,self.surf_index_P,self.edge_index_P,self.surf_index_C,self.edge_index_C,self.knot_index,self.T,self.C[:,:3],self.P[:,:3],P0,Q)
+            surf,u,v,niter = PUBSlib.evaluatepjtnalongq(P0.shape[0],surfs.shape[0],self.nD,self.nT,self.nC,self.nP,self.nsurf,self.nedge,self.ngroup,self.nvert,surfs,self.surf_vert,self.surf_edge,self.edge_group,self.group_k,self.group_m,self.group_n,self.group_d,self.surf_index_P,self.edge_index_P,self.surf_index_C,self.edge_index_C,self.knot_index,tol,maxiter,self.T,self.C[:,:3],self.P[:,:3],P0,Q)
         surf -= 1
+        if stats:
+            return surf,u,v,{'nwarm':0, 'nsearch':nP0, 'niter':int(numpy.sum(niter))}
         return surf,u,v
-    
+
+    def computeProjectionTree(self, surfs, R=None):
+        """ Return a k-d tree of the P0 grid points of the given surfaces;
+            trees are cached until the points are next recomputed
+
+        Input
+
+        surfs: integer(ns)
+            1-based list of surfaces to include
+
+        R: double(3)
+            Optional unit projection direction; if given, the points are
+            flattened onto the plane normal to R
+
+        Output
+
+        tree: cKDTree
+            Tree of the flattened points
+
+        rows: integer(n)
+            Rows of P0 corresponding to the points in the tree
+
+        E: double(3,d)
+            Basis onto which points are projected before querying the tree
+
+        """
+
+        key = (numpy.array(surfs,int).tostring(), None if R is None else tuple(R))
+        if key not in self.pjtnTrees:
+            Np0 = numpy.array(self.Np0,int)
+            rows = numpy.hstack([numpy.arange(Np0[s-1],Np0[s]) for s in numpy.array(surfs,int)])
+            if R is None:
+                E = numpy.eye(3)
+            else:
+                E = numpy.linalg.svd(numpy.eye(3) - numpy.outer(R,R))[0][:,:2]
+            tree = scipy.spatial.cKDTree(self.P0[rows,:3].dot(E))
+            self.pjtnTrees[key] = tree, rows, E
+        return self.pjtnTrees[key]
+
+    def __checkSeededProjection(self, P0, Q, surfs, R, seeds, surf, u, v, d, niter, tol, maxiter):
+        """ Update the 1-based seeded projections surf, u, v, with squared
+            distances d and Newton iteration counts niter, in place; a surface contains a closer point only if
+            the bounding box of its control points is closer, so each such
+            surface that was not seeded is projected onto from its nearest
+            P0 grid point, as in the search of every surface """
+
+        tree, rows, E = self.computeProjectionTree(surfs, R)
+        lo, hi = self.computeProjectionBounds(surfs, R)
+        surfs = numpy.array(surfs, int)
+        col = numpy.zeros(self.nsurf+1, int)
+        col[surfs] = numpy.arange(surfs.shape[0])
+        X = P0[:,:3].dot(E)
+        points, cols = [], []
+        for i0 in range(0, X.shape[0], 1000):
+            Y = X[i0:i0+1000,None,:]
+            gap = numpy.maximum(numpy.maximum(lo - Y, Y - hi), 0)
+            near = numpy.sum(gap**2, 2) < d[i0:i0+1000,None]
+            near[numpy.arange(Y.shape[0])[:,None], col[seeds[i0:i0+1000]]] = False
+            i, j = numpy.nonzero(near)
+            points.append(i + i0)
+            cols.append(j)
+        points, cols = numpy.hstack(points), numpy.hstack(cols)
+        if points.shape[0] == 0:
+            return
+
+        order = numpy.argsort(points, kind='mergesort')
+        points, cols = points[order], cols[order]
+        pts, start, count = numpy.unique(points, return_index=True, return_counts=True)
+        pos = numpy.arange(points.shape[0]) - numpy.repeat(start, count) + 1
+        index = numpy.searchsorted(pts, points)
+        nseed = count.max() + 1
+        seeds = numpy.array(numpy.repeat(surf[pts,None], nseed, 1), order='F')
+        seedu = numpy.array(numpy.repeat(u[pts,None], nseed, 1), order='F')
+        seedv = numpy.array(numpy.repeat(v[pts,None], nseed, 1), order='F')
+        for j in numpy.unique(cols):
+            k = numpy.nonzero(cols == j)[0]
+            tree, rows, E = self.computeProjectionTree(surfs[j:j+1], R)
+            r = rows[tree.query(X[points[k]])[1]]
+            seeds[index[k],pos[k]] = self.P0surf[r] + 1
+            seedu[index[k],pos[k]] = self.P0u[r]
+            seedv[index[k],pos[k]] = self.P0v[r]
+        P0, Q = numpy.array(P0[pts], order='F'), numpy.array(Q[pts], order='F')
+        surf[pts],u[pts],v[pts],d[pts],n = PUBSlib.evaluateseededprojection(pts.shape[0],nseed,self.nD,self.nC,self.nsurf,self.nedge,self.ngroup,self.nvert,seeds,seedu,seedv,self.surf_vert,self.surf_edge,self.edge_group,self.group_k,self.group_m,self.group_d,self.surf_index_C,self.edge_index_C,self.knot_index,tol,maxiter,self.C[:,:3],P0,Q)
+        niter[pts] += n
+
+    def computeProjectionBounds(self, surfs, R=None):
+        """ Return the bounding boxes, after flattening as in
+            computeProjectionTree, of the control points of the given
+            1-based surfaces; each contains its surface, so the points of a
+            surface are no closer than its box. Cached with the trees. """
+
+        key = ('bounds', numpy.array(surfs,int).tostring(), None if R is None else tuple(R))
+        if key not in self.pjtnTrees:
+            E = self.computeProjectionTree(surfs, R)[2]
+            lo, hi = [], []
+            for s in numpy.array(surfs,int) - 1:
+                mu, mv = [self.group_m[self.edge_group[abs(self.surf_edge[s,k,0])-1]-1] for k in range(2)]
+                mapping = PUBSlib.getmapping(s+1, mu, mv, self.nvert, self.surf_vert, self.surf_edge, self.surf_index_C, self.edge_index_C) - 1
+                X = self.C[mapping.flatten(),:3].dot(E)
+                lo.append(X.min(0))
+                hi.append(X.max(0))
+            self.pjtnTrees[key] = numpy.array(lo), numpy.array(hi)
+        return self.pjtnTrees[key]
+
     def edgeProperty(self, surf, p, d=None, val=None):
         """ Get/set the edge property for the u and v edges
         p: (integer)
@@ -500,24 +1331,33 @@ class PUBS(object):
         return [prop[group[i]] for i in range(2)]
 
     def visible2(self, s):
-        nu, nv = self.Nuv[s,:]
-        avg = 0
-        avg += self.evaluatePoint(s,0.1,0.1)[2]
-        avg += self.evaluatePoint(s,0.1,0.9)[2]
-        avg += self.evaluatePoint(s,0.9,0.1)[2]
-        avg += self.evaluatePoint(s,0.9,0.9)[2]
+        avg = numpy.sum(self.evaluatePoints(s*numpy.ones(4,int),[0.1,0.1,0.9,0.9],[0.1,0.9,0.1,0.9])[:,2])
         return self.visible[s] and avg > 0
 
+    def computeVisibility(self):
+        """ Evaluate visible2 for all surfaces at once; the bases at the
+            four sample points are kept until the Jacobian changes """
+
+        if self.visBases is None:
+            surf = numpy.repeat(numpy.arange(self.nsurf), 4)
+            u = numpy.tile([0.1,0.1,0.9,0.9], self.nsurf)
+            v = numpy.tile([0.1,0.9,0.1,0.9], self.nsurf)
+            self.visBases = self.evaluateBases(surf, u, v)
+        z = self.visBases.dot(self.C[:,2]).reshape((self.nsurf,4))
+        avg = z[:,0] + z[:,1] + z[:,2] + z[:,3]
+        return self.visible * (avg > 0)
+
     def exportPjtn(self, Q):
-        return numpy.sum(self.P0[:,3:6]*self.J0.dot(self.M.dot(Q)),1)
+        return numpy.sum(self.P0[:,3:6]*self.evaluateGrid(self.M.dot(Q)),1)
 
     def exportPstr(self, surfs=None):
         if surfs is None:
             surfs = range(self.nsurf)
 
+        visible = self.computeVisibility()
         Ps = []
         for s in surfs:
-            if self.visible2(s):# or True:
+            if visible[s]:
                 nu, nv = self.Nuv[s,:]
                 P = PUBSlib.inflatevector(nu, nv, self.nvar, nu*nv, self.P0[self.Np0[s]:self.Np0[s+1],:])
                 Ps.append(P)
@@ -525,63 +1365,44 @@ class PUBS(object):
         return Ps
 
     def exportPtri0(self, surfs=None):
-        if surfs is None:
-            surfs = range(self.nsurf)
-
-        index = lambda i,j,ni: ni*j + i
-
-        nTri = 0
-        for s in surfs:
-            if self.visible2(s):
-                nu, nv = self.Nuv[s,:]
-                nTri += 2*(nu-1)*(nv-1)
-
-        Tri = numpy.zeros((nTri,3),int,order='F')
-        iT = 0
-        for s in surfs:
-            if self.visible2(s):
-                nu, nv = self.Nuv[s,:]
-                for j in range(nv-1):
-                    for i in range(nu-1):
-                        Tri[iT,:] = self.Np0[s]
-                        Tri[iT,0] += index(i,j+1,nu)
-                        Tri[iT,1] += index(i,j,nu)
-                        Tri[iT,2] += index(i+1,j,nu)
-                        iT += 1
-                        Tri[iT,:] = self.Np0[s]
-                        Tri[iT,0] += index(i+1,j,nu)
-                        Tri[iT,1] += index(i+1,j+1,nu)
-                        Tri[iT,2] += index(i,j+1,nu)
-                        iT += 1
-
-        return Tri
+        Tris = self.exportPtri(surfs)
+        if len(Tris) == 0:
+            return numpy.zeros((0,3),int,order='F')
+        return numpy.array(numpy.vstack(Tris),order='F')
 
     def exportPtri(self, surfs=None):
+        """ Return a list of triangle connectivities into P0 for the
+            visible surfaces; the arrays are cached per visibility mask
+            and shared between calls, so they are returned read-only in
+            a fresh list """
+
         if surfs is None:
             surfs = range(self.nsurf)
 
-        index = lambda i,j,ni: ni*j + i
+        visible = self.computeVisibility()
+        surfs = [s for s in surfs if visible[s]]
+        key = numpy.array(surfs,int).tostring()
+        if key not in self.triCache:
+            Tris = [self.getTriangles(s) for s in surfs]
+            for Tri in Tris:
+                Tri.flags.writeable = False
+            self.triCache[key] = Tris
+        return list(self.triCache[key])
 
-        Tris = []
-        for s in surfs:
-            if self.visible2(s):
-                nu, nv = self.Nuv[s,:]
-                ntri = 2*(nu-1)*(nv-1)
-                Tri = self.Np0[s]*numpy.ones((ntri,3),int,order='F')
-                iT = 0
-                for j in range(nv-1):
-                    for i in range(nu-1):
-                        Tri[iT,0] += index(i,j+1,nu)
-                        Tri[iT,1] += index(i,j,nu)
-                        Tri[iT,2] += index(i+1,j,nu)
-                        iT += 1
-                        Tri[iT,0] += index(i+1,j,nu)
-                        Tri[iT,1] += index(i+1,j+1,nu)
-                        Tri[iT,2] += index(i,j+1,nu)
-                        iT += 1
-                Tris.append(Tri)
-
-        return Tris
+    def getTriangles(self, s):
+        """ Return the 2(nu-1)(nv-1) triangles splitting the P0 grid of surface s """
+
+        nu, nv = self.Nuv[s,:]
+        j, i = numpy.mgrid[:nv-1,:nu-1]
+        k = int(self.Np0[s]) + nu*j.flatten() + i.flatten()
+        Tri = numpy.zeros((2*k.shape[0],3),int,order='F')
+        Tri[0::2,0] = k + nu
+        Tri[0::2,1] = k
+        Tri[0::2,2] = k + 1
+        Tri[1::2,0] = k + 1
+        Tri[1::2,1] = k + nu + 1
+        Tri[1::2,2] = k + nu
+        return Tri
 
     def exportSurfs(self):
         nsurf = self.nsurf
@@ -589,8 +1410,9 @@ class PUBS(object):
         ms = numpy.zeros((nsurf,2),int,order='F')
         ds = [[],[]]
         Cs = []
+        visible = self.computeVisibility()
         for s in range(nsurf):
-            if self.visible2(s):
+            if visible[s]:
                 for d in range(2):
                     group = self.edge_group[abs(self.surf_edge[s,d,0])-1]
                     ks[s,d] = self.group_k[group-1]
@@ -607,26 +1429,44 @@ class PUBS(object):
         Ps = self.exportPstr()
         self.export.plot(Ps)
 
-    def write2Tec(self, filename):
+    def write2Tec(self, filename, binary=False):
+        if binary:
+            if not filename[-4:]=='.plt':
+                filename = filename + '.plt'
+            self.export.write2TecStructBinary(filename, self.exportPstr(), self.var)
+            return
         if not filename[-4:]=='.dat':
             filename = filename + '.dat'
         Ps = self.exportPstr()
         self.export.write2TecStruct(filename, Ps, self.var)
 
-    def write2TecP(self, filename):
+    def write2TecP(self, filename, binary=False):
+        if binary:
+            if not filename[-6:]=='_P.plt':
+                filename = filename + '_P.plt'
+            self.export.write2TecScatterBinary(filename, self.P, self.var)
+            return
         if not filename[-4:]=='_P.dat':
             filename = filename + '_P.dat'
         self.export.write2TecScatter(filename, self.P, self.var)
 
-    def write2TecC(self, filename):
+    def write2TecC(self, filename, binary=False):
+        if binary:
+            if not filename[-6:]=='_C.plt':
+                filename = filename + '_C.plt'
+            self.export.write2TecScatterBinary(filename, self.C, self.var)
+            return
         if not filename[-4:]=='_C.dat':
             filename = filename + '_C.dat'
         self.export.write2TecScatter(filename, self.C, self.var)
 
-    def write2STL(self, filename):
+    def write2STL(self, filename, binary=False):
         if not filename[-4:]=='.stl':
             filename = filename + '.stl'
-        self.export.write2STL(filename, self.P0, self.exportPtri())
+        if binary:
+            self.export.write2STLBinary(filename, self.P0, self.exportPtri())
+        else:
+            self.export.write2STL(filename, self.P0, self.exportPtri())
 
     def write2IGES(self, filename):
         if not filename[-4:]=='.igs':
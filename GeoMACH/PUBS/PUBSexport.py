@@ -93,6 +93,85 @@ class PUBSexport(object):
         f.write('endsolid model')
         f.close()
 
+    def write2STLBinary(self, filename, P, Ts):
+        T = numpy.vstack(Ts) if len(Ts) > 0 else numpy.zeros((0,3),int)
+        facets = numpy.zeros(T.shape[0], dtype=[('normal','<f4',3), ('vertex','<f4',(3,3)), ('attr','<u2')])
+        facets['normal'] = self.sanitize((P[T[:,0],3:6] + P[T[:,1],3:6] + P[T[:,2],3:6])/3.0)
+        for i in range(3):
+            facets['vertex'][:,i,:] = self.sanitize(P[T[:,i],:3])
+        f = open(filename,'wb')
+        f.write('binary STL: model'.ljust(80))
+        numpy.array(T.shape[0],'<u4').tofile(f)
+        facets.tofile(f)
+        f.close()
+
+    def sanitize(self, data):
+        """ Replace NaNs with zeros, as writeLine does """
+        return numpy.where(data == data, data, 0.0)
+
+    def writeTecString(self, f, string):
+        numpy.array([ord(c) for c in string] + [0],'<i4').tofile(f)
+
+    def writeTecBinary(self, filename, zones, variables, title):
+        """ Write a Tecplot binary (.plt, version 112) file
+
+        zones: list of [name, dims, data, quads]
+            dims is [I,J,K] for ordered zones or None for FE quadrilaterals;
+            data is (npts, nvar) in I-J-K order; quads are 1-based
+
+        """
+
+        i4 = lambda *vals: numpy.array(vals,'<i4').tofile(f)
+        f4 = lambda val: numpy.array(val,'<f4').tofile(f)
+
+        f = open(filename,'wb')
+        f.write('#!TDV112')
+        i4(1, 0)
+        self.writeTecString(f, title)
+        i4(len(variables))
+        for var in variables:
+            self.writeTecString(f, var)
+        for name, dims, data, quads in zones:
+            f4(299.0)
+            self.writeTecString(f, name)
+            i4(-1, -1)
+            numpy.array(0.0,'<f8').tofile(f)
+            i4(-1, 0 if quads is None else 3, 0, 0, 0)
+            if quads is None:
+                i4(*dims)
+            else:
+                i4(data.shape[0], quads.shape[0], 0, 0, 0)
+            i4(0)
+        f4(357.0)
+        for name, dims, data, quads in zones:
+            data = self.sanitize(numpy.array(data[:,:len(variables)],float))
+            f4(299.0)
+            i4(*([2]*data.shape[1]))
+            i4(0, 0, -1)
+            if data.shape[0] > 0:
+                bounds = [data.min(axis=0), data.max(axis=0)]
+            else:
+                bounds = numpy.zeros((2,data.shape[1]))
+            numpy.array(bounds,'<f8').T.tofile(f)
+            numpy.array(data,'<f8').T.tofile(f)
+            if quads is not None:
+                numpy.array(quads - 1,'<i4').tofile(f)
+        f.close()
+
+    def write2TecStructBinary(self, filename, Ps, variables, title="PUBS output"):
+        zones = []
+        for s in range(len(Ps)):
+            nu, nv, nvar = Ps[s].shape
+            data = Ps[s].reshape((nu*nv,nvar),order='F')
+            zones.append(['zone '+str(s), [nu,nv,1], data, None])
+        self.writeTecBinary(filename, zones, variables, title)
+
+    def write2TecFEquadsBinary(self, filename, zones, variables=['x','y','z'], title="PUBS output"):
+        self.writeTecBinary(filename, [[name, None, nodes, quads] for name, nodes, quads in zones], variables, title)
+
+    def write2TecScatterBinary(self, filename, C, variables, title="PUBS output"):
+        self.writeTecBinary(filename, [['zone', [C.shape[0],1,1], C, None]], variables, title)
+
     def write2IGES(self, filename, ks, ms, ds, Cs):
         def write(f, val, dirID, parID, field, last=False):
             if last:
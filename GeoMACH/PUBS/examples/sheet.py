@@ -0,0 +1,17 @@
+from __future__ import division
+import numpy
+
+
+def getSheet(N, n):
+    """ Wavy sheet split into N x N surfaces of n x n points each """
+
+    P0 = []
+    for i in range(N):
+        for j in range(N):
+            x = numpy.linspace(i, i+1, n)
+            y = numpy.linspace(j, j+1, n)
+            P = numpy.zeros((n,n,3),order='F')
+            P[:,:,0], P[:,:,1] = numpy.meshgrid(x, y, indexing='ij')
+            P[:,:,2] = 0.2*numpy.sin(P[:,:,0])*numpy.cos(P[:,:,1])
+            P0.append(P)
+    return P0
@@ -0,0 +1,61 @@
+from __future__ import division
+import numpy
+import multiprocessing
+import os
+import tempfile
+import time
+
+from GeoMACH.PGM.configurations.conventional import Conventional
+
+
+def runStages(aircraft, nproc, filename):
+    """ Mesh the airframe, returning the time of each stage and the mesh """
+
+    aircraft.oml0.computePoints()
+    afm = aircraft.getAirframe(nproc)
+    afm.preview(filename)
+    afm.meshS = []
+    afm.meshM = []
+    afm.computeTopology()
+    afm.computeAdjoiningEdges()
+    times = []
+    for stage in [afm.computeGroupIntersections, afm.computeFaces, afm.computeMembers, afm.computeSurfaces]:
+        t0 = time.time()
+        try:
+            stage()
+        except RuntimeError as e:
+            print 'stage failed:', e
+        times.append(time.time() - t0)
+    return times, afm
+
+
+def getMeshDiff(afm, ref):
+    """ Maximum difference between the face premeshes and member meshes """
+
+    diff = 0
+    for face, face0 in zip(afm.premeshFaces, ref.premeshFaces):
+        for A, A0 in zip(face[:2], face0[:2]):
+            diff = max(diff, numpy.max(numpy.abs(A - A0)))
+    if afm.meshM != [] and ref.meshM != []:
+        diff = max(diff, abs(afm.meshM[0] - ref.meshM[0]).max())
+        for quads, quads0 in zip(afm.meshM[1], ref.meshM[1]):
+            diff = max(diff, numpy.max(numpy.abs(quads - quads0)))
+    return diff
+
+
+if __name__ == '__main__':
+    filename = os.path.join(tempfile.mkdtemp(), 'pvw.dat')
+    aircraft = Conventional()
+    ncore = multiprocessing.cpu_count()
+    nprocs = [n for n in [1,2,4,8,16] if n <= max(2, ncore)]
+
+    results = []
+    for nproc in nprocs:
+        results.append(runStages(aircraft, nproc, filename))
+    os.remove(filename)
+
+    print '# cores =', ncore
+    print 'nproc   intersections   faces   members   surfaces   total(s)   mesh diff'
+    for nproc, (times, afm) in zip(nprocs, results):
+        diff = getMeshDiff(afm, results[0][1])
+        print '%5i   %13.4f %7.4f %9.4f %10.4f %10.4f   %.1e' % tuple([nproc] + times + [sum(times), diff])
@@ -0,0 +1,55 @@
+from __future__ import division
+import numpy
+import scipy.sparse
+import time
+
+from GeoMACH.PGM.configurations.conventional import Conventional
+
+
+def getSize(value):
+    if scipy.sparse.issparse(value):
+        return value.data.nbytes + value.indices.nbytes + value.indptr.nbytes
+    elif isinstance(value, numpy.ndarray):
+        return value.nbytes
+    return 0
+
+
+def getPUBSMemory(oml, base):
+    """ Bytes of the arrays of oml that are and are not shared with base """
+
+    shared = 0
+    private = 0
+    for name, value in oml.__dict__.items():
+        if value is base.__dict__.get(name):
+            shared += getSize(value)
+        else:
+            private += getSize(value)
+    return shared, private
+
+
+if __name__ == '__main__':
+    nclone = 10
+
+    t0 = time.time()
+    aircraft = Conventional()
+    tbuild = time.time() - t0
+
+    t0 = time.time()
+    clones = [aircraft.clone() for i in range(nclone)]
+    tclone = (time.time() - t0)/nclone
+
+    shared, private = getPUBSMemory(clones[0].oml0, aircraft.oml0)
+    print '# DOFs =', aircraft.oml0.nQ
+    print '              time(s)'
+    print 'build         %10.4f' % tbuild
+    print 'clone         %10.4f' % tclone
+    print 'PUBS arrays per clone(MB): shared %.1f  private %.1f' % (shared/2**20, private/2**20)
+
+    par = clones[0].comps['lw'].params['pos1']
+    P = par.P[:,:,0].copy()
+    P[1,1] += 2.0
+    clones[0].set_parameter('lw.pos1', P)
+    clones[0].computePoints()
+    aircraft.set_parameter('lw.pos1', P)
+    aircraft.computePoints(full=True)
+    print 'max diff (Q, P0): %.1e %.1e' % (numpy.max(numpy.abs(aircraft.oml0.Q - clones[0].oml0.Q)), numpy.nanmax(numpy.abs(aircraft.oml0.P0 - clones[0].oml0.P0)))
@@ -0,0 +1,25 @@
+from __future__ import division
+import numpy
+import time
+
+from GeoMACH.PUBS import PUBS
+from GeoMACH.PUBS.examples.sheet import getSheet
+
+
+if __name__ == '__main__':
+    numpy.random.seed(0)
+    ders = [(0,0),(1,0),(0,1),(2,0),(1,1),(0,2)]
+    print 'nsurf    npts    separate(us/pt)   fused(us/pt)   speedup   max diff'
+    for N in [4,16]:
+        oml = PUBS.PUBS(getSheet(N, 10))
+        for npts in [1000,100000]:
+            s = numpy.random.randint(0, N**2, npts)
+            u = numpy.random.rand(npts)
+            v = numpy.random.rand(npts)
+            t0 = time.time()
+            P0 = [oml.evaluatePoints(s, u, v, uder, vder) for uder, vder in ders]
+            t1 = time.time()
+            P1 = oml.evaluateDerivatives(s, u, v)
+            t2 = time.time()
+            diff = max([numpy.max(numpy.abs(P1[:,:,i] - P0[i])) for i in range(6)])
+            print '%5i  %7i     %12.3f    %12.3f    %6.2f   %9.2e' % (N**2, npts, 1e6*(t1-t0)/npts, 1e6*(t2-t1)/npts, (t1-t0)/(t2-t1), diff)
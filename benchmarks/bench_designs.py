@@ -0,0 +1,49 @@
+from __future__ import division
+import numpy
+import time
+
+from GeoMACH.PGM.configurations.conventional import Conventional
+
+
+def getDesigns(aircraft, ndesign):
+    """ Random perturbations of the wing and tail positions """
+
+    numpy.random.seed(0)
+    x0 = aircraft.getParameters()
+    X = numpy.tile(x0, (ndesign,1))
+    for name, start, shape in aircraft.getParameterLayout():
+        if name.split('.')[1][:3] == 'pos':
+            n = shape[0]*shape[1]
+            X[:,start:start+n] += 0.1*(numpy.random.rand(ndesign,n) - 0.5)
+    return X
+
+
+def evaluateSerial(aircraft, X):
+    oml0 = aircraft.oml0
+    x0 = aircraft.getParameters()
+    Q = []
+    P0 = []
+    N = []
+    for d in range(X.shape[0]):
+        aircraft.setParameters(X[d])
+        aircraft.computePoints()
+        Q.append(numpy.array(oml0.Q[:,:3]))
+        P0.append(numpy.array(oml0.P0[:,:3]))
+        N.append(numpy.array(oml0.P0[:,3:6]))
+    aircraft.setParameters(x0)
+    aircraft.computePoints()
+    return numpy.array(Q), numpy.array(P0), numpy.array(N)
+
+
+if __name__ == '__main__':
+    aircraft = Conventional()
+    print 'ndesign    serial(s)   batch(s)    max diff (Q, P0, N)'
+    for ndesign in [1,4,16,64]:
+        X = getDesigns(aircraft, ndesign)
+        t0 = time.time()
+        ref = evaluateSerial(aircraft, X)
+        t1 = time.time()
+        out = aircraft.evaluateDesigns(X, normals=True)
+        t2 = time.time()
+        diff = [numpy.nanmax(numpy.abs(A - B)) for A, B in zip(ref, out)]
+        print '%7i   %9.4f  %9.4f    %.1e %.1e %.1e' % (ndesign, t1-t0, t2-t1, diff[0], diff[1], diff[2])
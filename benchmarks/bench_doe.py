@@ -0,0 +1,42 @@
+from __future__ import division
+import numpy
+import multiprocessing
+import time
+
+from GeoMACH.PGM.configurations.conventional import Conventional
+from bench_designs import getDesigns
+from GeoMACH.PGM.configurations.doe import runDOE
+
+
+def getMaxZ(Q, P0):
+    return numpy.max(P0[:,2])
+
+
+if __name__ == '__main__':
+    ndesign = 64
+    aircraft = Conventional()
+    X = getDesigns(aircraft, ndesign)
+    ncore = multiprocessing.cpu_count()
+    nprocs = [n for n in [1,2,4,8,16,32] if n <= ncore]
+
+    ref = []
+    for d in range(ndesign):
+        aircraft.setParameters(X[d])
+        aircraft.updateQs()
+        ref.append(numpy.max(aircraft.oml0.getComposites()[0].dot(aircraft.oml0.Q[:,:3])[:,2]))
+    aircraft.setParameters(X[0])
+    aircraft.computePoints(full=True)
+
+    print '# cores =', ncore, ' # designs =', ndesign
+    print 'nproc   output    time(s)   designs/s   speedup   max diff'
+    for name, reduce in [('reduce', getMaxZ), ('P0', None)]:
+        t1 = None
+        for nproc in nprocs:
+            t0 = time.time()
+            results = [None]*ndesign
+            for d, result in runDOE(aircraft, X, reduce, nproc, chunk=4):
+                results[d] = result if reduce is not None else numpy.max(result[:,2])
+            dt = time.time() - t0
+            t1 = dt if t1 is None else t1
+            diff = numpy.max(numpy.abs(numpy.array(results) - ref))
+            print '%5i   %-6s  %9.4f   %9.2f   %7.2f   %.1e' % (nproc, name, dt, ndesign/dt, t1/dt, diff)
@@ -0,0 +1,31 @@
+from __future__ import division
+import numpy
+import os
+import time
+
+from GeoMACH.PUBS import PUBS
+from GeoMACH.PUBS.examples.sheet import getSheet
+
+
+def timeWriter(write, filename, binary):
+    t0 = time.time()
+    write(filename, binary=binary)
+    return time.time() - t0
+
+
+if __name__ == '__main__':
+    print 'nsurf    format     ascii(s)   binary(s)   ascii(MB)   binary(MB)'
+    for N in [4,8,16]:
+        oml = PUBS.PUBS(getSheet(N, 10))
+        oml.exportPtri()
+        for name, write, ext in [('struct', oml.write2Tec, ['.dat','.plt']),
+                                 ('scatter', oml.write2TecC, ['_C.dat','_C.plt']),
+                                 ('stl', oml.write2STL, ['.stl','.stl'])]:
+            sizes = []
+            times = []
+            for binary in [False, True]:
+                filename = 'bench_export%i' % binary
+                times.append(timeWriter(write, filename, binary))
+                sizes.append(os.path.getsize(filename + ext[binary])/2**20)
+                os.remove(filename + ext[binary])
+            print '%5i    %-8s   %9.4f   %9.4f   %9.3f   %9.3f' % (N**2, name, times[0], times[1], sizes[0], sizes[1])
@@ -0,0 +1,60 @@
+from __future__ import division
+import numpy
+import scipy.sparse
+import time
+
+from GeoMACH.PSM.airframe import Airframe
+from GeoMACH.PGM.configurations.conventional import Conventional
+
+
+def getAirframe(aircraft, n):
+    """ Airframe with n x n grids of wing and fuselage members """
+
+    afm = Airframe(aircraft, 0.2)
+    idims = numpy.linspace(0.1,0.9,n+1)
+    jdims = numpy.linspace(0,0.9,n+1)
+    for i in range(n):
+        for j in range(n+1):
+            afm.addVertFlip('Mlw:'+str(i)+':'+str(j),'lw',[idims[i],jdims[j]],[idims[i+1],jdims[j]])
+            afm.addVertFlip('Mrw:'+str(i)+':'+str(j),'rw',[idims[i],1-jdims[j]],[idims[i+1],1-jdims[j]])
+            afm.addVert('Mfu:'+str(i)+':'+str(j),'fu',[idims[i],jdims[j]],[idims[i+1],jdims[j]],w=[1.0,0.94],i=[0,2])
+    return afm
+
+
+def sumNodeBases(afm, nnode, points):
+    """ Reference assembly adding one weighted product per source and surface """
+
+    oml0 = afm.geometry.oml0
+    B0 = scipy.sparse.csr_matrix((nnode,oml0.C.shape[0]))
+    for node, weight, s, u, v in points:
+        npts = node.shape[0]
+        W = scipy.sparse.csr_matrix((weight,(node,numpy.arange(npts))),shape=(nnode,npts))
+        B0 = B0 + W.dot(oml0.evaluateBases(s, u, v))
+    return B0
+
+
+if __name__ == '__main__':
+    aircraft = Conventional()
+    print 'nmem    npoint    summed(s)   assembled(s)   max diff'
+    for n in [4,8,16,32]:
+        afm = getAirframe(aircraft, n)
+        afm.preview = []
+        afm.computePreviewSurfaces()
+        afm.computeFaceDimensions()
+        afm.importMembers()
+
+        captured = []
+        def capture(nnode, points):
+            captured.append([nnode, points])
+            return Airframe.assembleNodeBases(afm, nnode, points)
+        afm.assembleNodeBases = capture
+        afm.computePreviewMembers()
+        nnode, points = captured[0]
+
+        t0 = time.time()
+        B1 = sumNodeBases(afm, nnode, points)
+        t1 = time.time()
+        B2 = Airframe.assembleNodeBases(afm, nnode, points)
+        t2 = time.time()
+        npoint = sum([p[0].shape[0] for p in points])
+        print '%5i  %8i   %9.4f   %12.4f   %9.1e' % (afm.nmem, npoint, t1-t0, t2-t1, abs(B1-B2).max())
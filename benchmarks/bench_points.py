@@ -0,0 +1,51 @@
+from __future__ import division
+import numpy
+import time
+
+from GeoMACH.PGM.configurations.conventional import Conventional
+
+
+def computePointsReference(oml):
+    """ Unfused C, P, P0, and normals, allocating new arrays each call """
+
+    C = oml.M.dot(oml.Q)
+    P = oml.J.dot(C)
+    P0 = oml.J0.dot(C)
+    Pu = oml.Ju.dot(C[:,:3])
+    Pv = oml.Jv.dot(C[:,:3])
+    nor = numpy.cross(Pu, Pv)
+    norms = numpy.sum(nor**2,axis=1)**0.5
+    for k in range(3):
+        P0[:,3+k] = nor[:,k]/norms
+    return [C, P, P0, Pu, Pv], [C, P, P0, Pu, Pv, nor, norms]
+
+
+def getPointers(oml):
+    return [getattr(oml, name).ctypes.data for name in ['C','P','P0','Pu','Pv']]
+
+
+if __name__ == '__main__':
+    nrep = 20
+    aircraft = Conventional()
+    oml = aircraft.oml0
+
+    t0 = time.time()
+    for i in range(nrep):
+        ref, temps = computePointsReference(oml)
+    tref = (time.time() - t0)/nrep
+    aref = sum([A.nbytes for A in temps])
+
+    oml.computePoints()
+    ptrs = getPointers(oml)
+    t0 = time.time()
+    for i in range(nrep):
+        oml.computePoints()
+    tnew = (time.time() - t0)/nrep
+    anew = sum([getattr(oml, name).nbytes for name, p0, p1 in zip(['C','P','P0','Pu','Pv'], ptrs, getPointers(oml)) if p0 != p1])
+
+    diff = [numpy.nanmax(numpy.abs(A - getattr(oml, name))) for name, A in zip(['C','P','P0','Pu','Pv'], ref)]
+    print '# DOFs =', oml.nQ, ' # P0 points =', int(oml.Np0[-1])
+    print '              time/call(s)   output arrays allocated/call(MB)'
+    print 'unfused       %10.4f      %10.2f' % (tref, aref/2**20)
+    print 'composite     %10.4f      %10.2f' % (tnew, anew/2**20)
+    print 'max diff (C, P, P0, Pu, Pv):', ' '.join(['%.1e' % d for d in diff])
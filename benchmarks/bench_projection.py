@@ -0,0 +1,59 @@
+from __future__ import division
+import numpy
+import time
+
+from GeoMACH.PUBS import PUBS
+from GeoMACH.PUBS.examples.sheet import getSheet
+
+
+def getResidual(oml, P, s, u, v, Q):
+    X = oml.evaluateBases(s,u,v).dot(oml.C[:,:3])
+    if Q is None:
+        return numpy.sum((X-P)**2,axis=1)**0.5
+    else:
+        return numpy.sum((X[:,:2]-P[:,:2])**2,axis=1)**0.5
+
+
+if __name__ == '__main__':
+    npts = 2000
+    numpy.random.seed(0)
+    print 'nsurf    search     brute(s)   indexed(s)   max residual diff'
+    for N in [2,4,8,16]:
+        oml = PUBS.PUBS(getSheet(N, 10))
+        P = numpy.zeros((npts,3),order='F')
+        P[:,:2] = N*numpy.random.rand(npts,2)
+        P[:,2] = 0.5*numpy.random.rand(npts) - 0.25
+        Q = numpy.zeros((npts,3),order='F')
+        Q[:,2] = 1.
+        for name, R in [('closest', None), ('along z', Q)]:
+            t0 = time.time()
+            s,u,v = oml.evaluateProjection(P, Q=R, nseed=0)
+            t1 = time.time()
+            s1,u1,v1 = oml.evaluateProjection(P, Q=R)
+            t2 = time.time()
+            d0 = getResidual(oml, P, s, u, v, R)
+            d1 = getResidual(oml, P, s1, u1, v1, R)
+            print '%5i    %-8s   %9.4f   %9.4f   %12.3e' % (N**2, name, t1-t0, t2-t1, numpy.max(d1-d0))
+
+    print
+    print 'nsurf    search     cold(s)    warm(s)    nwarm  nsearch  max residual diff'
+    for N in [2,4,8,16]:
+        oml = PUBS.PUBS(getSheet(N, 10))
+        P = numpy.zeros((npts,3),order='F')
+        P[:,:2] = N*numpy.random.rand(npts,2)
+        P[:,2] = 0.2*numpy.sin(P[:,0])*numpy.cos(P[:,1])
+        Q = numpy.zeros((npts,3),order='F')
+        Q[:,2] = 1.
+        for name, R in [('closest', None), ('along z', Q)]:
+            s0,u0,v0 = oml.evaluateProjection(P, Q=R)
+            P1 = numpy.array(P, order='F')
+            P1[:,:2] += 1e-3*(numpy.random.rand(npts,2) - 0.5)
+            P1[:,2] = 0.2*numpy.sin(P1[:,0])*numpy.cos(P1[:,1])
+            t0 = time.time()
+            s,u,v = oml.evaluateProjection(P1, Q=R)
+            t1 = time.time()
+            s1,u1,v1,info = oml.evaluateProjection(P1, Q=R, surf0=s0, u0=u0, v0=v0, stats=True)
+            t2 = time.time()
+            d0 = getResidual(oml, P1, s, u, v, R)
+            d1 = getResidual(oml, P1, s1, u1, v1, R)
+            print '%5i    %-8s   %9.4f  %9.4f  %7i  %7i   %12.3e' % (N**2, name, t1-t0, t2-t1, info['nwarm'], info['nsearch'], numpy.max(d1-d0))
@@ -0,0 +1,88 @@
+from __future__ import division
+import numpy
+import time
+
+from GeoMACH.PSM import QUADlib
+from GeoMACH.PSM.QUAD import QUAD
+
+
+def getLines(n):
+    """ Unit face with n x n grid members and n diagonal members """
+
+    t = numpy.linspace(0,1,n+2)
+    lines = []
+    for i in range(n+2):
+        lines.append([[t[i],0],[t[i],1]])
+        lines.append([[0,t[i]],[1,t[i]]])
+    for i in range(n):
+        lines.append([[t[i],0],[t[i+1],1]])
+    return numpy.array(lines, order='F')
+
+
+def countIntersectionsBrute(verts, edges):
+    """ All-pairs reference for QUADlib.countintersectionpts """
+
+    A = verts[edges[:,0]-1]
+    d = verts[edges[:,1]-1] - A
+    i1, i2 = numpy.triu_indices(edges.shape[0], 1)
+    det = -d[i1,0]*d[i2,1] + d[i2,0]*d[i1,1]
+    rhs = A[i2] - A[i1]
+    ok = numpy.abs(det) > 1e-12
+    det[~ok] = 1.
+    v1 = (-d[i2,1]*rhs[:,0] + d[i2,0]*rhs[:,1])/det
+    v2 = (-d[i1,1]*rhs[:,0] + d[i1,0]*rhs[:,1])/det
+    tol = 1e-12
+    return numpy.sum(ok & (v1 >= -tol) & (v1 <= 1+tol) & (v2 >= -tol) & (v2 <= 1+tol))
+
+
+def countSplitsBrute(verts, edges):
+    """ All-pairs reference for QUADlib.countsplits """
+
+    nsplit = 0
+    for i1, i2 in edges - 1:
+        v1 = verts - verts[i1]
+        v2 = verts - verts[i2]
+        det = numpy.abs(v1[:,0]*v2[:,1] - v1[:,1]*v2[:,0])
+        valid = (det < 1e-10) & (numpy.sum(v1*v2,1) < 0)
+        valid[[i1,i2]] = False
+        nsplit += numpy.sum(valid)
+    return nsplit
+
+
+if __name__ == '__main__':
+    print 'Raw member lines, as in premeshFace'
+    print 'nedge   nvert   intersect(s)   split(s)    nint   nsplit   brute'
+    results = []
+    for n in [8,16,32,64,128,256]:
+        quad = QUAD()
+        quad.importEdges(getLines(n))
+        verts0, edges0 = quad.verts, quad.edges
+        nvert, nedge = verts0.shape[0], edges0.shape[0]
+
+        t0 = time.time()
+        nint = QUADlib.countintersectionpts(nvert, nedge, verts0, edges0)
+        quad.addIntersectionPts()
+        t1 = time.time()
+        quad.removeDuplicateVerts()
+        verts1, edges1 = quad.verts, quad.edges
+        nvert = verts1.shape[0]
+        t2 = time.time()
+        nsplit = QUADlib.countsplits(nvert, nedge, verts1, edges1)
+        quad.splitEdges()
+        t3 = time.time()
+
+        match = '-'
+        if n <= 64:
+            match = nint == countIntersectionsBrute(verts0, edges0) and \
+                nsplit == countSplitsBrute(verts1, edges1)
+        print '%5i  %6i   %12.4f   %8.4f  %6i   %6i   %s' % (nedge, nvert, t1-t0, t3-t2, nint, nsplit, match)
+        results.append([n, quad.verts, quad.edges])
+
+    print
+    print 'Split edges, as in meshPatch'
+    print ' nedge    nvert   intersect(s)     nint'
+    for n, verts, edges in results:
+        t0 = time.time()
+        nint = QUADlib.countintersectionpts(verts.shape[0], edges.shape[0], verts, edges)
+        t1 = time.time()
+        print '%6i  %7i   %12.4f  %7i' % (edges.shape[0], verts.shape[0], t1-t0, nint)
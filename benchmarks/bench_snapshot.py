@@ -0,0 +1,35 @@
+from __future__ import division
+import numpy
+import os
+import tempfile
+import time
+
+from GeoMACH.PGM.configurations.conventional import Conventional
+from GeoMACH.PGM.configurations.configuration import loadSnapshot
+
+
+if __name__ == '__main__':
+    filename = os.path.join(tempfile.mkdtemp(), 'conventional.snap')
+
+    t0 = time.time()
+    aircraft = Conventional()
+    tbuild = time.time() - t0
+
+    t0 = time.time()
+    aircraft.saveSnapshot(filename)
+    tsave = time.time() - t0
+
+    t0 = time.time()
+    restored = loadSnapshot(filename)
+    tload = time.time() - t0
+    size = os.path.getsize(filename)
+    os.remove(filename)
+
+    restored.computePoints(full=True)
+    aircraft.computePoints(full=True)
+    print '              time(s)'
+    print 'build         %10.4f' % tbuild
+    print 'save          %10.4f' % tsave
+    print 'load          %10.4f' % tload
+    print 'snapshot size(MB) = %.1f' % (size/2**20)
+    print 'max diff (Q, P0): %.1e %.1e' % (numpy.max(numpy.abs(aircraft.oml0.Q - restored.oml0.Q)), numpy.nanmax(numpy.abs(aircraft.oml0.P0 - restored.oml0.P0)))
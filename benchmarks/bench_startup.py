@@ -0,0 +1,34 @@
+from __future__ import division
+import numpy
+import os
+import shutil
+import tempfile
+import time
+
+from GeoMACH.PUBS import PUBS
+from GeoMACH.PGM.configurations.conventional import Conventional
+
+
+def timeStartup():
+    t0 = time.time()
+    aircraft = Conventional()
+    return time.time() - t0, aircraft.oml0
+
+
+if __name__ == '__main__':
+    cacheDir = tempfile.mkdtemp()
+    tref, ref = timeStartup()
+    PUBS.PUBS.cacheDir = cacheDir
+    tcold, cold = timeStartup()
+    twarm, warm = timeStartup()
+    size = sum([os.path.getsize(os.path.join(cacheDir, f)) for f in os.listdir(cacheDir)])
+    nfile = len(os.listdir(cacheDir))
+    shutil.rmtree(cacheDir)
+    PUBS.PUBS.cacheDir = None
+
+    print '              startup(s)'
+    print 'no cache      %10.4f' % tref
+    print 'cold cache    %10.4f' % tcold
+    print 'warm cache    %10.4f' % twarm
+    print 'cache files =', nfile, ' size(MB) = %.1f' % (size/2**20)
+    print 'max diff (Q, P0): %.1e %.1e' % (numpy.max(numpy.abs(ref.Q - warm.Q)), numpy.nanmax(numpy.abs(ref.P0 - warm.P0)))
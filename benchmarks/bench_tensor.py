@@ -0,0 +1,34 @@
+from __future__ import division
+import numpy
+import time
+
+from GeoMACH.PUBS import PUBS
+from GeoMACH.PUBS.examples.sheet import getSheet
+
+
+def getBytes(A):
+    return A.data.nbytes + A.indices.nbytes + A.indptr.nbytes
+
+
+def timeGrid(oml, nrep=10):
+    t0 = time.time()
+    for i in range(nrep):
+        for uder, vder in [(0,0),(1,0),(0,1)]:
+            oml.evaluateGrid(oml.C, uder, vder)
+    return (time.time() - t0)/nrep
+
+
+if __name__ == '__main__':
+    print 'nsurf     n    sparse(MB)   tensor(MB)   sparse(s)   tensor(s)   max diff'
+    for N in [4,8,16]:
+        for n in [10,30]:
+            oml = PUBS.PUBS(getSheet(N, n))
+            P = [oml.evaluateGrid(oml.C, uder, vder) for uder, vder in [(0,0),(1,0),(0,1)]]
+            mem0 = sum([getBytes(getattr(oml, name)) for name in ['J0','Ju','Jv']])/2**20
+            t0 = timeGrid(oml)
+            oml.tensor = True
+            oml.computeJacobian()
+            mem1 = sum([sum([B.nbytes for B in Bu + Bv]) + maps.nbytes + rows.nbytes for Bu, Bv, maps, rows in oml.tensorBases])/2**20
+            t1 = timeGrid(oml)
+            diff = max([numpy.max(numpy.abs(oml.evaluateGrid(oml.C, uder, vder) - P[i])) for i, (uder, vder) in enumerate([(0,0),(1,0),(0,1)])])
+            print '%5i  %4i   %10.3f   %10.3f   %9.4f   %9.4f   %9.2e' % (N**2, n, mem0, mem1, t0, t1, diff)
@@ -0,0 +1,27 @@
+from __future__ import division
+import numpy
+import time
+
+from GeoMACH.PUBS import PUBSlib
+
+
+def getSamples(N):
+    """ 3 x 3 samples of a wavy sheet split into N x N surfaces """
+
+    Ps = numpy.zeros((N**2,3,3,3),order='F')
+    for i in range(N):
+        for j in range(N):
+            x = i + numpy.linspace(0,1,3)
+            y = j + numpy.linspace(0,1,3)
+            Ps[i*N+j,:,:,0], Ps[i*N+j,:,:,1] = numpy.meshgrid(x, y, indexing='ij')
+            Ps[i*N+j,:,:,2] = 0.2*numpy.sin(Ps[i*N+j,:,:,0])*numpy.cos(Ps[i*N+j,:,:,1])
+    return Ps
+
+
+if __name__ == '__main__':
+    print '  nsurf    nvert    nedge    time(s)'
+    for N in [10,20,40,70,100,141]:
+        Ps = getSamples(N)
+        t0 = time.time()
+        nvert, nedge, surf_vert, surf_edge = PUBSlib.initializeconnectivities(N**2,1e-13,1e-5,Ps)
+        print '%7i  %7i  %7i  %9.4f' % (N**2, nvert, nedge, time.time()-t0)
@@ -16,6 +16,7 @@ PUBSsources = [
     'src/PUBS/patchwork/computeParameters.f90',
     'src/PUBS/patchwork/computeJacobian.f90',
     'src/PUBS/patchwork/computeDOFmapping.f90', 
+    'src/PUBS/patchwork/computeProducts.f90',
     'src/PUBS/patchwork/evaluatePoints.f90',
     'src/PUBS/patchwork/evaluateProjections.f90',
     'src/PUBS/patchwork/getSurface.f90',
@@ -58,6 +59,7 @@ QUADsources = [
     'src/PSM/QUAD/importEdges.f90',
     'src/PSM/QUAD/reorderCollinear.f90',
     'src/PSM/QUAD/addIntersectionPts.f90',
+    'src/PSM/QUAD/computeBins.f90',
     'src/PSM/QUAD/addEdgePts.f90',
     'src/PSM/QUAD/addInteriorPts.f90',
     'src/PSM/QUAD/splitEdges.f90',
@@ -18,15 +18,31 @@ subroutine addIntersectionPts(nvert0, nedge, nvert, verts0, edges, verts)
   double precision, intent(out) ::  verts(nvert,2)
 
   !Working
-  integer ivert, i1, i2
+  integer ivert, i1, i2, k, nbin, nentry, ncand
   logical valid
-  double precision v(2)
+  double precision v(2), x0(2), dx(2)
+  double precision, allocatable, dimension(:,:) ::  boxes
+  integer, allocatable, dimension(:) ::  ptr, list, stamp, cand
 
   verts(1:nvert0,:) = verts0(:,:)
 
+  allocate(boxes(nedge,4))
+  call getEdgeBoxes(nvert0, nedge, verts0, edges, boxes)
+  call computeBinGrid(nedge, boxes, nbin, x0, dx)
+  call countBinEntries(nedge, nbin, x0, dx, boxes, nentry)
+  allocate(ptr(nbin*nbin+1))
+  allocate(list(nentry))
+  allocate(stamp(nedge))
+  allocate(cand(nedge))
+  call computeBins(nedge, nbin, nentry, x0, dx, boxes, ptr, list)
+
+  stamp(:) = 0
   ivert = nvert0 + 1
   do i1=1,nedge
-     do i2=i1+1,nedge
+     call getBinCandidates(nedge, nbin, nentry, i1, i1, x0, dx, &
+          boxes(i1,:), boxes, ptr, list, stamp, ncand, cand)
+     do k=1,ncand
+        i2 = cand(k)
         call intersect(verts0(edges(i1,1),:), verts0(edges(i1,2),:), &
              verts0(edges(i2,1),:), verts0(edges(i2,2),:), valid, v)
         if (valid) then
@@ -36,6 +52,12 @@ subroutine addIntersectionPts(nvert0, nedge, nvert, verts0, edges, verts)
      end do
   end do
 
+  deallocate(boxes)
+  deallocate(ptr)
+  deallocate(list)
+  deallocate(stamp)
+  deallocate(cand)
+
 end subroutine addIntersectionPts
 
 
@@ -60,13 +82,29 @@ subroutine countIntersectionPts(nvert, nedge, verts, edges, nint)
   integer, intent(out) ::  nint
 
   !Working
-  integer i1, i2
+  integer i1, i2, k, nbin, nentry, ncand
   logical valid
-  double precision v(2)
-
+  double precision v(2), x0(2), dx(2)
+  double precision, allocatable, dimension(:,:) ::  boxes
+  integer, allocatable, dimension(:) ::  ptr, list, stamp, cand
+
+  allocate(boxes(nedge,4))
+  call getEdgeBoxes(nvert, nedge, verts, edges, boxes)
+  call computeBinGrid(nedge, boxes, nbin, x0, dx)
+  call countBinEntries(nedge, nbin, x0, dx, boxes, nentry)
+  allocate(ptr(nbin*nbin+1))
+  allocate(list(nentry))
+  allocate(stamp(nedge))
+  allocate(cand(nedge))
+  call computeBins(nedge, nbin, nentry, x0, dx, boxes, ptr, list)
+
+  stamp(:) = 0
   nint = 0
   do i1=1,nedge
-     do i2=i1+1,nedge
+     call getBinCandidates(nedge, nbin, nentry, i1, i1, x0, dx, &
+          boxes(i1,:), boxes, ptr, list, stamp, ncand, cand)
+     do k=1,ncand
+        i2 = cand(k)
         call intersect(verts(edges(i1,1),:), verts(edges(i1,2),:), &
              verts(edges(i2,1),:), verts(edges(i2,2),:), valid, v)
         if (valid) then
@@ -75,11 +113,57 @@ subroutine countIntersectionPts(nvert, nedge, verts, edges, nint)
      end do
   end do
 
+  deallocate(boxes)
+  deallocate(ptr)
+  deallocate(list)
+  deallocate(stamp)
+  deallocate(cand)
+
 end subroutine countIntersectionPts
 
 
 
 
+subroutine getEdgeBoxes(nvert, nedge, verts, edges, boxes)
+
+  implicit none
+
+  !Fortran-python interface directives
+  !f2py intent(in) nvert, nedge, verts, edges
+  !f2py intent(out) boxes
+  !f2py depend(nvert) verts
+  !f2py depend(nedge) edges, boxes
+
+  !Input
+  integer, intent(in) ::  nvert, nedge
+  double precision, intent(in) ::  verts(nvert,2)
+  integer, intent(in) ::  edges(nedge,2)
+
+  !Output
+  double precision, intent(out) ::  boxes(nedge,4)
+
+  !Working
+  integer iedge, k
+  double precision A(2), B(2), pad
+
+  !Bounding boxes padded beyond the 1e-12 parametric tolerance of
+  !intersect, so every intersecting pair has overlapping boxes
+
+  do iedge=1,nedge
+     A = verts(edges(iedge,1),:)
+     B = verts(edges(iedge,2),:)
+     pad = 1e-6*sqrt(dot_product(B-A,B-A)) + 1e-12
+     do k=1,2
+        boxes(iedge,k) = min(A(k),B(k)) - pad
+        boxes(iedge,k+2) = max(A(k),B(k)) + pad
+     end do
+  end do
+
+end subroutine getEdgeBoxes
+
+
+
+
 subroutine intersect(a1, b1, a2, b2, valid, v)
 
   implicit none
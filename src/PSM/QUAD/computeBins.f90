@@ -0,0 +1,218 @@
+subroutine computeBinGrid(nbox, boxes, nbin, x0, dx)
+
+  implicit none
+
+  !Fortran-python interface directives
+  !f2py intent(in) nbox, boxes
+  !f2py intent(out) nbin, x0, dx
+  !f2py depend(nbox) boxes
+
+  !Input
+  integer, intent(in) ::  nbox
+  double precision, intent(in) ::  boxes(nbox,4)
+
+  !Output
+  integer, intent(out) ::  nbin
+  double precision, intent(out) ::  x0(2), dx(2)
+
+  !Working
+  integer k
+
+  !Uniform nbin x nbin grid over the boxes (xmin, ymin, xmax, ymax)
+  !with about one box per bin
+
+  nbin = max(1, min(int(sqrt(dble(nbox))), 1000))
+  x0(:) = 0.0
+  dx(:) = 1.0
+  if (nbox .gt. 0) then
+     do k=1,2
+        x0(k) = minval(boxes(:,k))
+        dx(k) = (maxval(boxes(:,k+2)) - x0(k))/nbin
+        if (dx(k) .le. 0) then
+           dx(k) = 1.0
+        end if
+     end do
+  end if
+
+end subroutine computeBinGrid
+
+
+
+
+subroutine getBinRange(nbin, x0, dx, box, i0, i1)
+
+  implicit none
+
+  !Fortran-python interface directives
+  !f2py intent(in) nbin, x0, dx, box
+  !f2py intent(out) i0, i1
+
+  !Input
+  integer, intent(in) ::  nbin
+  double precision, intent(in) ::  x0(2), dx(2), box(4)
+
+  !Output
+  integer, intent(out) ::  i0(2), i1(2)
+
+  !Working
+  integer k
+
+  do k=1,2
+     i0(k) = min(max(int(floor((box(k) - x0(k))/dx(k))) + 1, 1), nbin)
+     i1(k) = min(max(int(floor((box(k+2) - x0(k))/dx(k))) + 1, 1), nbin)
+  end do
+
+end subroutine getBinRange
+
+
+
+
+subroutine countBinEntries(nbox, nbin, x0, dx, boxes, nentry)
+
+  implicit none
+
+  !Fortran-python interface directives
+  !f2py intent(in) nbox, nbin, x0, dx, boxes
+  !f2py intent(out) nentry
+  !f2py depend(nbox) boxes
+
+  !Input
+  integer, intent(in) ::  nbox, nbin
+  double precision, intent(in) ::  x0(2), dx(2), boxes(nbox,4)
+
+  !Output
+  integer, intent(out) ::  nentry
+
+  !Working
+  integer ibox, i0(2), i1(2)
+
+  nentry = 0
+  do ibox=1,nbox
+     call getBinRange(nbin, x0, dx, boxes(ibox,:), i0, i1)
+     nentry = nentry + (i1(1)-i0(1)+1)*(i1(2)-i0(2)+1)
+  end do
+
+end subroutine countBinEntries
+
+
+
+
+subroutine computeBins(nbox, nbin, nentry, x0, dx, boxes, ptr, list)
+
+  implicit none
+
+  !Fortran-python interface directives
+  !f2py intent(in) nbox, nbin, nentry, x0, dx, boxes
+  !f2py intent(out) ptr, list
+  !f2py depend(nbox) boxes
+  !f2py depend(nbin) ptr
+  !f2py depend(nentry) list
+
+  !Input
+  integer, intent(in) ::  nbox, nbin, nentry
+  double precision, intent(in) ::  x0(2), dx(2), boxes(nbox,4)
+
+  !Output
+  integer, intent(out) ::  ptr(nbin*nbin+1), list(nentry)
+
+  !Working
+  integer ibox, i, j, c, i0(2), i1(2)
+  integer, allocatable, dimension(:) ::  pos
+
+  !The boxes overlapping bin c = (i-1)*nbin + j are list(ptr(c):ptr(c+1)-1)
+
+  ptr(:) = 0
+  do ibox=1,nbox
+     call getBinRange(nbin, x0, dx, boxes(ibox,:), i0, i1)
+     do i=i0(1),i1(1)
+        do j=i0(2),i1(2)
+           c = (i-1)*nbin + j
+           ptr(c+1) = ptr(c+1) + 1
+        end do
+     end do
+  end do
+
+  ptr(1) = 1
+  do c=1,nbin*nbin
+     ptr(c+1) = ptr(c+1) + ptr(c)
+  end do
+
+  allocate(pos(nbin*nbin))
+  pos(:) = ptr(1:nbin*nbin)
+  do ibox=1,nbox
+     call getBinRange(nbin, x0, dx, boxes(ibox,:), i0, i1)
+     do i=i0(1),i1(1)
+        do j=i0(2),i1(2)
+           c = (i-1)*nbin + j
+           list(pos(c)) = ibox
+           pos(c) = pos(c) + 1
+        end do
+     end do
+  end do
+  deallocate(pos)
+
+end subroutine computeBins
+
+
+
+
+subroutine getBinCandidates(nbox, nbin, nentry, imin, query, x0, dx, &
+     box, boxes, ptr, list, stamp, ncand, cand)
+
+  implicit none
+
+  !Fortran-python interface directives
+  !f2py intent(in) nbox, nbin, nentry, imin, query, x0, dx, box, boxes, ptr, list
+  !f2py intent(inout) stamp
+  !f2py intent(out) ncand, cand
+  !f2py depend(nbox) boxes, stamp, cand
+  !f2py depend(nbin) ptr
+  !f2py depend(nentry) list
+
+  !Input
+  integer, intent(in) ::  nbox, nbin, nentry, imin, query
+  double precision, intent(in) ::  x0(2), dx(2), box(4), boxes(nbox,4)
+  integer, intent(in) ::  ptr(nbin*nbin+1), list(nentry)
+
+  !Output
+  integer, intent(inout) ::  stamp(nbox)
+  integer, intent(out) ::  ncand, cand(nbox)
+
+  !Working
+  integer i, j, c, k, ibox, i0(2), i1(2)
+
+  !Return, in ascending order, the boxes with index greater than imin
+  !that overlap box; stamp(ibox) is set to query, a positive integer
+  !unique to the call, so each box is returned once
+
+  ncand = 0
+  call getBinRange(nbin, x0, dx, box, i0, i1)
+  do i=i0(1),i1(1)
+     do j=i0(2),i1(2)
+        c = (i-1)*nbin + j
+        do k=ptr(c),ptr(c+1)-1
+           ibox = list(k)
+           if ((ibox .gt. imin) .and. (stamp(ibox) .ne. query)) then
+              stamp(ibox) = query
+              if ((boxes(ibox,1) .le. box(3)) .and. (boxes(ibox,3) .ge. box(1)) .and. &
+                   (boxes(ibox,2) .le. box(4)) .and. (boxes(ibox,4) .ge. box(2))) then
+                 ncand = ncand + 1
+                 cand(ncand) = ibox
+              end if
+           end if
+        end do
+     end do
+  end do
+
+  do k=2,ncand
+     ibox = cand(k)
+     i = k - 1
+     do while (i .ge. 1)
+        if (cand(i) .le. ibox) exit
+        cand(i+1) = cand(i)
+        i = i - 1
+     end do
+     cand(i+1) = ibox
+  end do
+
+end subroutine getBinCandidates
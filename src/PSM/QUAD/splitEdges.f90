@@ -21,18 +21,37 @@ subroutine splitEdges(nvert, nedge0, nedge, &
   logical, intent(out) ::  edgeCon(nedge)
 
   !Working
-  integer iedge0, iedge, i, i1, i2, isplit, nsplit
+  integer iedge0, iedge, i, i1, i2, k, isplit, nsplit
+  integer nbin, nentry, ncand
   logical validSplit
-  double precision split
+  double precision split, x0(2), dx(2), box(4)
   double precision, allocatable, dimension(:) ::  t
   integer, allocatable, dimension(:) ::  ti, lo, hi
-
+  double precision, allocatable, dimension(:,:) ::  boxes
+  integer, allocatable, dimension(:) ::  ptr, list, stamp, cand
+
+  allocate(boxes(nvert,4))
+  boxes(:,1:2) = verts
+  boxes(:,3:4) = verts
+  call computeBinGrid(nvert, boxes, nbin, x0, dx)
+  call countBinEntries(nvert, nbin, x0, dx, boxes, nentry)
+  allocate(ptr(nbin*nbin+1))
+  allocate(list(nentry))
+  allocate(stamp(nvert))
+  allocate(cand(nvert))
+  call computeBins(nvert, nbin, nentry, x0, dx, boxes, ptr, list)
+
+  stamp(:) = 0
   iedge = 1
   do iedge0=1,nedge0
      i1 = edges0(iedge0,1)
      i2 = edges0(iedge0,2)
+     call getSplitBox(verts(i1,:), verts(i2,:), box)
+     call getBinCandidates(nvert, nbin, nentry, 0, iedge0, x0, dx, &
+          box, boxes, ptr, list, stamp, ncand, cand)
      nsplit = 0
-     do i=1,nvert
+     do k=1,ncand
+        i = cand(k)
         if ((i.ne.i1) .and. (i.ne.i2)) then
            if (validSplit(verts(i1,:),verts(i2,:),verts(i,:))) then
               nsplit = nsplit + 1
@@ -49,7 +68,8 @@ subroutine splitEdges(nvert, nedge0, nedge, &
         allocate(lo(nsplit+1))
         allocate(hi(nsplit+1))
         isplit = 1
-        do i=1,nvert
+        do k=1,ncand
+           i = cand(k)
            if ((i.ne.i1) .and. (i.ne.i2)) then
               if (validSplit(verts(i1,:),verts(i2,:),verts(i,:))) then
                  t(isplit) = split(verts(i1,:),verts(i2,:),verts(i,:))
@@ -76,6 +96,12 @@ subroutine splitEdges(nvert, nedge0, nedge, &
      end if
   end do
 
+  deallocate(boxes)
+  deallocate(ptr)
+  deallocate(list)
+  deallocate(stamp)
+  deallocate(cand)
+
 end subroutine splitEdges
 
 
@@ -124,14 +150,33 @@ subroutine countSplits(nvert, nedge, verts, edges, nsplit)
   integer, intent(out) ::  nsplit
 
   !Working
-  integer iedge, i, i1, i2
+  integer iedge, i, i1, i2, k, nbin, nentry, ncand
   logical validSplit
-
+  double precision x0(2), dx(2), box(4)
+  double precision, allocatable, dimension(:,:) ::  boxes
+  integer, allocatable, dimension(:) ::  ptr, list, stamp, cand
+
+  allocate(boxes(nvert,4))
+  boxes(:,1:2) = verts
+  boxes(:,3:4) = verts
+  call computeBinGrid(nvert, boxes, nbin, x0, dx)
+  call countBinEntries(nvert, nbin, x0, dx, boxes, nentry)
+  allocate(ptr(nbin*nbin+1))
+  allocate(list(nentry))
+  allocate(stamp(nvert))
+  allocate(cand(nvert))
+  call computeBins(nvert, nbin, nentry, x0, dx, boxes, ptr, list)
+
+  stamp(:) = 0
   nsplit = 0
   do iedge=1,nedge
      i1 = edges(iedge,1)
      i2 = edges(iedge,2)
-     do i=1,nvert
+     call getSplitBox(verts(i1,:), verts(i2,:), box)
+     call getBinCandidates(nvert, nbin, nentry, 0, iedge, x0, dx, &
+          box, boxes, ptr, list, stamp, ncand, cand)
+     do k=1,ncand
+        i = cand(k)
         if ((i.ne.i1) .and. (i.ne.i2)) then
            if (validSplit(verts(i1,:),verts(i2,:),verts(i,:))) then
               nsplit = nsplit + 1
@@ -140,11 +185,54 @@ subroutine countSplits(nvert, nedge, verts, edges, nsplit)
      end do
   end do
 
+  deallocate(boxes)
+  deallocate(ptr)
+  deallocate(list)
+  deallocate(stamp)
+  deallocate(cand)
+
 end subroutine countSplits
 
 
 
 
+subroutine getSplitBox(A, B, box)
+
+  implicit none
+
+  !Fortran-python interface directives
+  !f2py intent(in) A, B
+  !f2py intent(out) box
+
+  !Input
+  double precision, intent(in) ::  A(2), B(2)
+
+  !Output
+  double precision, intent(out) ::  box(4)
+
+  !Working
+  integer k
+  double precision L, pad
+
+  !validSplit requires |(C-A) x (C-B)| < 1e-10 and C inside the circle
+  !with diameter AB, so C is within min(1e-10/L, L/2) of the segment
+
+  L = sqrt(dot_product(B-A,B-A))
+  if (L .gt. 0) then
+     pad = 1.01*min(1e-10/L, 0.5*L) + 1e-12
+  else
+     pad = 1e-12
+  end if
+  do k=1,2
+     box(k) = min(A(k),B(k)) - pad
+     box(k+2) = max(A(k),B(k)) + pad
+  end do
+
+end subroutine getSplitBox
+
+
+
+
 function validSplit(A, B, C)
 
   implicit none
@@ -297,3 +297,81 @@ subroutine basis2(k, kpm, t, d, S, i0)
   end do
 
 end subroutine basis2
+
+
+subroutine basis012(k, kpm, t, d, B, F, S, i0)
+
+  implicit none
+
+  !Fortran-python interface directives
+  !f2py intent(in) k,kpm,t,d
+  !f2py intent(out) B,F,S,i0
+  !f2py depend(kpm) d
+  !f2py depend(k) B,F,S
+
+  !Input
+  integer, intent(in) ::  k, kpm
+  double precision, intent(in) ::  t, d(kpm)
+
+  !Output
+  double precision, intent(out) ::  B(k), F(k), S(k)
+  integer, intent(out) ::  i0
+
+  !Working
+  double precision b1, b2, f1, f2, s1, s2, den
+  integer i, j, j1, j2, l, m, n
+
+  ! Values, first and second derivatives from a single span search
+  m = kpm - k
+
+  i0 = -1
+  do i=k,m
+     if ((d(i) .le. t) .and. (t .lt. d(i+1))) then
+        i0 = i-k
+     end if
+  end do
+
+  B(:) = 0
+  B(k) = 1
+
+  if (t .eq. d(m+k)) then
+     i0 = m-k
+  end if
+
+  F(:) = 0.0
+  S(:) = 0.0
+  do i=2,k
+     l = i-1
+     j1 = k-l
+     j2 = k
+     do j=j1,j2
+        n = i0 + j
+        if (d(n+l) .ne. d(n)) then
+           den = d(n+l)-d(n)
+           b1 = (t-d(n))/den*B(j) 
+           f1 = (B(j)+(t-d(n))*F(j))/den
+           s1 = (2*F(j)+(t-d(n))*S(j))/den
+        else
+           b1 = 0
+           f1 = 0
+           s1 = 0
+        end if
+        if ((j .ne. j2) .and. (d(n+l+1) .ne. d(n+1))) then
+           den = d(n+l+1)-d(n+1)
+           b2 = (d(n+l+1)-t)/den*B(j+1)
+           f2 = ((d(n+l+1)-t)*F(j+1)-B(j+1))/den
+           s2 = ((d(n+l+1)-t)*S(j+1)-2*F(j+1))/den
+        else
+           b2 = 0
+           f2 = 0
+           s2 = 0
+        end if
+        B(j) = b1 + b2
+        F(j) = f1 + f2
+        if (i .gt. 2) then
+           S(j) = s1 + s2
+        end if
+     end do
+  end do
+
+end subroutine basis012
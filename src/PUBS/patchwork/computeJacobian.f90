@@ -41,7 +41,77 @@ subroutine computeJacobian(nJ, nT, nD, nsurf, nedge, ngroup, nvert, surf_vert, &
   integer, intent(out) ::  Ji(nJ), Jj(nJ)
 
   !Working
-  integer vert, surf
+  integer vert
+  logical dirtyS(nsurf), dirtyE(nedge)
+
+  Ja(:) = 0.0
+  Ji(:) = 0
+  Jj(:) = 0
+  do vert=1,nvert
+     Ja(vert) = 1.0
+     Ji(vert) = vert - 1
+     Jj(vert) = vert - 1
+  end do
+
+  dirtyS(:) = .True.
+  dirtyE(:) = .True.
+  call computeJacobianRows(nJ-nvert, nT, nD, nsurf, nedge, ngroup, nvert, &
+       surf_vert, surf_edge, edge_group, group_k, group_m, group_n, group_d, &
+       surf_index_P, edge_index_P, surf_index_C, edge_index_C, &
+       knot_index, edge_count, dirtyS, dirtyE, T, &
+       Ja(nvert+1:nJ), Ji(nvert+1:nJ), Jj(nvert+1:nJ))
+
+end subroutine computeJacobian
+
+
+
+subroutine computeJacobianRows(nJ, nT, nD, nsurf, nedge, ngroup, nvert, surf_vert, & 
+           surf_edge, edge_group, group_k, group_m, group_n, group_d, & 
+           surf_index_P, edge_index_P, surf_index_C, edge_index_C, & 
+           knot_index, edge_count, dirtyS, dirtyE, T, Ja, Ji, Jj)
+
+  implicit none
+
+  !Fortran-python interface directives
+  !f2py intent(in) nJ, nT, nD, nsurf, nedge, ngroup, nvert, surf_vert, surf_edge, edge_group, group_k, group_m, group_n, group_d, surf_index_P, edge_index_P, surf_index_C, edge_index_C, knot_index, edge_count, dirtyS, dirtyE, T
+  !f2py intent(out) Ja, Ji, Jj
+  !f2py depend(nsurf) surf_vert
+  !f2py depend(nsurf) surf_edge
+  !f2py depend(nedge) edge_group
+  !f2py depend(ngroup) group_k
+  !f2py depend(ngroup) group_m
+  !f2py depend(ngroup) group_n
+  !f2py depend(nD) group_d
+  !f2py depend(nsurf) surf_index_P
+  !f2py depend(nedge) edge_index_P
+  !f2py depend(nsurf) surf_index_C
+  !f2py depend(nedge) edge_index_C
+  !f2py depend(ngroup) knot_index
+  !f2py depend(nedge) edge_count
+  !f2py depend(nsurf) dirtyS
+  !f2py depend(nedge) dirtyE
+  !f2py depend(nT) T
+  !f2py depend(nJ) Ja
+  !f2py depend(nJ) Ji
+  !f2py depend(nJ) Jj
+
+  !Input
+  integer, intent(in) ::  nJ, nT, nD, nsurf, nedge, ngroup, nvert
+  integer, intent(in) ::  surf_vert(nsurf,2,2), surf_edge(nsurf,2,2), & 
+           edge_group(nedge), group_k(ngroup), group_m(ngroup), group_n(ngroup)
+  double precision, intent(in) ::  group_d(nD)
+  integer, intent(in) ::  surf_index_P(nsurf,2), edge_index_P(nedge,2), & 
+           surf_index_C(nsurf,2), edge_index_C(nedge,2), &
+           knot_index(ngroup,2), edge_count(nedge)
+  logical, intent(in) ::  dirtyS(nsurf), dirtyE(nedge)
+  double precision, intent(in) ::  T(nT)
+
+  !Output
+  double precision, intent(out) ::  Ja(nJ)
+  integer, intent(out) ::  Ji(nJ), Jj(nJ)
+
+  !Working
+  integer surf
   integer iJ,u,v,k,k1,k2
   integer ugroup, vgroup
   integer ku,kv,mu,mv,nu,nv
@@ -51,17 +121,17 @@ subroutine computeJacobian(nJ, nT, nD, nsurf, nedge, ngroup, nvert, surf_vert, &
   integer, allocatable, dimension(:,:) ::  mappingC, mappingP
   integer i0, j0
 
+  !Rows of the interior points of the edges flagged in dirtyE and of
+  !the surfaces flagged in dirtyS; an edge's rows are only complete if
+  !all the surfaces that share it are flagged
+
   Ja(:) = 0.0
   Ji(:) = 0
   Jj(:) = 0
-  do vert=1,nvert
-     Ja(vert) = 1.0
-     Ji(vert) = vert
-     Jj(vert) = vert
-  end do
 
-  iJ = nvert + 1
+  iJ = 1
   do surf=1,nsurf
+     if (.not. dirtyS(surf)) cycle
      ugroup = edge_group(abs(surf_edge(surf,1,1)))
      vgroup = edge_group(abs(surf_edge(surf,2,1)))
      ku = group_k(ugroup)
@@ -86,6 +156,7 @@ subroutine computeJacobian(nJ, nT, nD, nsurf, nedge, ngroup, nvert, surf_vert, &
      call getMapping(surf, nu, nv, nsurf, nedge, nvert, surf_vert, & 
           surf_edge, surf_index_P, edge_index_P, mappingP)
      do v=1,2
+        if (.not. dirtyE(abs(surf_edge(surf,1,v)))) cycle
         do u=2,nu-1
            call basis(ku,ku+mu,bufferT(u,1+(v-1)*(nv-1),1),bufferD1,Bu,i0)
            j0 = 1+(v-1)*(mv-1)
@@ -98,6 +169,7 @@ subroutine computeJacobian(nJ, nT, nD, nsurf, nedge, ngroup, nvert, surf_vert, &
         end do
      end do
      do u=1,2
+        if (.not. dirtyE(abs(surf_edge(surf,2,u)))) cycle
         do v=2,nv-1
            call basis(kv,kv+mv,bufferT(1+(u-1)*(nu-1),v,2),bufferD2,Bv,j0)
            i0 = 1+(u-1)*(mu-1)
@@ -136,7 +208,7 @@ subroutine computeJacobian(nJ, nT, nD, nsurf, nedge, ngroup, nvert, surf_vert, &
      Jj(iJ) = Jj(iJ) - 1
   end do
 
-end subroutine computeJacobian
+end subroutine computeJacobianRows
 
 
 
@@ -180,3 +252,53 @@ subroutine computeJnnz(nsurf, nedge, ngroup, nvert, surf_edge, edge_group, &
   end do
 
 end subroutine computeJnnz
+
+
+
+
+subroutine computeJnnzRows(nsurf, nedge, ngroup, surf_edge, edge_group, & 
+           group_k, group_n, dirtyS, dirtyE, nJ)
+
+  implicit none
+
+  !Fortran-python interface directives
+  !f2py intent(in) nsurf, nedge, ngroup, surf_edge, edge_group, group_k, group_n, dirtyS, dirtyE
+  !f2py intent(out) nJ
+  !f2py depend(nsurf) surf_edge
+  !f2py depend(nedge) edge_group
+  !f2py depend(ngroup) group_k
+  !f2py depend(ngroup) group_n
+  !f2py depend(nsurf) dirtyS
+  !f2py depend(nedge) dirtyE
+
+  !Input
+  integer, intent(in) ::  nsurf, nedge, ngroup
+  integer, intent(in) ::  surf_edge(nsurf,2,2), edge_group(nedge), & 
+                          group_k(ngroup), group_n(ngroup)
+  logical, intent(in) ::  dirtyS(nsurf), dirtyE(nedge)
+
+  !Output
+  integer, intent(out) ::  nJ
+
+  !Working
+  integer surf, i
+  integer ugroup, vgroup
+
+  nJ = 0
+  do surf=1,nsurf
+     if (.not. dirtyS(surf)) cycle
+     ugroup = edge_group(abs(surf_edge(surf,1,1)))
+     vgroup = edge_group(abs(surf_edge(surf,2,1)))
+     do i=1,2
+        if (dirtyE(abs(surf_edge(surf,1,i)))) then
+           nJ = nJ + group_k(ugroup) * (group_n(ugroup) - 2)
+        end if
+        if (dirtyE(abs(surf_edge(surf,2,i)))) then
+           nJ = nJ + group_k(vgroup) * (group_n(vgroup) - 2)
+        end if
+     end do
+     nJ = nJ + group_k(ugroup) * group_k(vgroup) * (group_n(ugroup)-2) * & 
+         (group_n(vgroup)-2)
+  end do
+
+end subroutine computeJnnzRows
@@ -0,0 +1,104 @@
+subroutine cscMatVec(nrow, ncol, nnz, nvec, indptr, indices, data, x, y)
+
+  implicit none
+
+  !Fortran-python interface directives
+  !f2py intent(in) nrow, ncol, nnz, nvec, indptr, indices, data, x
+  !f2py intent(inout) y
+  !f2py depend(ncol) indptr
+  !f2py depend(nnz) indices, data
+  !f2py depend(ncol,nvec) x
+  !f2py depend(nrow,nvec) y
+
+  !Input
+  integer, intent(in) ::  nrow, ncol, nnz, nvec
+  integer, intent(in) ::  indptr(ncol+1), indices(nnz)
+  double precision, intent(in) ::  data(nnz), x(ncol,nvec)
+
+  !Output
+  double precision, intent(inout) ::  y(nrow,nvec)
+
+  !Working
+  integer i, j, k, p
+
+  ! y = A x for a 0-based CSC matrix A, written into the existing y
+  y(:,:) = 0.0
+  do k=1,nvec
+     do j=1,ncol
+        do p=indptr(j)+1,indptr(j+1)
+           i = indices(p) + 1
+           y(i,k) = y(i,k) + data(p)*x(j,k)
+        end do
+     end do
+  end do
+
+end subroutine cscMatVec
+
+
+
+subroutine cscMatMat(nrow, ncol, nnz, nvec, indptr, indices, data, x, y)
+
+  implicit none
+
+  !Fortran-python interface directives
+  !f2py intent(in) nrow, ncol, nnz, nvec, indptr, indices, data, x
+  !f2py intent(inout) y
+  !f2py depend(ncol) indptr
+  !f2py depend(nnz) indices, data
+  !f2py depend(nvec,ncol) x
+  !f2py depend(nvec,nrow) y
+
+  !Input
+  integer, intent(in) ::  nrow, ncol, nnz, nvec
+  integer, intent(in) ::  indptr(ncol+1), indices(nnz)
+  double precision, intent(in) ::  data(nnz), x(nvec,ncol)
+
+  !Output
+  double precision, intent(inout) ::  y(nvec,nrow)
+
+  !Working
+  integer i, j, p
+
+  ! y^T = A x^T for a 0-based CSC matrix A; the vectors are stored along
+  ! the first dimension so each entry of A is read once for all of them
+  y(:,:) = 0.0
+  do j=1,ncol
+     do p=indptr(j)+1,indptr(j+1)
+        i = indices(p) + 1
+        y(:,i) = y(:,i) + data(p)*x(:,j)
+     end do
+  end do
+
+end subroutine cscMatMat
+
+
+
+subroutine computeUnitNormals(nP0, Pu, Pv, nor)
+
+  implicit none
+
+  !Fortran-python interface directives
+  !f2py intent(in) nP0, Pu, Pv
+  !f2py intent(inout) nor
+  !f2py depend(nP0) Pu, Pv, nor
+
+  !Input
+  integer, intent(in) ::  nP0
+  double precision, intent(in) ::  Pu(nP0,3), Pv(nP0,3)
+
+  !Output
+  double precision, intent(inout) ::  nor(nP0,3)
+
+  !Working
+  integer i
+  double precision c(3), norm
+
+  do i=1,nP0
+     c(1) = Pu(i,2)*Pv(i,3) - Pu(i,3)*Pv(i,2)
+     c(2) = Pu(i,3)*Pv(i,1) - Pu(i,1)*Pv(i,3)
+     c(3) = Pu(i,1)*Pv(i,2) - Pu(i,2)*Pv(i,1)
+     norm = (c(1)**2 + c(2)**2 + c(3)**2)**0.5
+     nor(i,:) = c/norm
+  end do
+
+end subroutine computeUnitNormals
@@ -54,6 +54,69 @@ end subroutine evaluatePoint
 
 
 
+subroutine evaluatePointDerivs(surf,ku,kv,mu,mv,nvar,nD,nC,nsurf,nedge,ngroup,&
+           nvert,u,v,surf_vert,surf_edge,edge_group,group_d,& 
+           surf_index_C,edge_index_C,knot_index,C,P)
+
+  implicit none
+
+  !Fortran-python interface directives
+  !f2py intent(in) surf,ku,kv,mu,mv,nvar,nD,nC,nsurf,nedge,ngroup,nvert,u,v,surf_vert,surf_edge,edge_group,group_d,surf_index_C,edge_index_C,knot_index,C
+  !f2py intent(out) P
+  !f2py depend(nsurf) surf_vert
+  !f2py depend(nsurf) surf_edge
+  !f2py depend(nedge) edge_group
+  !f2py depend(nD) group_d
+  !f2py depend(nsurf) surf_index_C
+  !f2py depend(nedge) edge_index_C
+  !f2py depend(ngroup) knot_index
+  !f2py depend(nC,nvar) C
+  !f2py depend(nvar) P
+
+  !Input
+  integer, intent(in) ::  surf,ku,kv,mu,mv,nvar,nD,nC,nsurf,nedge,ngroup,nvert
+  double precision, intent(in) ::  u,v
+  integer, intent(in) ::  surf_vert(nsurf,2,2), surf_edge(nsurf,2,2), &
+                          edge_group(nedge)
+  double precision, intent(in) ::  group_d(nD)
+  integer, intent(in) ::  surf_index_C(nsurf,2), edge_index_C(nedge,2), &
+                          knot_index(ngroup,2)
+  double precision, intent(in) ::  C(nC,nvar)
+
+  !Output
+  double precision, intent(out) ::  P(nvar,6)
+
+  !Working
+  integer k1, k2, i0, j0, index, ugroup, vgroup
+  double precision du(ku+mu), dv(kv+mv)
+  double precision Bu(ku), Fu(ku), Su(ku), Bv(kv), Fv(kv), Sv(kv)
+
+  ! P, Pu, Pv, Puu, Puv, Pvv from one basis evaluation in each direction
+  ugroup = edge_group(abs(surf_edge(surf,1,1)))
+  vgroup = edge_group(abs(surf_edge(surf,2,1)))
+  du = group_d(knot_index(ugroup,1)+1:knot_index(ugroup,2))
+  dv = group_d(knot_index(vgroup,1)+1:knot_index(vgroup,2))
+  call basis012(ku,ku+mu,u,du,Bu,Fu,Su,i0)
+  call basis012(kv,kv+mv,v,dv,Bv,Fv,Sv,j0)
+
+  P(:,:) = 0.0
+  do k1=1,ku
+     do k2=1,kv
+        call getIndex(surf, i0+k1, j0+k2, mu, mv, nsurf, nedge, nvert, &
+             surf_vert, surf_edge, surf_index_C, edge_index_C, index)
+        P(:,1) = P(:,1) + Bu(k1)*Bv(k2)*C(index,:)
+        P(:,2) = P(:,2) + Fu(k1)*Bv(k2)*C(index,:)
+        P(:,3) = P(:,3) + Bu(k1)*Fv(k2)*C(index,:)
+        P(:,4) = P(:,4) + Su(k1)*Bv(k2)*C(index,:)
+        P(:,5) = P(:,5) + Fu(k1)*Fv(k2)*C(index,:)
+        P(:,6) = P(:,6) + Bu(k1)*Sv(k2)*C(index,:)
+     end do
+  end do
+
+end subroutine evaluatePointDerivs
+
+
+
 subroutine evaluateBasis1(surf, uder, vder, ku, kv, mu, mv, kpmu, &
            kpmv, nB, nD, nsurf, nedge, ngroup, nvert, t, surf_vert, &
            surf_edge, edge_group, group_d, surf_index_C, &
@@ -385,3 +448,314 @@ subroutine evaluateBases(uder, vder, nP, nB, nD, nsurf, nedge, ngroup, nvert,&
   end do 
 
 end subroutine evaluateBases
+
+
+
+subroutine evaluatePoints(uder, vder, nP, nvar, nD, nC, nsurf, nedge, ngroup,&
+     nvert, surf_vert, surf_edge, edge_group, group_k, group_m, group_d, &
+     surf_index_C, edge_index_C, knot_index, s, u, v, C, P)
+
+  implicit none
+  
+  !Fortran-python interface directives
+  !f2py intent(in) uder, vder, nP, nvar, nD, nC, nsurf, nedge, ngroup, nvert, surf_vert, surf_edge, edge_group, group_k, group_m, group_d, surf_index_C, edge_index_C, knot_index, s, u, v, C
+  !f2py intent(out) P
+  !f2py depend(nsurf) surf_vert
+  !f2py depend(nsurf) surf_edge
+  !f2py depend(nedge) edge_group
+  !f2py depend(ngroup) group_k, group_m
+  !f2py depend(nD) group_d
+  !f2py depend(nsurf) surf_index_C
+  !f2py depend(nedge) edge_index_C
+  !f2py depend(ngroup) knot_index
+  !f2py depend(nP) s, u, v
+  !f2py depend(nC,nvar) C
+  !f2py depend(nP,nvar) P
+
+  !Input
+  integer, intent(in) ::  uder, vder, nP, nvar, nD, nC, nsurf, nedge, ngroup, &
+                          nvert
+  integer, intent(in) ::  surf_vert(nsurf,2,2), surf_edge(nsurf,2,2), & 
+                          edge_group(nedge), group_k(ngroup), group_m(ngroup)
+  double precision, intent(in) ::  group_d(nD)
+  integer, intent(in) ::  surf_index_C(nsurf,2), edge_index_C(nedge,2), &
+                          knot_index(ngroup,2)
+  integer, intent(in) ::  s(nP)
+  double precision, intent(in) ::  u(nP), v(nP), C(nC,nvar)
+
+  !Output
+  double precision, intent(out) ::  P(nP,nvar)
+
+  !Working
+  integer iP, k1, k2, k
+  integer surf, prev, ugroup, vgroup, ku, kv, mu, mv
+  integer i0, j0
+  double precision w
+  double precision, allocatable, dimension(:) ::  du, dv, Bu, Bv
+  integer, allocatable, dimension(:,:) ::  mapping
+
+  P(:,:) = 0.0
+  prev = 0
+  do iP=1,nP
+     surf = s(iP)
+     if (surf.ne.prev) then
+        if (prev.ne.0) then
+           deallocate(du)
+           deallocate(dv)
+           deallocate(Bu)
+           deallocate(Bv)
+           deallocate(mapping)
+        end if
+        ugroup = edge_group(abs(surf_edge(surf,1,1)))
+        vgroup = edge_group(abs(surf_edge(surf,2,1)))
+        ku = group_k(ugroup)
+        kv = group_k(vgroup)
+        mu = group_m(ugroup)
+        mv = group_m(vgroup)
+        allocate(du(ku+mu))
+        allocate(dv(kv+mv))
+        allocate(Bu(ku))
+        allocate(Bv(kv))
+        allocate(mapping(mu,mv))
+        du = group_d(knot_index(ugroup,1)+1:knot_index(ugroup,2))
+        dv = group_d(knot_index(vgroup,1)+1:knot_index(vgroup,2))
+        call getMapping(surf, mu, mv, nsurf, nedge, nvert, surf_vert, &
+             surf_edge, surf_index_C, edge_index_C, mapping)
+        prev = surf
+     end if
+
+     if (uder.eq.0) then
+        call basis(ku,ku+mu,u(iP),du,Bu,i0)
+     else if (uder.eq.1) then
+        call basis1(ku,ku+mu,u(iP),du,Bu,i0)
+     else if (uder.eq.2) then
+        call basis2(ku,ku+mu,u(iP),du,Bu,i0)
+     end if
+     if (vder.eq.0) then
+        call basis(kv,kv+mv,v(iP),dv,Bv,j0)
+     else if (vder.eq.1) then
+        call basis1(kv,kv+mv,v(iP),dv,Bv,j0)
+     else if (vder.eq.2) then
+        call basis2(kv,kv+mv,v(iP),dv,Bv,j0)
+     end if
+
+     do k1=1,ku
+        do k2=1,kv
+           w = Bu(k1)*Bv(k2)
+           do k=1,nvar
+              P(iP,k) = P(iP,k) + w*C(mapping(i0+k1,j0+k2),k)
+           end do
+        end do
+     end do
+  end do
+
+  if (prev.ne.0) then
+     deallocate(du)
+     deallocate(dv)
+     deallocate(Bu)
+     deallocate(Bv)
+     deallocate(mapping)
+  end if
+
+end subroutine evaluatePoints
+
+
+
+subroutine evaluatePointsDerivs(nP, nvar, nD, nC, nsurf, nedge, ngroup, &
+     nvert, surf_vert, surf_edge, edge_group, group_k, group_m, group_d, &
+     surf_index_C, edge_index_C, knot_index, s, u, v, C, P)
+
+  implicit none
+  
+  !Fortran-python interface directives
+  !f2py intent(in) nP, nvar, nD, nC, nsurf, nedge, ngroup, nvert, surf_vert, surf_edge, edge_group, group_k, group_m, group_d, surf_index_C, edge_index_C, knot_index, s, u, v, C
+  !f2py intent(out) P
+  !f2py depend(nsurf) surf_vert
+  !f2py depend(nsurf) surf_edge
+  !f2py depend(nedge) edge_group
+  !f2py depend(ngroup) group_k, group_m
+  !f2py depend(nD) group_d
+  !f2py depend(nsurf) surf_index_C
+  !f2py depend(nedge) edge_index_C
+  !f2py depend(ngroup) knot_index
+  !f2py depend(nP) s, u, v
+  !f2py depend(nC,nvar) C
+  !f2py depend(nP,nvar) P
+
+  !Input
+  integer, intent(in) ::  nP, nvar, nD, nC, nsurf, nedge, ngroup, nvert
+  integer, intent(in) ::  surf_vert(nsurf,2,2), surf_edge(nsurf,2,2), & 
+                          edge_group(nedge), group_k(ngroup), group_m(ngroup)
+  double precision, intent(in) ::  group_d(nD)
+  integer, intent(in) ::  surf_index_C(nsurf,2), edge_index_C(nedge,2), &
+                          knot_index(ngroup,2)
+  integer, intent(in) ::  s(nP)
+  double precision, intent(in) ::  u(nP), v(nP), C(nC,nvar)
+
+  !Output
+  double precision, intent(out) ::  P(nP,nvar,6)
+
+  !Working
+  integer iP, k1, k2, k, index
+  integer surf, prev, ugroup, vgroup, ku, kv, mu, mv
+  integer i0, j0
+  double precision w(6)
+  double precision, allocatable, dimension(:) ::  du, dv, Bu, Fu, Su, Bv, Fv, Sv
+  integer, allocatable, dimension(:,:) ::  mapping
+
+  P(:,:,:) = 0.0
+  prev = 0
+  do iP=1,nP
+     surf = s(iP)
+     if (surf.ne.prev) then
+        if (prev.ne.0) then
+           deallocate(du, dv, Bu, Fu, Su, Bv, Fv, Sv, mapping)
+        end if
+        ugroup = edge_group(abs(surf_edge(surf,1,1)))
+        vgroup = edge_group(abs(surf_edge(surf,2,1)))
+        ku = group_k(ugroup)
+        kv = group_k(vgroup)
+        mu = group_m(ugroup)
+        mv = group_m(vgroup)
+        allocate(du(ku+mu), Bu(ku), Fu(ku), Su(ku))
+        allocate(dv(kv+mv), Bv(kv), Fv(kv), Sv(kv))
+        allocate(mapping(mu,mv))
+        du = group_d(knot_index(ugroup,1)+1:knot_index(ugroup,2))
+        dv = group_d(knot_index(vgroup,1)+1:knot_index(vgroup,2))
+        call getMapping(surf, mu, mv, nsurf, nedge, nvert, surf_vert, &
+             surf_edge, surf_index_C, edge_index_C, mapping)
+        prev = surf
+     end if
+
+     call basis012(ku,ku+mu,u(iP),du,Bu,Fu,Su,i0)
+     call basis012(kv,kv+mv,v(iP),dv,Bv,Fv,Sv,j0)
+
+     do k1=1,ku
+        do k2=1,kv
+           w(1) = Bu(k1)*Bv(k2)
+           w(2) = Fu(k1)*Bv(k2)
+           w(3) = Bu(k1)*Fv(k2)
+           w(4) = Su(k1)*Bv(k2)
+           w(5) = Fu(k1)*Fv(k2)
+           w(6) = Bu(k1)*Sv(k2)
+           index = mapping(i0+k1,j0+k2)
+           do k=1,nvar
+              P(iP,k,:) = P(iP,k,:) + w*C(index,k)
+           end do
+        end do
+     end do
+  end do
+
+  if (prev.ne.0) then
+     deallocate(du, dv, Bu, Fu, Su, Bv, Fv, Sv, mapping)
+  end if
+
+end subroutine evaluatePointsDerivs
+
+
+
+subroutine evaluateGridBases(bases, nS, nP0, nB, nT, nD, nsurf, nedge, ngroup, &
+     nvert, surfs, surf_vert, surf_edge, edge_group, group_k, group_m, &
+     group_n, group_d, surf_index_P, edge_index_P, surf_index_C, &
+     edge_index_C, knot_index, T, P0s, P0u, P0v, B0, Bu, Bv, Bj)
+
+  implicit none
+  
+  !Fortran-python interface directives
+  !f2py intent(in) bases, nS, nP0, nB, nT, nD, nsurf, nedge, ngroup, nvert, surfs, surf_vert, surf_edge, edge_group, group_k, group_m, group_n, group_d, surf_index_P, edge_index_P, surf_index_C, edge_index_C, knot_index, T
+  !f2py intent(out) P0s, P0u, P0v, B0, Bu, Bv, Bj
+  !f2py depend(nS) surfs
+  !f2py depend(nsurf) surf_vert
+  !f2py depend(nsurf) surf_edge
+  !f2py depend(nedge) edge_group
+  !f2py depend(ngroup) group_k, group_m, group_n
+  !f2py depend(nD) group_d
+  !f2py depend(nsurf) surf_index_P
+  !f2py depend(nedge) edge_index_P
+  !f2py depend(nsurf) surf_index_C
+  !f2py depend(nedge) edge_index_C
+  !f2py depend(ngroup) knot_index
+  !f2py depend(nT) T
+  !f2py depend(nP0) P0s, P0u, P0v
+  !f2py depend(nB) B0, Bu, Bv, Bj
+
+  !Input
+  logical, intent(in) ::  bases
+  integer, intent(in) ::  nS, nP0, nB, nT, nD, nsurf, nedge, ngroup, nvert
+  integer, intent(in) ::  surfs(nS), surf_vert(nsurf,2,2), &
+                          surf_edge(nsurf,2,2), edge_group(nedge), &
+                          group_k(ngroup), group_m(ngroup), group_n(ngroup)
+  double precision, intent(in) ::  group_d(nD)
+  integer, intent(in) ::  surf_index_P(nsurf,2), edge_index_P(nedge,2), &
+                          surf_index_C(nsurf,2), edge_index_C(nedge,2), &
+                          knot_index(ngroup,2)
+  double precision, intent(in) ::  T(nT)
+
+  !Output
+  integer, intent(out) ::  P0s(nP0), Bj(nB)
+  double precision, intent(out) ::  P0u(nP0), P0v(nP0)
+  double precision, intent(out) ::  B0(nB), Bu(nB), Bv(nB)
+
+  !Working
+  integer is, surf, ugroup, vgroup, ku, kv, mu, mv, nu, nv
+  integer u, v, k1, k2, i0, j0, iP, iB
+  double precision, allocatable, dimension(:) ::  du, dv, Su0, Su1, Su2, &
+                                                   Sv0, Sv1, Sv2
+  double precision, allocatable, dimension(:,:,:) ::  bufferT
+  integer, allocatable, dimension(:,:) ::  mapping
+
+  ! P0 parameters and the J0, Ju, Jv rows of the listed surfaces in one
+  ! traversal; every row has ku*kv entries sharing the column indices Bj,
+  ! and each parameter's values and derivatives come from one span search
+  iP = 0
+  iB = 0
+  do is=1,nS
+     surf = surfs(is)
+     ugroup = edge_group(abs(surf_edge(surf,1,1)))
+     vgroup = edge_group(abs(surf_edge(surf,2,1)))
+     ku = group_k(ugroup)
+     kv = group_k(vgroup)
+     mu = group_m(ugroup)
+     mv = group_m(vgroup)
+     nu = group_n(ugroup)
+     nv = group_n(vgroup)
+     allocate(bufferT(nu,nv,2))
+     call getSurfaceT(surf, nu, nv, nT, nsurf, nedge, surf_edge, &
+          surf_index_P, edge_index_P, T, bufferT)
+     if (bases) then
+        allocate(du(ku+mu), Su0(ku), Su1(ku), Su2(ku))
+        allocate(dv(kv+mv), Sv0(kv), Sv1(kv), Sv2(kv))
+        allocate(mapping(mu,mv))
+        du = group_d(knot_index(ugroup,1)+1:knot_index(ugroup,2))
+        dv = group_d(knot_index(vgroup,1)+1:knot_index(vgroup,2))
+        call getMapping(surf, mu, mv, nsurf, nedge, nvert, surf_vert, &
+             surf_edge, surf_index_C, edge_index_C, mapping)
+     end if
+     do v=1,nv
+        do u=1,nu
+           iP = iP + 1
+           P0s(iP) = surf - 1
+           P0u(iP) = bufferT(u,v,1)
+           P0v(iP) = bufferT(u,v,2)
+           if (bases) then
+              call basis012(ku,ku+mu,P0u(iP),du,Su0,Su1,Su2,i0)
+              call basis012(kv,kv+mv,P0v(iP),dv,Sv0,Sv1,Sv2,j0)
+              do k1=1,ku
+                 do k2=1,kv
+                    iB = iB + 1
+                    B0(iB) = Su0(k1)*Sv0(k2)
+                    Bu(iB) = Su1(k1)*Sv0(k2)
+                    Bv(iB) = Su0(k1)*Sv1(k2)
+                    Bj(iB) = mapping(i0+k1,j0+k2) - 1
+                 end do
+              end do
+           end if
+        end do
+     end do
+     deallocate(bufferT)
+     if (bases) then
+        deallocate(du, Su0, Su1, Su2, dv, Sv0, Sv1, Sv2, mapping)
+     end if
+  end do
+
+end subroutine evaluateGridBases
@@ -1,13 +1,13 @@
 subroutine evaluateProjection(nP0, ns, nD, nT, nC, nP, nsurf, nedge, ngroup, &
      nvert, surfs, surf_vert, surf_edge, edge_group, group_k, group_m, group_n,&
      group_d, surf_index_P, edge_index_P, surf_index_C, edge_index_C, &
-     knot_index, T, C, P, P0, mins, minu, minv)
+     knot_index, tol, maxiter, T, C, P, P0, mins, minu, minv, niter)
 
   implicit none
 
   !Fortran-python interface directives
-  !f2py intent(in) nP0, ns, nD, nT, nC, nP, nsurf, nedge, ngroup, nvert, surfs, surf_vert, surf_edge, edge_group, group_k, group_m, group_n, group_d, surf_index_P, edge_index_P, surf_index_C, edge_index_C, knot_index, T, C, P, P0
-  !f2py intent(out) mins, minu, minv
+  !f2py intent(in) nP0, ns, nD, nT, nC, nP, nsurf, nedge, ngroup, nvert, surfs, surf_vert, surf_edge, edge_group, group_k, group_m, group_n, group_d, surf_index_P, edge_index_P, surf_index_C, edge_index_C, knot_index, tol, maxiter, T, C, P, P0
+  !f2py intent(out) mins, minu, minv, niter
   !f2py depend(ns) surfs
   !f2py depend(nsurf) surf_vert
   !f2py depend(nsurf) surf_edge
@@ -26,6 +26,7 @@ subroutine evaluateProjection(nP0, ns, nD, nT, nC, nP, nsurf, nedge, ngroup, &
   !f2py depend(nP0) mins
   !f2py depend(nP0) minu
   !f2py depend(nP0) minv
+  !f2py depend(nP0) niter
 
   !Input
   integer, intent(in) ::  nP0, ns, nD, nT, nC, nP
@@ -36,26 +37,27 @@ subroutine evaluateProjection(nP0, ns, nD, nT, nC, nP, nsurf, nedge, ngroup, &
   double precision, intent(in) ::  group_d(nD)
   integer, intent(in) ::  surf_index_P(nsurf,2), edge_index_P(nedge,2), &
                           surf_index_C(nsurf,2), edge_index_C(nedge,2), &
-                          knot_index(ngroup,2)
-  double precision, intent(in) ::  T(nT), C(nC,3), P(nP,3), P0(nP0,3)
+                          knot_index(ngroup,2), maxiter
+  double precision, intent(in) ::  tol, T(nT), C(nC,3), P(nP,3), P0(nP0,3)
   
   !Output
   integer, intent(out) ::  mins(nP0)
+  integer, intent(out) ::  niter(nP0)
   double precision, intent(out) ::  minu(nP0), minv(nP0)
 
   !Working
   integer surf, ugroup, vgroup, ku, kv, mu, mv, nu, nv
   double precision, allocatable, dimension(:,:,:) ::  bufferT, bufferP
-  integer k, i, s, u, v, u0, v0
-  double precision x(2), dx(2), g(2), H(2,2), W(2,2), norm, det
-  double precision Pc(3), Pu(3), Pv(3), Puu(3), Puv(3), Pvv(3), f(3)
-  integer counter
+  integer k, s, u, v, u0, v0, iter
+  double precision x(2), Pc(3), R(3)
   double precision minP(nP0), d, mind
 
+  R(:) = 0.0
   minP(:) = 1e10
   mins(:) = 1
   minu(:) = 1
   minv(:) = 1
+  niter(:) = 0
   do s=1,ns
      surf = surfs(s)
      ugroup = edge_group(abs(surf_edge(surf,1,1)))
@@ -95,66 +97,11 @@ subroutine evaluateProjection(nP0, ns, nD, nT, nC, nP, nsurf, nedge, ngroup, &
         end if
         x(1) = bufferT(u0,v0,1)
         x(2) = bufferT(u0,v0,2)
-        do counter=0,40
-           call evaluatePoint(surf,0,0,ku,kv,mu,mv,3,nD,nC,nsurf,nedge,ngroup,nvert,x(1),x(2),& 
-                surf_vert,surf_edge,edge_group,group_d,& 
-                surf_index_C,edge_index_C,knot_index,C,Pc)
-           call evaluatePoint(surf,1,0,ku,kv,mu,mv,3,nD,nC,nsurf,nedge,ngroup,nvert,x(1),x(2),& 
-                surf_vert,surf_edge,edge_group,group_d,& 
-                surf_index_C,edge_index_C,knot_index,C,Pu)
-           call evaluatePoint(surf,0,1,ku,kv,mu,mv,3,nD,nC,nsurf,nedge,ngroup,nvert,x(1),x(2),& 
-                surf_vert,surf_edge,edge_group,group_d,& 
-                surf_index_C,edge_index_C,knot_index,C,Pv)
-           call evaluatePoint(surf,2,0,ku,kv,mu,mv,3,nD,nC,nsurf,nedge,ngroup,nvert,x(1),x(2),& 
-                surf_vert,surf_edge,edge_group,group_d,& 
-                surf_index_C,edge_index_C,knot_index,C,Puu)
-           call evaluatePoint(surf,1,1,ku,kv,mu,mv,3,nD,nC,nsurf,nedge,ngroup,nvert,x(1),x(2),& 
-                surf_vert,surf_edge,edge_group,group_d,& 
-                surf_index_C,edge_index_C,knot_index,C,Puv)
-           call evaluatePoint(surf,0,2,ku,kv,mu,mv,3,nD,nC,nsurf,nedge,ngroup,nvert,x(1),x(2),& 
-                surf_vert,surf_edge,edge_group,group_d,& 
-                surf_index_C,edge_index_C,knot_index,C,Pvv)
-           f = Pc - P0(k,:)
-           g(1) = 2*dot_product(f,Pu)
-           g(2) = 2*dot_product(f,Pv)
-           H(1,1) = 2*dot_product(Pu,Pu) + 2*dot_product(f,Puu)
-           H(1,2) = 2*dot_product(Pu,Pv) + 2*dot_product(f,Puv)
-           H(2,2) = 2*dot_product(Pv,Pv) + 2*dot_product(f,Pvv)
-           H(2,1) = H(1,2)
-           do i=1,2
-              if (((x(i).eq.0).and.(g(i).gt.0)).or.((x(i).eq.1).and. & 
-                 (g(i).lt.0))) then
-                 g(i) = 0.0
-                 H(1,2) = 0.0
-                 H(2,1) = 0.0
-                 H(i,i) = 1.0
-              end if
-           end do
-           det = H(1,1)*H(2,2) - H(1,2)*H(2,1)
-           W(1,1) = H(2,2)/det
-           W(1,2) = -H(1,2)/det
-           W(2,2) = H(1,1)/det
-           W(2,1) = W(1,2)
-           norm = (g(1)**2 + g(2)**2)**0.5
-           dx(1) = -dot_product(W(1,:),g)
-           dx(2) = -dot_product(W(2,:),g)
-           do i=1,2
-              if (x(i)+dx(i).lt.0) then
-                 dx(i) = -x(i)
-              else if (x(i)+dx(i).gt.1) then
-                 dx(i) = 1-x(i)
-              end if
-           end do
-           !print *, counter,norm
-           if ((norm.lt.1e-13).or.((dx(1)**2 + dx(2)**2)**0.5.lt.1e-13)) then
-              exit
-           end if
-           x = x + dx
-        end do
-        call evaluatePoint(surf,0,0,ku,kv,mu,mv,3,nD,nC,nsurf,nedge,ngroup,nvert,x(1),x(2),& 
-             surf_vert,surf_edge,edge_group,group_d,& 
-             surf_index_C,edge_index_C,knot_index,C,Pc)
-        d = abs(dot_product(Pc-P0(k,:),Pc-P0(k,:)))
+        call projectPoint(surf, ku, kv, mu, mv, nD, nC, nsurf, nedge, &
+             ngroup, nvert, surf_vert, surf_edge, edge_group, group_d, &
+             surf_index_C, edge_index_C, knot_index, tol, maxiter, C, P0(k,:), &
+             R, x, d, iter)
+        niter(k) = niter(k) + iter
         if (d .lt. minP(k)) then
            minP(k) = d
            mins(k) = surf
@@ -173,13 +120,13 @@ end subroutine evaluateProjection
 subroutine evaluatePjtnAlongQ(nP0, ns, nD, nT, nC, nP, nsurf, nedge, ngroup, &
      nvert, surfs, surf_vert, surf_edge, edge_group, group_k, group_m, group_n,&
      group_d, surf_index_P, edge_index_P, surf_index_C, edge_index_C, &
-     knot_index, T, C, P, P0, Q, mins, minu, minv)
+     knot_index, tol, maxiter, T, C, P, P0, Q, mins, minu, minv, niter)
 
   implicit none
 
   !Fortran-python interface directives
-  !f2py intent(in) nP0, ns, nD, nT, nC, nP, nsurf, nedge, ngroup, nvert, surfs, surf_vert, surf_edge, edge_group, group_k, group_m, group_n, group_d, surf_index_P, edge_index_P, surf_index_C, edge_index_C, knot_index, T, C, P, P0, Q
-  !f2py intent(out) mins, minu, minv
+  !f2py intent(in) nP0, ns, nD, nT, nC, nP, nsurf, nedge, ngroup, nvert, surfs, surf_vert, surf_edge, edge_group, group_k, group_m, group_n, group_d, surf_index_P, edge_index_P, surf_index_C, edge_index_C, knot_index, tol, maxiter, T, C, P, P0, Q
+  !f2py intent(out) mins, minu, minv, niter
   !f2py depend(ns) surfs
   !f2py depend(nsurf) surf_vert
   !f2py depend(nsurf) surf_edge
@@ -199,6 +146,7 @@ subroutine evaluatePjtnAlongQ(nP0, ns, nD, nT, nC, nP, nsurf, nedge, ngroup, &
   !f2py depend(nP0) mins
   !f2py depend(nP0) minu
   !f2py depend(nP0) minv
+  !f2py depend(nP0) niter
 
   !Input
   integer, intent(in) ::  nP0, ns, nD, nT, nC, nP
@@ -209,28 +157,26 @@ subroutine evaluatePjtnAlongQ(nP0, ns, nD, nT, nC, nP, nsurf, nedge, ngroup, &
   double precision, intent(in) ::  group_d(nD)
   integer, intent(in) ::  surf_index_P(nsurf,2), edge_index_P(nedge,2), &
                           surf_index_C(nsurf,2), edge_index_C(nedge,2), &
-                          knot_index(ngroup,2)
-  double precision, intent(in) ::  T(nT), C(nC,3), P(nP,3), P0(nP0,3), Q(nP0,3)
+                          knot_index(ngroup,2), maxiter
+  double precision, intent(in) ::  tol, T(nT), C(nC,3), P(nP,3), P0(nP0,3), Q(nP0,3)
   
   !Output
   integer, intent(out) ::  mins(nP0)
+  integer, intent(out) ::  niter(nP0)
   double precision, intent(out) ::  minu(nP0), minv(nP0)
 
   !Working
   integer surf, ugroup, vgroup, ku, kv, mu, mv, nu, nv
   double precision, allocatable, dimension(:,:,:) ::  bufferT, bufferP
-  integer k, i, s, u, v, u0, v0
-  double precision x(2), dx(2), g(2), H(2,2), W(2,2), norm, det
-  double precision Pc(3), Pu(3), Pv(3), Puu(3), Puv(3), Pvv(3)
-  double precision f(3), fu(3), fv(3), fuu(3), fuv(3), fvv(3)
-  double precision R(3)
-  integer counter
+  integer k, s, u, v, u0, v0, iter
+  double precision x(2), Pc(3), f(3), R(3)
   double precision minP(nP0), d, mind
 
   minP(:) = 1e10
   mins(:) = 1
   minu(:) = 1
   minv(:) = 1
+  niter(:) = 0
   do s=1,ns
      surf = surfs(s)
      ugroup = edge_group(abs(surf_edge(surf,1,1)))
@@ -272,72 +218,11 @@ subroutine evaluatePjtnAlongQ(nP0, ns, nD, nT, nC, nP, nsurf, nedge, ngroup, &
         end if
         x(1) = bufferT(u0,v0,1)
         x(2) = bufferT(u0,v0,2)
-        do counter=0,40
-           call evaluatePoint(surf,0,0,ku,kv,mu,mv,3,nD,nC,nsurf,nedge,ngroup,nvert,x(1),x(2),& 
-                surf_vert,surf_edge,edge_group,group_d,& 
-                surf_index_C,edge_index_C,knot_index,C,Pc)
-           call evaluatePoint(surf,1,0,ku,kv,mu,mv,3,nD,nC,nsurf,nedge,ngroup,nvert,x(1),x(2),& 
-                surf_vert,surf_edge,edge_group,group_d,& 
-                surf_index_C,edge_index_C,knot_index,C,Pu)
-           call evaluatePoint(surf,0,1,ku,kv,mu,mv,3,nD,nC,nsurf,nedge,ngroup,nvert,x(1),x(2),& 
-                surf_vert,surf_edge,edge_group,group_d,& 
-                surf_index_C,edge_index_C,knot_index,C,Pv)
-           call evaluatePoint(surf,2,0,ku,kv,mu,mv,3,nD,nC,nsurf,nedge,ngroup,nvert,x(1),x(2),& 
-                surf_vert,surf_edge,edge_group,group_d,& 
-                surf_index_C,edge_index_C,knot_index,C,Puu)
-           call evaluatePoint(surf,1,1,ku,kv,mu,mv,3,nD,nC,nsurf,nedge,ngroup,nvert,x(1),x(2),& 
-                surf_vert,surf_edge,edge_group,group_d,& 
-                surf_index_C,edge_index_C,knot_index,C,Puv)
-           call evaluatePoint(surf,0,2,ku,kv,mu,mv,3,nD,nC,nsurf,nedge,ngroup,nvert,x(1),x(2),& 
-                surf_vert,surf_edge,edge_group,group_d,& 
-                surf_index_C,edge_index_C,knot_index,C,Pvv)
-           f = Pc - (P0(k,:) + R*dot_product(Pc-P0(k,:),R)/dot_product(R,R))
-           fu = Pu - R*dot_product(Pu,R)/dot_product(R,R)
-           fv = Pv - R*dot_product(Pv,R)/dot_product(R,R)
-           fuu = Puu - R*dot_product(Puu,R)/dot_product(R,R)
-           fuv = Puv - R*dot_product(Puv,R)/dot_product(R,R)
-           fvv = Pvv - R*dot_product(Pvv,R)/dot_product(R,R)
-           g(1) = 2*dot_product(f,fu)
-           g(2) = 2*dot_product(f,fv)
-           H(1,1) = 2*dot_product(fu,fu) + 2*dot_product(f,fuu)
-           H(1,2) = 2*dot_product(fu,fv) + 2*dot_product(f,fuv)
-           H(2,2) = 2*dot_product(fv,fv) + 2*dot_product(f,fvv)
-           H(2,1) = H(1,2)
-           do i=1,2
-              if (((x(i).eq.0).and.(g(i).gt.0)).or.((x(i).eq.1).and. & 
-                 (g(i).lt.0))) then
-                 g(i) = 0.0
-                 H(1,2) = 0.0
-                 H(2,1) = 0.0
-                 H(i,i) = 1.0
-              end if
-           end do
-           det = H(1,1)*H(2,2) - H(1,2)*H(2,1)
-           W(1,1) = H(2,2)/det
-           W(1,2) = -H(1,2)/det
-           W(2,2) = H(1,1)/det
-           W(2,1) = W(1,2)
-           norm = (g(1)**2 + g(2)**2)**0.5
-           dx(1) = -dot_product(W(1,:),g)
-           dx(2) = -dot_product(W(2,:),g)
-           do i=1,2
-              if (x(i)+dx(i).lt.0) then
-                 dx(i) = -x(i)
-              else if (x(i)+dx(i).gt.1) then
-                 dx(i) = 1-x(i)
-              end if
-           end do
-           !print *, counter,norm
-           if ((norm.lt.1e-13).or.((dx(1)**2 + dx(2)**2)**0.5.lt.1e-13)) then
-              exit
-           end if
-           x = x + dx
-        end do
-        call evaluatePoint(surf,0,0,ku,kv,mu,mv,3,nD,nC,nsurf,nedge,ngroup,nvert,x(1),x(2),& 
-             surf_vert,surf_edge,edge_group,group_d,& 
-             surf_index_C,edge_index_C,knot_index,C,Pc)
-        f = Pc - (P0(k,:) + R*dot_product(Pc-P0(k,:),R)/dot_product(R,R))
-        d = abs(dot_product(f,f))
+        call projectPoint(surf, ku, kv, mu, mv, nD, nC, nsurf, nedge, &
+             ngroup, nvert, surf_vert, surf_edge, edge_group, group_d, &
+             surf_index_C, edge_index_C, knot_index, tol, maxiter, C, P0(k,:), &
+             R, x, d, iter)
+        niter(k) = niter(k) + iter
         if (d .lt. minP(k)) then
            minP(k) = d
            mins(k) = surf
@@ -353,6 +238,306 @@ end subroutine evaluatePjtnAlongQ
 
 
 
+subroutine evaluateSeededProjection(nP0, nseed, nD, nC, nsurf, nedge, &
+     ngroup, nvert, seeds, seedu, seedv, surf_vert, surf_edge, edge_group, &
+     group_k, group_m, group_d, surf_index_C, edge_index_C, knot_index, &
+     tol, maxiter, C, P0, Q, mins, minu, minv, mind, niter)
+
+  implicit none
+
+  !Fortran-python interface directives
+  !f2py intent(in) nP0, nseed, nD, nC, nsurf, nedge, ngroup, nvert, seeds, seedu, seedv, surf_vert, surf_edge, edge_group, group_k, group_m, group_d, surf_index_C, edge_index_C, knot_index, tol, maxiter, C, P0, Q
+  !f2py intent(out) mins, minu, minv, mind, niter
+  !f2py depend(nP0,nseed) seeds, seedu, seedv
+  !f2py depend(nsurf) surf_vert
+  !f2py depend(nsurf) surf_edge
+  !f2py depend(nedge) edge_group
+  !f2py depend(ngroup) group_k,group_m
+  !f2py depend(nD) group_d
+  !f2py depend(nsurf) surf_index_C
+  !f2py depend(nedge) edge_index_C
+  !f2py depend(ngroup) knot_index
+  !f2py depend(nC) C
+  !f2py depend(nP0) P0
+  !f2py depend(nP0) Q
+  !f2py depend(nP0) mins
+  !f2py depend(nP0) minu
+  !f2py depend(nP0) minv
+  !f2py depend(nP0) mind
+  !f2py depend(nP0) niter
+
+  !Input
+  integer, intent(in) ::  nP0, nseed, nD, nC
+  integer, intent(in) ::  nsurf, nedge, ngroup, nvert
+  integer, intent(in) ::  seeds(nP0,nseed)
+  double precision, intent(in) ::  seedu(nP0,nseed), seedv(nP0,nseed)
+  integer, intent(in) ::  surf_vert(nsurf,2,2), surf_edge(nsurf,2,2), &
+                          edge_group(nedge)
+  integer, intent(in) ::  group_k(ngroup),group_m(ngroup)
+  double precision, intent(in) ::  group_d(nD)
+  integer, intent(in) ::  surf_index_C(nsurf,2), edge_index_C(nedge,2), &
+                          knot_index(ngroup,2), maxiter
+  double precision, intent(in) ::  tol, C(nC,3), P0(nP0,3), Q(nP0,3)
+
+  !Output
+  integer, intent(out) ::  mins(nP0)
+  integer, intent(out) ::  niter(nP0)
+  double precision, intent(out) ::  minu(nP0), minv(nP0), mind(nP0)
+
+  !Working
+  integer surf, ugroup, vgroup, ku, kv, mu, mv
+  integer k, i, j, iter
+  logical repeat
+  double precision x(2), Pc(3), f(3), R(3), d
+
+  do k=1,nP0
+     mind(k) = 1e10
+     niter(k) = 0
+     mins(k) = seeds(k,1)
+     minu(k) = seedu(k,1)
+     minv(k) = seedv(k,1)
+     do i=1,nseed
+        surf = seeds(k,i)
+        repeat = .False.
+        do j=1,i-1
+           if (seeds(k,j) .eq. surf) then
+              repeat = .True.
+           end if
+        end do
+        if (.not. repeat) then
+           ugroup = edge_group(abs(surf_edge(surf,1,1)))
+           vgroup = edge_group(abs(surf_edge(surf,2,1)))
+           ku = group_k(ugroup)
+           kv = group_k(vgroup)
+           mu = group_m(ugroup)
+           mv = group_m(vgroup)
+           x(1) = seedu(k,i)
+           x(2) = seedv(k,i)
+           call evaluatePoint(surf,0,0,ku,kv,mu,mv,3,nD,nC,nsurf,nedge,ngroup,nvert,x(1),x(2),& 
+                surf_vert,surf_edge,edge_group,group_d,& 
+                surf_index_C,edge_index_C,knot_index,C,Pc)
+           R(:) = Q(k,:)
+           if (dot_product(R,R) .gt. 0) then
+              f = Pc - (P0(k,:) + R*dot_product(Pc-P0(k,:),R)/dot_product(R,R))
+           else
+              f = Pc - P0(k,:)
+           end if
+           d = abs(dot_product(f,f))
+           if (d .lt. mind(k)) then
+              mind(k) = d
+              mins(k) = surf
+              minu(k) = x(1)
+              minv(k) = x(2)
+           end if
+           call projectPoint(surf, ku, kv, mu, mv, nD, nC, nsurf, nedge, &
+                ngroup, nvert, surf_vert, surf_edge, edge_group, group_d, &
+                surf_index_C, edge_index_C, knot_index, tol, maxiter, C, &
+                P0(k,:), R, x, d, iter)
+           niter(k) = niter(k) + iter
+           if (d .lt. mind(k)) then
+              mind(k) = d
+              mins(k) = surf
+              minu(k) = x(1)
+              minv(k) = x(2)
+           end if
+        end if
+     end do
+  end do
+
+end subroutine evaluateSeededProjection
+
+
+
+subroutine evaluateWarmProjection(nP0, nD, nC, nsurf, nedge, ngroup, nvert, &
+     surf_vert, surf_edge, edge_group, group_k, group_m, group_d, &
+     surf_index_C, edge_index_C, knot_index, tol, maxiter, s0, u0, v0, &
+     C, P0, Q, u, v, d, niter)
+
+  implicit none
+
+  !Fortran-python interface directives
+  !f2py intent(in) nP0, nD, nC, nsurf, nedge, ngroup, nvert, surf_vert, surf_edge, edge_group, group_k, group_m, group_d, surf_index_C, edge_index_C, knot_index, tol, maxiter, s0, u0, v0, C, P0, Q
+  !f2py intent(out) u, v, d, niter
+  !f2py depend(nsurf) surf_vert
+  !f2py depend(nsurf) surf_edge
+  !f2py depend(nedge) edge_group
+  !f2py depend(ngroup) group_k,group_m
+  !f2py depend(nD) group_d
+  !f2py depend(nsurf) surf_index_C
+  !f2py depend(nedge) edge_index_C
+  !f2py depend(ngroup) knot_index
+  !f2py depend(nP0) s0, u0, v0
+  !f2py depend(nC) C
+  !f2py depend(nP0) P0
+  !f2py depend(nP0) Q
+  !f2py depend(nP0) u, v, d, niter
+
+  !Input
+  integer, intent(in) ::  nP0, nD, nC
+  integer, intent(in) ::  nsurf, nedge, ngroup, nvert
+  integer, intent(in) ::  surf_vert(nsurf,2,2), surf_edge(nsurf,2,2), &
+                          edge_group(nedge)
+  integer, intent(in) ::  group_k(ngroup),group_m(ngroup)
+  double precision, intent(in) ::  group_d(nD)
+  integer, intent(in) ::  surf_index_C(nsurf,2), edge_index_C(nedge,2), &
+                          knot_index(ngroup,2), maxiter
+  integer, intent(in) ::  s0(nP0)
+  double precision, intent(in) ::  tol, u0(nP0), v0(nP0)
+  double precision, intent(in) ::  C(nC,3), P0(nP0,3), Q(nP0,3)
+
+  !Output
+  double precision, intent(out) ::  u(nP0), v(nP0), d(nP0)
+  integer, intent(out) ::  niter(nP0)
+
+  !Working
+  integer surf, ugroup, vgroup, ku, kv, mu, mv, k
+  double precision x(2), R(3)
+
+  ! Newton iterations from the caller's (surf,u,v) only; no search
+  do k=1,nP0
+     surf = s0(k)
+     ugroup = edge_group(abs(surf_edge(surf,1,1)))
+     vgroup = edge_group(abs(surf_edge(surf,2,1)))
+     ku = group_k(ugroup)
+     kv = group_k(vgroup)
+     mu = group_m(ugroup)
+     mv = group_m(vgroup)
+     x(1) = min(max(u0(k),0.d0),1.d0)
+     x(2) = min(max(v0(k),0.d0),1.d0)
+     R(:) = Q(k,:)
+     call projectPoint(surf, ku, kv, mu, mv, nD, nC, nsurf, nedge, &
+          ngroup, nvert, surf_vert, surf_edge, edge_group, group_d, &
+          surf_index_C, edge_index_C, knot_index, tol, maxiter, C, &
+          P0(k,:), R, x, d(k), niter(k))
+     u(k) = x(1)
+     v(k) = x(2)
+  end do
+
+end subroutine evaluateWarmProjection
+
+
+
+subroutine projectPoint(surf, ku, kv, mu, mv, nD, nC, nsurf, nedge, &
+     ngroup, nvert, surf_vert, surf_edge, edge_group, group_d, &
+     surf_index_C, edge_index_C, knot_index, tol, maxiter, C, P0, R, x, d, &
+     niter)
+
+  implicit none
+
+  !Fortran-python interface directives
+  !f2py intent(in) surf, ku, kv, mu, mv, nD, nC, nsurf, nedge, ngroup, nvert, surf_vert, surf_edge, edge_group, group_d, surf_index_C, edge_index_C, knot_index, tol, maxiter, C, P0, R
+  !f2py intent(in,out) x
+  !f2py intent(out) d, niter
+  !f2py depend(nsurf) surf_vert
+  !f2py depend(nsurf) surf_edge
+  !f2py depend(nedge) edge_group
+  !f2py depend(nD) group_d
+  !f2py depend(nsurf) surf_index_C
+  !f2py depend(nedge) edge_index_C
+  !f2py depend(ngroup) knot_index
+  !f2py depend(nC) C
+
+  !Input
+  integer, intent(in) ::  surf, ku, kv, mu, mv, nD, nC
+  integer, intent(in) ::  nsurf, nedge, ngroup, nvert
+  integer, intent(in) ::  surf_vert(nsurf,2,2), surf_edge(nsurf,2,2), &
+                          edge_group(nedge)
+  double precision, intent(in) ::  group_d(nD)
+  integer, intent(in) ::  surf_index_C(nsurf,2), edge_index_C(nedge,2), &
+                          knot_index(ngroup,2), maxiter
+  double precision, intent(in) ::  tol, C(nC,3), P0(3), R(3)
+
+  !Input/output
+  double precision, intent(inout) ::  x(2)
+
+  !Output
+  double precision, intent(out) ::  d
+  integer, intent(out) ::  niter
+
+  !Working
+  integer i
+  double precision dx(2), g(2), H(2,2), W(2,2), norm, det, RR
+  double precision Pd(3,6), Pc(3), Pu(3), Pv(3), Puu(3), Puv(3), Pvv(3)
+  double precision f(3), fu(3), fv(3), fuu(3), fuv(3), fvv(3)
+
+  ! R = 0 gives the closest point; otherwise, the projection along R
+  RR = dot_product(R,R)
+  niter = 0
+  do while (niter .lt. maxiter)
+     call evaluatePointDerivs(surf,ku,kv,mu,mv,3,nD,nC,nsurf,nedge,ngroup,nvert,&
+          x(1),x(2),surf_vert,surf_edge,edge_group,group_d,& 
+          surf_index_C,edge_index_C,knot_index,C,Pd)
+     Pc = Pd(:,1)
+     Pu = Pd(:,2)
+     Pv = Pd(:,3)
+     Puu = Pd(:,4)
+     Puv = Pd(:,5)
+     Pvv = Pd(:,6)
+     if (RR .gt. 0) then
+        f = Pc - (P0 + R*dot_product(Pc-P0,R)/RR)
+        fu = Pu - R*dot_product(Pu,R)/RR
+        fv = Pv - R*dot_product(Pv,R)/RR
+        fuu = Puu - R*dot_product(Puu,R)/RR
+        fuv = Puv - R*dot_product(Puv,R)/RR
+        fvv = Pvv - R*dot_product(Pvv,R)/RR
+     else
+        f = Pc - P0
+        fu = Pu
+        fv = Pv
+        fuu = Puu
+        fuv = Puv
+        fvv = Pvv
+     end if
+     g(1) = 2*dot_product(f,fu)
+     g(2) = 2*dot_product(f,fv)
+     H(1,1) = 2*dot_product(fu,fu) + 2*dot_product(f,fuu)
+     H(1,2) = 2*dot_product(fu,fv) + 2*dot_product(f,fuv)
+     H(2,2) = 2*dot_product(fv,fv) + 2*dot_product(f,fvv)
+     H(2,1) = H(1,2)
+     do i=1,2
+        if (((x(i).eq.0).and.(g(i).gt.0)).or.((x(i).eq.1).and. & 
+           (g(i).lt.0))) then
+           g(i) = 0.0
+           H(1,2) = 0.0
+           H(2,1) = 0.0
+           H(i,i) = 1.0
+        end if
+     end do
+     det = H(1,1)*H(2,2) - H(1,2)*H(2,1)
+     W(1,1) = H(2,2)/det
+     W(1,2) = -H(1,2)/det
+     W(2,2) = H(1,1)/det
+     W(2,1) = W(1,2)
+     norm = (g(1)**2 + g(2)**2)**0.5
+     dx(1) = -dot_product(W(1,:),g)
+     dx(2) = -dot_product(W(2,:),g)
+     do i=1,2
+        if (x(i)+dx(i).lt.0) then
+           dx(i) = -x(i)
+        else if (x(i)+dx(i).gt.1) then
+           dx(i) = 1-x(i)
+        end if
+     end do
+     if ((norm.lt.tol).or.((dx(1)**2 + dx(2)**2)**0.5.lt.tol)) then
+        exit
+     end if
+     x = x + dx
+     niter = niter + 1
+  end do
+  call evaluatePoint(surf,0,0,ku,kv,mu,mv,3,nD,nC,nsurf,nedge,ngroup,nvert,x(1),x(2),& 
+       surf_vert,surf_edge,edge_group,group_d,& 
+       surf_index_C,edge_index_C,knot_index,C,Pc)
+  if (RR .gt. 0) then
+     f = Pc - (P0 + R*dot_product(Pc-P0,R)/RR)
+  else
+     f = Pc - P0
+  end if
+  d = abs(dot_product(f,f))
+
+end subroutine projectPoint
+
+
+
 subroutine getOuter(a,b,C)
 
   implicit none
@@ -27,93 +27,132 @@ subroutine initializeConnectivities(nsurf, vtol, etol, P, nvert, nedge, surf_ver
   integer du1,dv1,du2,dv2
   integer vert, edge
   double precision dP(3), norm
-
+  integer np, ntable, ip, iq, i, j, k, cell(3), hashCell
+  integer, allocatable, dimension(:,:) ::  pts, cells
+  integer, allocatable, dimension(:) ::  head, next
+  double precision, allocatable, dimension(:,:) ::  X
+
+  ! Points and edge midpoints are binned in a hash grid with cells no
+  ! smaller than twice the tolerance, so every match lies in one of the
+  ! 27 cells around a point; the matching rules and the order in which
+  ! IDs are assigned are the same as an all-pairs search
+  np = 4*nsurf
+  ntable = 8*nsurf
+  allocate(pts(np,3))
+  allocate(cells(np,3))
+  allocate(X(np,3))
+  allocate(head(ntable))
+  allocate(next(np))
   surf_ptrs(:,:,:) = 0
 
-  vert = 0
-  do surf1=1,nsurf
+  ip = 0
+  do surf=1,nsurf
      do v1=1,3,2
         do u1=1,3,2
-           if (surf_ptrs(surf1,u1,v1) .eq. 0) then
-              vert = vert + 1
-              surf_ptrs(surf1,u1,v1) = vert
-              do surf2=surf1+1,nsurf
-                 do v2=1,3,2
-                    do u2=1,3,2
+           ip = ip + 1
+           pts(ip,:) = (/ surf, u1, v1 /)
+           X(ip,:) = P(surf,u1,v1,:)
+        end do
+     end do
+  end do
+  call hashPoints(np, ntable, 2*vtol, X, cells, head, next)
+
+  vert = 0
+  do ip=1,np
+     surf1 = pts(ip,1)
+     u1 = pts(ip,2)
+     v1 = pts(ip,3)
+     if (surf_ptrs(surf1,u1,v1) .eq. 0) then
+        vert = vert + 1
+        surf_ptrs(surf1,u1,v1) = vert
+        do i=-1,1
+           do j=-1,1
+              do k=-1,1
+                 cell = cells(ip,:) + (/ i, j, k /)
+                 iq = head(hashCell(ntable, cell))
+                 do while (iq .ne. 0)
+                    surf2 = pts(iq,1)
+                    u2 = pts(iq,2)
+                    v2 = pts(iq,3)
+                    if (all(cells(iq,:) .eq. cell) .and. (surf2 .gt. surf1)) then
                        if (surf_ptrs(surf2,u2,v2) .eq. 0) then
-                          dP(:) = P(surf1,u1,v1,:) - P(surf2,u2,v2,:)
+                          dP(:) = X(ip,:) - X(iq,:)
                           norm = (dP(1)**2+dP(2)**2+dP(3)**2)**0.5
                           if (norm .lt. vtol) then
                              surf_ptrs(surf2,u2,v2) = vert
                           end if
                        end if
-                    end do
+                    end if
+                    iq = next(iq)
                  end do
               end do
-           end if
+           end do
         end do
+     end if
+  end do
+
+  ip = 0
+  do surf=1,nsurf
+     do u1=1,3,2
+        ip = ip + 1
+        pts(ip,:) = (/ surf, u1, 2 /)
+        X(ip,:) = P(surf,u1,2,:)
+     end do
+     do v1=1,3,2
+        ip = ip + 1
+        pts(ip,:) = (/ surf, 2, v1 /)
+        X(ip,:) = P(surf,2,v1,:)
      end do
   end do
+  call hashPoints(np, ntable, 2*etol, X, cells, head, next)
 
   edge = 0
-  do surf1=1,nsurf
-     do v1=2,2
-        do u1=1,3,2
-           du1 = 0
-           dv1 = 1
-           if (surf_ptrs(surf1,u1,v1) .eq. 0) then
-              edge = edge + 1
-              surf_ptrs(surf1,u1,v1) = edge
-              do surf2=surf1+1,nsurf
-                 do v2=2,2
-                    do u2=1,3,2
+  do ip=1,np
+     surf1 = pts(ip,1)
+     u1 = pts(ip,2)
+     v1 = pts(ip,3)
+     du1 = 0
+     dv1 = 0
+     if (u1 .eq. 2) then
+        du1 = 1
+     else
+        dv1 = 1
+     end if
+     if (surf_ptrs(surf1,u1,v1) .eq. 0) then
+        edge = edge + 1
+        surf_ptrs(surf1,u1,v1) = edge
+        do i=-1,1
+           do j=-1,1
+              do k=-1,1
+                 cell = cells(ip,:) + (/ i, j, k /)
+                 iq = head(hashCell(ntable, cell))
+                 do while (iq .ne. 0)
+                    surf2 = pts(iq,1)
+                    u2 = pts(iq,2)
+                    v2 = pts(iq,3)
+                    if (all(cells(iq,:) .eq. cell) .and. (surf2 .gt. surf1)) then
                        du2 = 0
-                       dv2 = 1
-                       call checkEdge(nsurf,edge,surf1,surf2,u1,v1,u2,v2,du1, &
-                            dv1,du2,dv2,etol,P,surf_ptrs)
-                    end do
-                 end do
-                 do v2=1,3,2
-                    do u2=2,2
-                       du2 = 1
                        dv2 = 0
+                       if (u2 .eq. 2) then
+                          du2 = 1
+                       else
+                          dv2 = 1
+                       end if
                        call checkEdge(nsurf,edge,surf1,surf2,u1,v1,u2,v2,du1, &
                             dv1,du2,dv2,etol,P,surf_ptrs)
-                    end do
-                 end do
-              end do
-           end if
-        end do
-     end do
-     do v1=1,3,2
-        do u1=2,2
-           du1 = 1
-           dv1 = 0
-           if (surf_ptrs(surf1,u1,v1) .eq. 0) then
-              edge = edge + 1
-              surf_ptrs(surf1,u1,v1) = edge
-              do surf2=surf1+1,nsurf
-                 do v2=2,2
-                    do u2=1,3,2
-                       du2 = 0
-                       dv2 = 1
-                       call checkEdge(nsurf,edge,surf1,surf2,u1,v1,u2,v2,du1, & 
-                            dv1,du2,dv2,etol,P,surf_ptrs)
-                    end do
-                 end do
-                 do v2=1,3,2
-                    do u2=2,2
-                       du2 = 1
-                       dv2 = 0
-                       call checkEdge(nsurf,edge,surf1,surf2,u1,v1,u2,v2,du1, & 
-                            dv1,du2,dv2,etol,P,surf_ptrs)
-                    end do
+                    end if
+                    iq = next(iq)
                  end do
               end do
-           end if
+           end do
         end do
-     end do
+     end if
   end do
+  deallocate(pts)
+  deallocate(cells)
+  deallocate(X)
+  deallocate(head)
+  deallocate(next)
 
   do surf=1,nsurf
      surf_vert(surf,1,1) = surf_ptrs(surf,1,1)
@@ -168,6 +207,63 @@ end subroutine checkEdge
 
 
 
+subroutine hashPoints(np, ntable, h, X, cells, head, next)
+
+  implicit none
+
+  !Input
+  integer, intent(in) ::  np, ntable
+  double precision, intent(in) ::  h, X(np,3)
+
+  !Output
+  integer, intent(out) ::  cells(np,3), head(ntable), next(np)
+
+  !Working
+  integer p, k, hashCell
+  double precision Xmin(3), dX
+
+  do k=1,3
+     Xmin(k) = minval(X(:,k))
+  end do
+  dX = h
+  do k=1,3
+     dX = max(dX, (maxval(X(:,k)) - Xmin(k))/ceiling(np**0.5))
+  end do
+
+  head(:) = 0
+  do p=np,1,-1
+     do k=1,3
+        cells(p,k) = floor((X(p,k) - Xmin(k))/dX)
+     end do
+     k = hashCell(ntable, cells(p,:))
+     next(p) = head(k)
+     head(k) = p
+  end do
+
+end subroutine hashPoints
+
+
+
+function hashCell(ntable, cell)
+
+  implicit none
+
+  !Input
+  integer, intent(in) ::  ntable, cell(3)
+
+  !Output
+  integer hashCell
+
+  !Working
+  integer(kind=8) key
+
+  key = 73856093_8*cell(1) + 19349663_8*cell(2) + 83492791_8*cell(3)
+  hashCell = int(modulo(key, int(ntable,8))) + 1
+
+end function hashCell
+
+
+
 subroutine initializeVEcounts(nsurf, nvert, nedge, surf_vert, surf_edge, vert_count, & 
            edge_count)
 
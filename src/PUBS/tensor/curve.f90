@@ -109,3 +109,77 @@ subroutine curvefit(k, m, n, B, i0, P0, dPdC, P)
   end do
 
 end subroutine curvefit
+
+
+subroutine curvebases(k, m, n, t, d, B0, B1)
+
+  implicit none
+
+  !Fortran-python interface directives
+  !f2py intent(in) k,m,n,t,d
+  !f2py intent(out) B0,B1
+  !f2py depend(n) t
+  !f2py depend(k,m) d
+  !f2py depend(n,m) B0,B1
+
+  !Input
+  integer, intent(in) ::  k, m, n
+  double precision, intent(in) ::  t(n), d(k+m)
+
+  !Output
+  double precision, intent(out) ::  B0(n,m), B1(n,m)
+
+  !Working
+  double precision B(k), F(k), S(k)
+  integer u, i0
+
+  !Dense basis and first derivative matrices at the parameters t
+
+  B0(:,:) = 0
+  B1(:,:) = 0
+  do u=1,n
+     call basis012(k, k+m, t(u), d, B, F, S, i0)
+     B0(u,i0+1:i0+k) = B
+     B1(u,i0+1:i0+k) = F
+  end do
+
+end subroutine curvebases
+
+
+subroutine invertcurve(k, m, n, maxiter, tol, d, C, x, t)
+
+  implicit none
+
+  !Fortran-python interface directives
+  !f2py intent(in) k,m,n,maxiter,tol,d,C,x
+  !f2py intent(out) t
+  !f2py depend(k,m) d
+  !f2py depend(m) C
+  !f2py depend(n) x,t
+
+  !Input
+  integer, intent(in) ::  k, m, n, maxiter
+  double precision, intent(in) ::  tol, d(k+m), C(m), x(n)
+
+  !Output
+  double precision, intent(out) ::  t(n)
+
+  !Working
+  double precision B(k), F(k), S(k), r, dr
+  integer u, i0, it
+
+  !Parameters at which a monotonic curve with control points C passes
+  !through x; Newton's method, clipped to [0,1]
+
+  do u=1,n
+     t(u) = min(max(x(u), 0.0d0), 1.0d0)
+     do it=1,maxiter
+        call basis012(k, k+m, t(u), d, B, F, S, i0)
+        r = dot_product(B, C(i0+1:i0+k)) - x(u)
+        dr = dot_product(F, C(i0+1:i0+k))
+        if ((abs(r) .lt. tol) .or. (dr .eq. 0)) exit
+        t(u) = min(max(t(u) - r/dr, 0.0d0), 1.0d0)
+     end do
+  end do
+
+end subroutine invertcurve
@@ -0,0 +1,45 @@
+from __future__ import division
+import numpy
+import unittest
+
+from GeoMACH.PGM.configurations.conventional import Conventional
+
+
+class TestClone(unittest.TestCase):
+    """ Configuration.clone shares read-only data with its parent """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.aircraft = Conventional()
+
+    def getState(self, aircraft):
+        wing = aircraft.comps['lw']
+        return [wing.shapeU.copy(), wing.shapeL.copy(),
+                wing.params['pos1'].P.copy(),
+                aircraft.oml0.Q.copy(), aircraft.oml0.P0.copy()]
+
+    def assertState(self, aircraft, state):
+        for A, B in zip(self.getState(aircraft), state):
+            numpy.testing.assert_array_equal(A, B)
+
+    def test_setAirfoil(self):
+        state = self.getState(self.aircraft)
+        clone = self.aircraft.clone()
+        clone.comps['lw'].setAirfoil('naca2412')
+        clone.computePoints()
+        self.assertFalse(numpy.array_equal(clone.comps['lw'].shapeU, state[0]))
+        self.assertState(self.aircraft, state)
+
+    def test_setParameter(self):
+        state = self.getState(self.aircraft)
+        clone = self.aircraft.clone()
+        P = clone.comps['lw'].params['pos1'].P[:,:,0].copy()
+        P[1,1] += 2.0
+        clone.set_parameter('lw.pos1', P)
+        clone.computePoints()
+        self.assertFalse(numpy.array_equal(clone.oml0.Q, state[3]))
+        self.assertState(self.aircraft, state)
+
+
+if __name__ == '__main__':
+    unittest.main()
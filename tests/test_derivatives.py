@@ -0,0 +1,51 @@
+from __future__ import division
+import numpy
+import unittest
+
+from GeoMACH.PGM.configurations.conventional import Conventional
+
+
+class TestDerivatives(unittest.TestCase):
+    """ Configuration.getJacobian against getDerivatives one entry at a time """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.aircraft = Conventional()
+        cls.dQ = cls.aircraft.getJacobian()[0].tocsc()
+        cls.layout = dict((name, (start, shape)) for name, start, shape in cls.aircraft.getParameterLayout())
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.aircraft.computePoints(full=True)
+
+    def getRows(self, c):
+        """ Rows of Q written by the interior DOFs of component c """
+
+        k = self.aircraft.keys.index(c)
+        rows = numpy.concatenate([N[:,:,0].flatten() for N in self.aircraft.Qowners[k]])
+        return rows[rows >= 0]
+
+    def assertColumn(self, name, i, j):
+        c, p = name.split('.',1)
+        start, shape = self.layout[name]
+        col = self.dQ[:,start + i*shape[1] + j].toarray().reshape((-1,3))
+        d = self.aircraft.getDerivatives(c, p, (i,j), clean=False, FD=False)
+        self.assertLess(numpy.max(numpy.abs(col - d)), 1e-10*max(1, numpy.max(numpy.abs(d))))
+        return col
+
+    def test_sample(self):
+        random = numpy.random.RandomState(1)
+        for name in sorted(self.layout.keys()):
+            start, shape = self.layout[name]
+            i, j = random.randint(shape[0]), random.randint(shape[1])
+            self.assertColumn(name, i, j)
+
+    def test_junction(self):
+        rows = self.getRows('lw_fu')
+        for name, i, j in [('lw.pos1', 1, 1), ('lw.scl1', 0, 0), ('fu.rad', 2, 0), ('fu.pos', 1, 2)]:
+            col = self.assertColumn(name, i, j)
+            self.assertGreater(numpy.max(numpy.abs(col[rows])), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+from __future__ import division
+import numpy
+import unittest
+
+from GeoMACH.PGM.configurations.conventional import Conventional
+
+
+class TestDesigns(unittest.TestCase):
+    """ Configuration.evaluateDesigns against one design at a time """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.aircraft = Conventional()
+        numpy.random.seed(0)
+        x0 = cls.aircraft.getParameters()
+        cls.X = numpy.tile(x0, (4,1))
+        for name, start, shape in cls.aircraft.getParameterLayout():
+            if name.split('.')[1][:3] == 'pos':
+                n = shape[0]*shape[1]
+                cls.X[:,start:start+n] += 0.1*(numpy.random.rand(4,n) - 0.5)
+
+    def evaluateSequential(self):
+        aircraft = self.aircraft
+        oml0 = aircraft.oml0
+        x0 = aircraft.getParameters()
+        outputs = [[], [], []]
+        for x in self.X:
+            aircraft.setParameters(x)
+            aircraft.computePoints()
+            outputs[0].append(oml0.Q[:,:3].copy())
+            outputs[1].append(oml0.P0[:,:3].copy())
+            outputs[2].append(oml0.P0[:,3:6].copy())
+        aircraft.setParameters(x0)
+        aircraft.computePoints()
+        return [numpy.array(A) for A in outputs]
+
+    def test_designs(self):
+        x0 = self.aircraft.getParameters()
+        Q0 = self.aircraft.oml0.Q.copy()
+        outputs = self.aircraft.evaluateDesigns(self.X, normals=True)
+        numpy.testing.assert_array_equal(self.aircraft.getParameters(), x0)
+        numpy.testing.assert_array_equal(self.aircraft.oml0.Q, Q0)
+        for A, B in zip(self.evaluateSequential(), outputs):
+            self.assertEqual(A.shape, B.shape)
+            numpy.testing.assert_allclose(A, B, rtol=0, atol=1e-10)
+
+    def test_single(self):
+        Q, P0 = self.aircraft.evaluateDesigns(self.X[0])
+        self.assertEqual(Q.shape, (1,self.aircraft.oml0.nQ,3))
+        self.assertEqual(P0.shape[0], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+from __future__ import division
+import numpy
+import unittest
+
+from GeoMACH.PGM.configurations.conventional import Conventional
+
+
+class TestDirty(unittest.TestCase):
+    """ Updating only the dirty components against a full update """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.aircraft = Conventional()
+
+    def assertUpdate(self, name, P):
+        aircraft = self.aircraft
+        c, p = name.split('.')
+        P0 = aircraft.comps[c].params[p].P[:,:,0].copy()
+        aircraft.set_parameter(name, P)
+        self.assertNotEqual(aircraft.getDirtyComps(), [])
+        aircraft.updateQs()
+        self.assertEqual(aircraft.getDirtyComps(), [])
+        Q = aircraft.oml0.Q.copy()
+        aircraft.updateQs(full=True)
+        numpy.testing.assert_allclose(Q, aircraft.oml0.Q, rtol=0, atol=1e-12)
+        aircraft.set_parameter(name, P0)
+        aircraft.updateQs(full=True)
+
+    def test_wing(self):
+        P = self.aircraft.comps['lw'].params['pos1'].P[:,:,0].copy()
+        P[1,1] += 2.0
+        self.assertUpdate('lw.pos1', P)
+
+    def test_fuselage(self):
+        P = self.aircraft.comps['fu'].params['rad'].P[:,:,0].copy()
+        P *= 1.1
+        self.assertUpdate('fu.rad', P)
+
+    def test_clean(self):
+        self.aircraft.updateQs(full=True)
+        Q = self.aircraft.oml0.Q.copy()
+        self.aircraft.propagateQs([])
+        numpy.testing.assert_array_equal(Q, self.aircraft.oml0.Q)
+
+
+if __name__ == '__main__':
+    unittest.main()
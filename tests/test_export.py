@@ -0,0 +1,144 @@
+from __future__ import division
+import numpy
+import os
+import shutil
+import tempfile
+import unittest
+
+from GeoMACH.PGM.configurations.conventional import Conventional
+
+
+class TestExport(unittest.TestCase):
+    """ PUBS triangle and file exports """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.aircraft = Conventional()
+        cls.oml = cls.aircraft.oml0
+        cls.directory = tempfile.mkdtemp()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory)
+
+    def readTecBinary(self, filename):
+        """ Parse a #!TDV112 file into its header and a list of
+            [offset, name, zonetype, dims, data, quads] zones """
+
+        buf = open(filename,'rb').read()
+        pos = [8]
+        def read(dtype, n=1):
+            A = numpy.frombuffer(buf, dtype, n, pos[0])
+            pos[0] += A.nbytes
+            return A
+        def readString():
+            chars = []
+            while True:
+                c = read('<i4')[0]
+                if c == 0:
+                    return ''.join(chr(c) for c in chars)
+                chars.append(c)
+
+        header = [buf[:8], list(read('<i4',2)), readString()]
+        variables = [readString() for i in range(read('<i4')[0])]
+        header.append(variables)
+        nvar = len(variables)
+        zones = []
+        while read('<f4')[0] == 299.0:
+            name = readString()
+            self.assertEqual(list(read('<i4',2)), [-1,-1])
+            self.assertEqual(read('<f8')[0], 0.0)
+            zonetype = read('<i4',5)[1]
+            dims = list(read('<i4',3 if zonetype == 0 else 5))
+            self.assertEqual(read('<i4')[0], 0)
+            zones.append([None, name, zonetype, dims])
+        self.assertEqual(pos[0] - 4, buf.index(numpy.array(357.0,'<f4').tostring(), 8))
+        for zone in zones:
+            zone[0] = pos[0]
+            self.assertEqual(read('<f4')[0], 299.0)
+            self.assertEqual(list(read('<i4',nvar)), [2]*nvar)
+            self.assertEqual(list(read('<i4',3)), [0,0,-1])
+            bounds = read('<f8',2*nvar).reshape((nvar,2))
+            npts = numpy.prod(zone[3][:3]) if zone[2] == 0 else zone[3][0]
+            data = read('<f8',nvar*npts).reshape((nvar,npts)).T
+            if data.shape[0] > 0:
+                numpy.testing.assert_array_equal(bounds[:,0], data.min(axis=0))
+                numpy.testing.assert_array_equal(bounds[:,1], data.max(axis=0))
+            quads = read('<i4',4*zone[3][1]).reshape((-1,4)) + 1 if zone[2] == 3 else None
+            zone.extend([data, quads])
+        self.assertEqual(pos[0], len(buf))
+        return header, zones
+
+    def getOffsets(self, nvar, sizes, start):
+        """ Expected byte offsets of the zone data blocks """
+
+        offsets = []
+        for npts, nquads in sizes:
+            offsets.append(start)
+            start += 4 + 4*nvar + 12 + 16*nvar + 8*nvar*npts + 16*nquads
+        return offsets
+
+    def test_triCache(self):
+        self.aircraft.list_parameters()
+        tris = self.aircraft.tris
+        ref = [Tri.copy() for Tri in tris]
+        tris.pop()
+        with self.assertRaises(ValueError):
+            tris[0][0,0] = -1
+        Tris = self.oml.exportPtri()
+        self.assertIsNot(Tris, tris)
+        self.assertEqual(len(Tris), len(ref))
+        for A, B in zip(Tris, ref):
+            numpy.testing.assert_array_equal(A, B)
+
+    def test_STLBinary(self):
+        filename = os.path.join(self.directory, 'model.stl')
+        self.oml.write2STL(filename, binary=True)
+        T = numpy.vstack(self.oml.exportPtri())
+        f = open(filename,'rb')
+        f.read(80)
+        n = numpy.fromfile(f,'<u4',1)[0]
+        facets = numpy.fromfile(f, dtype=[('normal','<f4',3), ('vertex','<f4',(3,3)), ('attr','<u2')])
+        f.close()
+        self.assertEqual(n, T.shape[0])
+        self.assertEqual(facets.shape[0], T.shape[0])
+        for i in range(3):
+            numpy.testing.assert_array_equal(facets['vertex'][:,i,:], numpy.array(self.oml.P0[T[:,i],:3],'<f4'))
+        numpy.testing.assert_array_equal(facets['attr'], 0)
+
+    def test_TecStructBinary(self):
+        filename = os.path.join(self.directory, 'model.plt')
+        self.oml.write2Tec(filename, binary=True)
+        Ps = self.oml.exportPstr()
+        header, zones = self.readTecBinary(filename)
+        self.assertEqual(header, ['#!TDV112', [1,0], 'PUBS output', self.oml.var])
+        self.assertEqual(len(zones), len(Ps))
+        start = zones[0][0]
+        sizes = [(P.shape[0]*P.shape[1], 0) for P in Ps]
+        self.assertEqual([zone[0] for zone in zones], self.getOffsets(len(self.oml.var), sizes, start))
+        for s, (zone, P) in enumerate(zip(zones, Ps)):
+            nu, nv, nvar = P.shape
+            self.assertEqual(zone[1:4], ['zone '+str(s), 0, [nu,nv,1]])
+            data = P.reshape((nu*nv,nvar),order='F')
+            numpy.testing.assert_array_equal(zone[4], numpy.where(data == data, data, 0.0))
+
+    def test_TecFEquadsBinary(self):
+        filename = os.path.join(self.directory, 'quads.plt')
+        nodes = numpy.random.RandomState(0).rand(6,3)
+        nodes[2,1] = numpy.nan
+        quads = numpy.array([[1,2,5,4],[2,3,6,5]])
+        empty = [numpy.zeros((0,3)), numpy.zeros((0,4),int)]
+        self.oml.export.write2TecFEquadsBinary(filename, [['quads', nodes, quads], ['empty'] + empty])
+        header, zones = self.readTecBinary(filename)
+        self.assertEqual(header, ['#!TDV112', [1,0], 'PUBS output', ['x','y','z']])
+        self.assertEqual([zone[0] for zone in zones], self.getOffsets(3, [(6,2), (0,0)], zones[0][0]))
+        self.assertEqual(zones[0][1:4], ['quads', 3, [6,2,0,0,0]])
+        self.assertEqual(zones[1][1:4], ['empty', 3, [0,0,0,0,0]])
+        numpy.testing.assert_array_equal(zones[0][4], numpy.where(nodes == nodes, nodes, 0.0))
+        numpy.testing.assert_array_equal(zones[0][5], quads)
+        self.assertEqual(zones[1][4].shape, (0,3))
+        self.assertEqual(zones[1][5].shape, (0,4))
+
+
+if __name__ == '__main__':
+    unittest.main()
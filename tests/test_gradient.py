@@ -0,0 +1,39 @@
+from __future__ import division
+import numpy
+import unittest
+
+from GeoMACH.PGM.configurations.conventional import Conventional
+
+
+class TestGradient(unittest.TestCase):
+    """ Configuration.getGradient against the transposed Jacobians """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.aircraft = Conventional()
+        numpy.random.seed(0)
+        cls.P0bar = numpy.random.rand(cls.aircraft.oml0.P0.shape[0],3)
+        cls.Qbar = numpy.random.rand(cls.aircraft.oml0.nQ,3)
+
+    def assertGradient(self, g, ref):
+        self.assertEqual(g.shape, ref.shape)
+        self.assertLess(numpy.max(numpy.abs(g - ref)), 1e-10*numpy.max(numpy.abs(ref)))
+
+    def test_P0bar(self):
+        dQ, dP0 = self.aircraft.getJacobian()
+        g = self.aircraft.getGradient(P0bar=self.P0bar)
+        self.assertGradient(g, dP0.T.dot(self.P0bar.flatten()))
+
+    def test_Qbar(self):
+        dQ, dP0 = self.aircraft.getJacobian()
+        g = self.aircraft.getGradient(Qbar=self.Qbar)
+        self.assertGradient(g, dQ.T.dot(self.Qbar.flatten()))
+
+    def test_both(self):
+        dQ, dP0 = self.aircraft.getJacobian()
+        g = self.aircraft.getGradient(P0bar=self.P0bar, Qbar=self.Qbar)
+        self.assertGradient(g, dP0.T.dot(self.P0bar.flatten()) + dQ.T.dot(self.Qbar.flatten()))
+
+
+if __name__ == '__main__':
+    unittest.main()
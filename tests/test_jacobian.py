@@ -0,0 +1,41 @@
+from __future__ import division
+import numpy
+import unittest
+
+from GeoMACH.PGM.configurations.conventional import Conventional
+
+
+class TestJacobian(unittest.TestCase):
+    """ Incremental PUBS.updateBsplines against a full rebuild """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.oml = Conventional().oml0
+
+    def refine(self, surf, d, incremental):
+        oml = self.oml
+        m = oml.edgeProperty(surf, 1)[d]
+        oml.incremental = incremental
+        oml.edgeProperty(surf, 1, d, m+2)
+        oml.updateBsplines()
+        Js = [oml.J.copy(), oml.J0.copy(), oml.Ju.copy(), oml.Jv.copy(), oml.JM.copy()]
+        oml.incremental = False
+        oml.edgeProperty(surf, 1, d, m)
+        oml.updateBsplines()
+        oml.incremental = True
+        return Js
+
+    def assertEqualJacobians(self, surf, d):
+        for A, B in zip(self.refine(surf, d, True), self.refine(surf, d, False)):
+            self.assertEqual(A.shape, B.shape)
+            self.assertLess(abs(A - B).max(), 1e-14)
+
+    def test_uGroup(self):
+        self.assertEqualJacobians(3, 0)
+
+    def test_vGroup(self):
+        self.assertEqualJacobians(10, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
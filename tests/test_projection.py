@@ -0,0 +1,58 @@
+from __future__ import division
+import numpy
+import unittest
+import warnings
+
+from GeoMACH.PGM.configurations.conventional import Conventional
+
+
+class TestProjection(unittest.TestCase):
+    """ PUBS.evaluateProjection seeded from the P0 grid """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.oml = Conventional().oml0
+
+    def getPoints(self, n):
+        P0 = self.oml.P0[::self.oml.P0.shape[0]//n,:3][:n]
+        return numpy.array(P0 + [0.0,0.1,0.0], order='F')
+
+    def getDistances(self, P0, s, u, v):
+        P = self.oml.evaluateBases(s, u, v).dot(self.oml.C[:,:3])
+        return numpy.sum((P - P0)**2, 1)**0.5
+
+    def test_closest(self):
+        random = numpy.random.RandomState(3)
+        P0 = self.oml.P0[random.randint(0, self.oml.P0.shape[0], 3000),:3]
+        P0 = numpy.array(P0 + 2*(random.rand(3000,3) - 0.5), order='F')
+        d = self.getDistances(P0, *self.oml.evaluateProjection(P0))
+        d0 = self.getDistances(P0, *self.oml.evaluateProjection(P0, nseed=0))
+        self.assertLess(numpy.max(d - d0), 1e-10)
+
+    def test_stats(self):
+        P0 = self.getPoints(100)
+        s, u, v, info = self.oml.evaluateProjection(P0, stats=True)
+        self.assertEqual(info['nsearch'], 100)
+        self.assertGreater(info['niter'], 0)
+        surfs = numpy.setdiff1d(numpy.arange(self.oml.nsurf), s)
+        cold = self.oml.evaluateProjection(P0, surfs, stats=True)[3]
+        warm = self.oml.evaluateProjection(P0, surfs, surf0=s, u0=0.99*u, v0=v, stats=True)[3]
+        self.assertEqual(warm['nsearch'], 100)
+        self.assertGreater(warm['niter'], cold['niter'])
+
+    def test_zeroDirection(self):
+        P0 = self.getPoints(20)
+        Q = numpy.zeros((20,3),order='F')
+        Q[:,1] = 1.0
+        Q[0,:] = 0.0
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            s, u, v = self.oml.evaluateProjection(P0, Q=Q)
+        s0, u0, v0 = self.oml.evaluateProjection(P0, Q=Q, nseed=0)
+        numpy.testing.assert_array_equal(s, s0)
+        numpy.testing.assert_array_equal(u, u0)
+        numpy.testing.assert_array_equal(v, v0)
+
+
+if __name__ == '__main__':
+    unittest.main()
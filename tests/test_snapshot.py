@@ -0,0 +1,52 @@
+from __future__ import division
+import numpy
+import os
+import shutil
+import tempfile
+import unittest
+
+from GeoMACH.PGM.configurations.conventional import Conventional
+from GeoMACH.PGM.configurations.configuration import loadSnapshot
+
+
+class TestSnapshot(unittest.TestCase):
+    """ Configuration.saveSnapshot and loadSnapshot round trip """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.aircraft = Conventional()
+        cls.state = [cls.aircraft.oml0.Q.copy(), cls.aircraft.oml0.P0.copy(), cls.aircraft.getParameters()]
+        cls.directory = tempfile.mkdtemp()
+        cls.filename = os.path.join(cls.directory, 'conventional.snap')
+        cls.aircraft.saveSnapshot(cls.filename)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory)
+
+    def test_state(self):
+        loaded = loadSnapshot(self.filename)
+        numpy.testing.assert_array_equal(loaded.oml0.Q, self.state[0])
+        numpy.testing.assert_array_equal(loaded.oml0.P0, self.state[1])
+        numpy.testing.assert_array_equal(loaded.getParameters(), self.state[2])
+        self.assertEqual(loaded.getDirtyComps(), [])
+        for comp in loaded.comps.values():
+            self.assertIs(comp.oml0, loaded.oml0)
+
+    def test_edit(self):
+        loaded = loadSnapshot(self.filename)
+        for aircraft in [self.aircraft, loaded]:
+            P = aircraft.comps['lw'].params['pos1'].P[:,:,0].copy()
+            P[1,1] += 2.0
+            aircraft.set_parameter('lw.pos1', P)
+            aircraft.computePoints()
+        A, B = self.aircraft.oml0, loaded.oml0
+        numpy.testing.assert_allclose(A.Q, B.Q, rtol=0, atol=1e-10)
+        numpy.testing.assert_allclose(A.P0, B.P0, rtol=0, atol=1e-10)
+        numpy.random.seed(0)
+        Qbar = numpy.random.rand(A.nQ,3)
+        numpy.testing.assert_allclose(self.aircraft.getGradient(Qbar=Qbar), loaded.getGradient(Qbar=Qbar), rtol=1e-10)
+
+
+if __name__ == '__main__':
+    unittest.main()
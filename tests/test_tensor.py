@@ -0,0 +1,44 @@
+from __future__ import division
+import numpy
+import unittest
+
+from GeoMACH.PGM.configurations.conventional import Conventional
+
+
+class TestTensor(unittest.TestCase):
+    """ PUBS tensor mode against the assembled grid operators """
+
+    @classmethod
+    def setUpClass(cls):
+        oml = Conventional().oml0
+        cls.ref = [oml.P0.copy(), oml.Pu.copy(), oml.Pv.copy()]
+        cls.refJ = [oml.J0.copy(), oml.Ju.copy(), oml.Jv.copy()]
+        oml.tensor = True
+        oml.computeJacobian()
+        oml.computePoints()
+        cls.assembled = 'J0' in oml.__dict__
+        cls.oml = oml
+
+    def test_points(self):
+        self.assertFalse(self.assembled)
+        for A, B in zip(self.ref, [self.oml.P0, self.oml.Pu, self.oml.Pv]):
+            numpy.testing.assert_allclose(A, B, rtol=0, atol=1e-10)
+
+    def test_bases(self):
+        for A, B in zip(self.refJ, [self.oml.J0, self.oml.Ju, self.oml.Jv]):
+            self.assertEqual(A.shape, B.shape)
+            self.assertLess(abs(A - B).max(), 1e-14)
+
+    def test_grid(self):
+        oml = self.oml
+        for s in range(oml.nsurf):
+            nu, nv = oml.Nuv[s]
+            i0 = int(oml.Np0[s])
+            u = oml.P0u[i0:i0+nu*nv].reshape((nu,nv),order='F')
+            v = oml.P0v[i0:i0+nu*nv].reshape((nu,nv),order='F')
+            self.assertLess(numpy.max(numpy.abs(u - u[:,:1])), 1e-14)
+            self.assertLess(numpy.max(numpy.abs(v - v[:1,:])), 1e-14)
+
+
+if __name__ == '__main__':
+    unittest.main()